@@ -1,15 +1,15 @@
 """高级分析API路由 - 大运、十神、神煞、纳音、辅助宫位"""
 from fastapi import APIRouter, HTTPException
 from backend.api.schemas import (
-    DayunRequest, ShiShenRequest, ShenShaRequest,
+    BirthInfo, DayunRequest, ShiShenRequest, ShenShaRequest,
     NaYinRequest, YearNaYinRequest, AuxiliaryRequest, AuxiliaryResponse
 )
+from backend.executor import ExecutorBusyError, run_cpu, service_busy
 from src.core import (
-    calculate_bazi, calculate_dayun, analyze_shishen,
+    get_chart, calculate_dayun, analyze_shishen,
     calculate_shensha, calculate_nayin, get_year_nayin,
-    convert_to_true_solar_time, calculate_auxiliary_from_bazi
+    calculate_auxiliary_from_bazi
 )
-from src.models import Gender
 from src.models.bazi_models import (
     DaYunInfo, ShiShenAnalysis, ShenShaAnalysis, NaYinInfo
 )
@@ -17,6 +17,17 @@ from src.models.bazi_models import (
 router = APIRouter(prefix="/advanced", tags=["高级分析"])
 
 
+def _dayun(birth_info: BirthInfo, num_dayun: int) -> DaYunInfo:
+    chart = get_chart(birth_info.birth_datetime, birth_info.gender, birth_info.location)
+    return calculate_dayun(chart.bazi, chart.wuxing, num_dayun)
+
+
+def _from_bazi(analyze, birth_info: BirthInfo):
+    """排盘（命盘缓存）后对八字执行 analyze"""
+    bazi = get_chart(birth_info.birth_datetime, birth_info.gender, birth_info.location).bazi
+    return analyze(bazi)
+
+
 @router.post("/dayun", response_model=DaYunInfo)
 async def get_dayun(request: DayunRequest) -> DaYunInfo:
     """
@@ -24,21 +35,13 @@ async def get_dayun(request: DayunRequest) -> DaYunInfo:
 
     根据出生信息计算大运排盘，包括起运年龄和运势周期
     """
-    from src.core import analyze_wuxing
     try:
         birth_info = request.birth_info
-        gender = Gender.MALE if birth_info.gender == "男" else Gender.FEMALE
-
-        # 真太阳时转换
-        birth_dt = birth_info.birth_datetime
-        if birth_info.birth_place:
-            birth_dt = convert_to_true_solar_time(birth_dt, birth_info.birth_place)
-
-        bazi = calculate_bazi(birth_dt, gender, birth_info.birth_place)
-        wuxing = analyze_wuxing(bazi)
-        dayun_info = calculate_dayun(bazi, wuxing, request.num_dayun)
-
-        return dayun_info
+        return await run_cpu(
+            _dayun, birth_info, request.num_dayun, affinity=birth_info.affinity
+        )
+    except ExecutorBusyError as e:
+        raise service_busy(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -54,16 +57,9 @@ async def get_shishen(request: ShiShenRequest) -> ShiShenAnalysis:
     """
     try:
         birth_info = request.birth_info
-        gender = Gender.MALE if birth_info.gender == "男" else Gender.FEMALE
-        
-        birth_dt = birth_info.birth_datetime
-        if birth_info.birth_place:
-            birth_dt = convert_to_true_solar_time(birth_dt, birth_info.birth_place)
-        
-        bazi = calculate_bazi(birth_dt, gender, birth_info.birth_place)
-        shishen = analyze_shishen(bazi)
-        
-        return shishen
+        return await run_cpu(_from_bazi, analyze_shishen, birth_info, affinity=birth_info.affinity)
+    except ExecutorBusyError as e:
+        raise service_busy(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -79,16 +75,9 @@ async def get_shensha(request: ShenShaRequest) -> ShenShaAnalysis:
     """
     try:
         birth_info = request.birth_info
-        gender = Gender.MALE if birth_info.gender == "男" else Gender.FEMALE
-        
-        birth_dt = birth_info.birth_datetime
-        if birth_info.birth_place:
-            birth_dt = convert_to_true_solar_time(birth_dt, birth_info.birth_place)
-        
-        bazi = calculate_bazi(birth_dt, gender, birth_info.birth_place)
-        shensha = calculate_shensha(bazi)
-        
-        return shensha
+        return await run_cpu(_from_bazi, calculate_shensha, birth_info, affinity=birth_info.affinity)
+    except ExecutorBusyError as e:
+        raise service_busy(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -104,16 +93,9 @@ async def get_nayin(request: NaYinRequest) -> list[NaYinInfo]:
     """
     try:
         birth_info = request.birth_info
-        gender = Gender.MALE if birth_info.gender == "男" else Gender.FEMALE
-        
-        birth_dt = birth_info.birth_datetime
-        if birth_info.birth_place:
-            birth_dt = convert_to_true_solar_time(birth_dt, birth_info.birth_place)
-        
-        bazi = calculate_bazi(birth_dt, gender, birth_info.birth_place)
-        nayin_list = calculate_nayin(bazi)
-        
-        return nayin_list
+        return await run_cpu(_from_bazi, calculate_nayin, birth_info, affinity=birth_info.affinity)
+    except ExecutorBusyError as e:
+        raise service_busy(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -128,8 +110,7 @@ async def get_year_nayin_api(request: YearNaYinRequest) -> NaYinInfo:
     根据年份获取年命纳音
     """
     try:
-        nayin_info = get_year_nayin(request.year)
-        return nayin_info
+        return get_year_nayin(request.year)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -145,14 +126,9 @@ async def get_auxiliary(request: AuxiliaryRequest) -> AuxiliaryResponse:
     """
     try:
         birth_info = request.birth_info
-        gender = Gender.MALE if birth_info.gender == "男" else Gender.FEMALE
-        
-        birth_dt = birth_info.birth_datetime
-        if birth_info.birth_place:
-            birth_dt = convert_to_true_solar_time(birth_dt, birth_info.birth_place)
-        
-        bazi = calculate_bazi(birth_dt, gender, birth_info.birth_place)
-        auxiliary = calculate_auxiliary_from_bazi(bazi)
+        auxiliary = await run_cpu(
+            _from_bazi, calculate_auxiliary_from_bazi, birth_info, affinity=birth_info.affinity
+        )
         
         return AuxiliaryResponse(
             ming_gong={
@@ -177,6 +153,8 @@ async def get_auxiliary(request: AuxiliaryRequest) -> AuxiliaryResponse:
                 "description": auxiliary.shen_gong.description,
             },
         )
+    except ExecutorBusyError as e:
+        raise service_busy(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
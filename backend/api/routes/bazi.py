@@ -1,49 +1,52 @@
 """八字分析API路由"""
 from fastapi import APIRouter, HTTPException
-from backend.api.schemas import BaziAnalyzeRequest
-from src.core import calculate_bazi, analyze_wuxing
-from src.ai.interpreter import interpret_bazi, calculate_year_fortunes
+from backend.api.schemas import BaziAnalyzeRequest, BirthInfo
+from backend.executor import ExecutorBusyError, run_cpu, service_busy
+from src.core import get_chart
+from src.ai.interpreter import ainterpret_bazi, calculate_year_fortunes
 from src.models import FortuneReport
-from src.models.bazi_models import Gender
 
 router = APIRouter(prefix="/bazi", tags=["八字分析"])
 
 
+def _chart_and_fortunes(birth_info: BirthInfo):
+    """计算八字、五行（命盘缓存）与流年运势"""
+    bazi, wuxing, _ = get_chart(
+        birth_info.birth_datetime,
+        birth_info.gender,
+        birth_info.location,
+        true_solar_time=False
+    )
+    return bazi, wuxing, calculate_year_fortunes(bazi, wuxing, years=10)
+
+
 @router.post("/analyze", response_model=FortuneReport)
 async def analyze_bazi(request: BaziAnalyzeRequest) -> FortuneReport:
     """
     个人八字分析
-    
+
     根据出生时间计算八字、五行分析、AI解读和流年运势
     """
     try:
         birth_info = request.birth_info
-        gender_enum = Gender.MALE if birth_info.gender == "男" else Gender.FEMALE
-        
-        # 计算八字
-        bazi = calculate_bazi(
-            birth_info.birth_datetime,
-            gender_enum,
-            birth_info.birth_place
+
+        # 八字、五行与流年运势（计算进程）
+        bazi, wuxing, fortunes = await run_cpu(
+            _chart_and_fortunes, birth_info, affinity=birth_info.affinity
         )
-        
-        # 五行分析
-        wuxing = analyze_wuxing(bazi)
-        
-        # 流年运势
-        fortunes = calculate_year_fortunes(bazi, wuxing, years=10)
-        
-        # AI解读
-        interpretation = interpret_bazi(bazi, wuxing, request.api_key)
-        
+
+        # AI解读（共享的异步 LLM 客户端，不占用线程）
+        interpretation = await ainterpret_bazi(bazi, wuxing, request.api_key)
+
         return FortuneReport(
             bazi=bazi,
             wuxing=wuxing,
             interpretation=interpretation,
             year_fortunes=fortunes
         )
+    except ExecutorBusyError as e:
+        raise service_busy(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"分析失败: {str(e)}")
-
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from fastapi import APIRouter, HTTPException
-from src.core import analyze_bonefate
+from src.core import analyze_bonefate, calculate_bone_weight
 from src.models import BoneFateRequest, BoneFateResult
 
 router = APIRouter(prefix="/bonefate", tags=["称骨算命"])
@@ -43,7 +43,6 @@ async def get_weight(
     通过URL路径参数快速计算骨重
     """
     try:
-        from src.core import calculate_bone_weight
         weight = calculate_bone_weight(year, month, day, hour, is_lunar)
         return {
             "weight": weight,
@@ -1,9 +1,11 @@
 """择日分析API路由"""
 from fastapi import APIRouter, HTTPException
-from backend.api.schemas import DateSelectionRequest
-from src.core import calculate_bazi, analyze_wuxing, select_dates
-from src.models import EventType, DateRecommendation
-from src.models.bazi_models import Gender
+from backend.api.schemas import DateSelectionRequest, GroupDateSelectionRequest
+from backend.executor import ExecutorBusyError, run_cpu, service_busy
+from src.core import (
+    get_chart, select_dates, select_dates_for_group, GroupMember,
+)
+from src.models import EventType, DateRecommendation, GroupDateRecommendation
 
 router = APIRouter(prefix="/date-selection", tags=["择日分析"])
 
@@ -16,6 +18,46 @@ EVENT_MAP = {
 }
 
 
+def _event_type(name: str) -> EventType:
+    """验证事件类型"""
+    event = EVENT_MAP.get(name)
+    if not event:
+        raise ValueError(f"不支持的事件类型: {name}")
+    return event
+
+
+def _select(request: DateSelectionRequest) -> DateRecommendation:
+    """计算八字（命盘缓存）并择日"""
+    event = _event_type(request.event_type)
+    birth_info = request.birth_info
+    bazi, wuxing, _ = get_chart(
+        birth_info.birth_datetime,
+        birth_info.gender,
+        birth_info.location,
+        true_solar_time=False
+    )
+    return select_dates(bazi, wuxing, event, request.start_date, request.search_days)
+
+
+def _select_for_group(request: GroupDateSelectionRequest) -> GroupDateRecommendation:
+    """计算全部成员八字并综合择日"""
+    event = _event_type(request.event_type)
+    members = []
+    for member in request.members:
+        birth_info = member.birth_info
+        bazi, wuxing, _ = get_chart(
+            birth_info.birth_datetime,
+            birth_info.gender,
+            birth_info.location,
+            true_solar_time=False
+        )
+        members.append(GroupMember(member.name, bazi, wuxing, member.weight))
+    return select_dates_for_group(
+        members, event, request.start_date, request.search_days,
+        request.aggregation, request.veto_clash
+    )
+
+
 @router.post("/analyze", response_model=DateRecommendation)
 async def analyze_date_selection(request: DateSelectionRequest) -> DateRecommendation:
     """
@@ -24,28 +66,29 @@ async def analyze_date_selection(request: DateSelectionRequest) -> DateRecommend
     根据八字和事件类型推荐吉日
     """
     try:
-        birth_info = request.birth_info
-        gender_enum = Gender.MALE if birth_info.gender == "男" else Gender.FEMALE
-        
-        # 验证事件类型
-        event = EVENT_MAP.get(request.event_type)
-        if not event:
-            raise ValueError(f"不支持的事件类型: {request.event_type}")
-        
-        # 计算八字
-        bazi = calculate_bazi(
-            birth_info.birth_datetime,
-            gender_enum,
-            birth_info.birth_place
-        )
-        wuxing = analyze_wuxing(bazi)
-        
-        # 择日
-        result = select_dates(bazi, wuxing, event, request.start_date, request.search_days)
-        
-        return result
+        return await run_cpu(_select, request, affinity=request.birth_info.affinity)
+    except ExecutorBusyError as e:
+        raise service_busy(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"择日分析失败: {str(e)}")
 
+
+@router.post("/group", response_model=GroupDateRecommendation)
+async def analyze_group_date_selection(
+    request: GroupDateSelectionRequest,
+) -> GroupDateRecommendation:
+    """
+    多人择日分析
+
+    综合所有成员的八字推荐共同吉日，冲任一成员生肖的日期可一票否决
+    """
+    try:
+        return await run_cpu(_select_for_group, request)
+    except ExecutorBusyError as e:
+        raise service_busy(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"多人择日分析失败: {str(e)}")
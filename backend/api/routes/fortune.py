@@ -0,0 +1,124 @@
+"""运势时间线API路由"""
+import json
+from datetime import date
+from typing import Iterator
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from backend.api.schemas import BirthInfo, DailyTimelineRequest, KLineRangeRequest
+from backend.executor import ExecutorBusyError, run_cpu, service_busy
+from src.core import get_chart, daily_cycle_table, cycle_table_rows, DailyScoreRow
+from src.viz.kline_range import get_kline_range, resolve_kline_window
+
+router = APIRouter(prefix="/fortune", tags=["运势时间线"])
+
+# 默认时间线跨度与上限（年）
+DEFAULT_TIMELINE_YEARS = 100
+MAX_TIMELINE_YEARS = 150
+# 每个响应块包含的行数
+STREAM_CHUNK_ROWS = 366
+
+
+def _add_years(d: date, years: int) -> date:
+    """日期加若干年（2月29日落在平年时取2月28日）"""
+    try:
+        return d.replace(year=d.year + years)
+    except ValueError:
+        return d.replace(year=d.year + years, day=28)
+
+
+def _ndjson_chunks(rows: Iterator[DailyScoreRow]) -> Iterator[str]:
+    """将评分行按块编码为 NDJSON"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row.as_dict(), ensure_ascii=False))
+        if len(lines) >= STREAM_CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def _chart(birth_info: BirthInfo):
+    """排盘（命盘缓存），返回 (八字, 五行)"""
+    bazi, wuxing, _ = get_chart(
+        birth_info.birth_datetime, birth_info.gender, birth_info.location
+    )
+    return bazi, wuxing
+
+
+def _cycle_table(birth_info: BirthInfo) -> list[tuple]:
+    """排盘并计算六十甲子各日的评分表"""
+    return daily_cycle_table(*_chart(birth_info))
+
+
+def _kline_window(request: KLineRangeRequest) -> dict:
+    """计算可见窗口内的K线并编码为列式数组"""
+    bazi, wuxing = _chart(request.birth_info)
+    start, end, resolution = resolve_kline_window(
+        bazi, request.from_date, request.to_date, request.resolution
+    )
+    series = get_kline_range(bazi, wuxing, start, end, resolution, request.mode)
+
+    x = series.x if resolution == "year" else np.datetime_as_string(series.x, unit="D")
+    return {
+        "resolution": resolution,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "mode": series.mode,
+        "x": x.tolist(),
+        "open": series.open.tolist(),
+        "high": series.high.tolist(),
+        "low": series.low.tolist(),
+        "close": series.close.tolist(),
+        "score": series.change.tolist(),
+        "level": list(series.levels),
+    }
+
+
+@router.post("/daily/stream")
+async def stream_daily_timeline(request: DailyTimelineRequest) -> StreamingResponse:
+    """
+    终身每日运势时间线
+
+    以 NDJSON 流式返回区间内每一天的总分、等级与七维度分数，每行一天
+    """
+    try:
+        birth_info = request.birth_info
+        start = request.start_date or birth_info.birth_datetime.date()
+        end = request.end_date or _add_years(start, DEFAULT_TIMELINE_YEARS)
+        if end < start:
+            raise ValueError("结束日期不能早于起始日期")
+        if end > _add_years(start, MAX_TIMELINE_YEARS):
+            raise ValueError(f"时间线跨度不能超过{MAX_TIMELINE_YEARS}年")
+
+        # 排盘与六十甲子评分表在计算进程中完成，出错时返回完整的错误响应
+        table = await run_cpu(_cycle_table, birth_info, affinity=birth_info.affinity)
+        # 流式阶段只做查表与编码
+        rows = cycle_table_rows(table, start, end)
+    except ExecutorBusyError as e:
+        raise service_busy(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"运势时间线计算失败: {str(e)}")
+
+    return StreamingResponse(_ndjson_chunks(rows), media_type="application/x-ndjson")
+
+
+@router.post("/kline")
+async def query_kline_range(request: KLineRangeRequest) -> dict:
+    """
+    人生K线区间查询
+
+    按 from/to 只返回可见窗口内的K线（列式数组），resolution=auto 时按窗口长度
+    选择日/周/月/年粒度；整条寿命区间的序列在服务端按命盘缓存，缩放时只做切片
+    """
+    try:
+        return await run_cpu(_kline_window, request, affinity=request.birth_info.affinity)
+    except ExecutorBusyError as e:
+        raise service_busy(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"K线计算失败: {str(e)}")
@@ -0,0 +1,45 @@
+"""地理位置API路由"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from backend.api.schemas import SolarTimeRequest
+from src.core.utils import get_location_by_coordinates, get_time_correction_info, nearest_city
+
+router = APIRouter(prefix="/geo", tags=["地理位置"])
+
+
+@router.get("/nearest")
+async def get_nearest_city(
+    lat: float = Query(..., ge=-90, le=90, description="纬度"),
+    lon: float = Query(..., ge=-180, le=180, description="经度"),
+    level: Optional[str] = Query(None, pattern="^(province|city|district)$", description="限制级别"),
+    max_distance_km: Optional[float] = Query(None, gt=0, description="最远距离（公里）"),
+) -> dict:
+    """
+    由经纬度反查最近城市
+
+    网格索引查询，不扫描全部城市
+    """
+    found = nearest_city(lat, lon, level, max_distance_km)
+    if found is None:
+        raise HTTPException(status_code=404, detail="指定范围内没有城市")
+    city = found.city
+    return {
+        "name": city.name,
+        "full_name": city.full_name,
+        "province": city.province,
+        "level": city.level,
+        "longitude": city.longitude,
+        "latitude": city.latitude,
+        "distance_km": round(found.distance_km, 3),
+    }
+
+
+@router.post("/solar-time")
+async def get_solar_time(request: SolarTimeRequest) -> dict:
+    """
+    按坐标计算真太阳时
+
+    经度修正使用原始坐标，地点名称取最近城市
+    """
+    location = get_location_by_coordinates(request.latitude, request.longitude)
+    return get_time_correction_info(request.local_time, location)
@@ -1,7 +1,8 @@
 """API请求和响应模型"""
 from datetime import datetime, date
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from src.core.utils import Location, get_location_by_coordinates
 
 
 class BirthInfo(BaseModel):
@@ -9,6 +10,26 @@ class BirthInfo(BaseModel):
     birth_datetime: datetime = Field(..., description="出生时间")
     gender: str = Field(..., pattern="^(男|女)$", description="性别")
     birth_place: Optional[str] = Field(None, description="出生地点")
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="出生地纬度（与经度同时提供时优先于地点名）")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="出生地经度")
+
+    @model_validator(mode="after")
+    def _check_coordinates(self) -> "BirthInfo":
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("经纬度需同时提供")
+        return self
+
+    @property
+    def location(self) -> Optional[str | Location]:
+        """排盘用地点：有坐标时为坐标（名称取最近城市），否则为地点名"""
+        if self.latitude is not None and self.longitude is not None:
+            return get_location_by_coordinates(self.latitude, self.longitude)
+        return self.birth_place
+
+    @property
+    def affinity(self) -> tuple:
+        """计算进程亲和键：同一出生信息的请求落到同一计算进程，共用其进程内缓存"""
+        return (self.birth_datetime, self.gender, self.birth_place, self.latitude, self.longitude)
 
 
 class BaziAnalyzeRequest(BaseModel):
@@ -32,7 +53,53 @@ class DateSelectionRequest(BaseModel):
     birth_info: BirthInfo
     event_type: str = Field(..., description="事件类型: 结婚/开业/搬家/出行/签约")
     start_date: date = Field(default_factory=date.today, description="起始日期")
-    search_days: int = Field(30, ge=7, le=90, description="搜索天数")
+    search_days: int = Field(30, ge=7, le=3660, description="搜索天数（最长约10年）")
+
+
+class GroupMemberInfo(BaseModel):
+    """多人择日成员"""
+    name: str = Field(..., min_length=1, description="称呼")
+    birth_info: BirthInfo
+    weight: float = Field(1.0, ge=0, description="加权平均时的权重")
+
+
+class GroupDateSelectionRequest(BaseModel):
+    """多人择日请求"""
+    members: list[GroupMemberInfo] = Field(..., min_length=1, max_length=12)
+    event_type: str = Field(..., description="事件类型: 结婚/开业/搬家/出行/签约")
+    start_date: date = Field(default_factory=date.today, description="起始日期")
+    search_days: int = Field(30, ge=7, le=3660, description="搜索天数（最长约10年）")
+    aggregation: str = Field("min", pattern="^(min|mean)$", description="聚合方式: min/mean")
+    veto_clash: bool = Field(True, description="冲成员生肖的日期是否一票否决")
+
+    @model_validator(mode="after")
+    def _check_unique_names(self) -> "GroupDateSelectionRequest":
+        names = [m.name for m in self.members]
+        if len(set(names)) != len(names):
+            raise ValueError("成员称呼不能重复")
+        return self
+
+
+class DailyTimelineRequest(BaseModel):
+    """每日运势时间线请求"""
+    birth_info: BirthInfo
+    start_date: Optional[date] = Field(None, description="起始日期，默认出生当日")
+    end_date: Optional[date] = Field(None, description="结束日期（含），默认出生后100年")
+
+
+class KLineRangeRequest(BaseModel):
+    """人生K线区间查询请求（只取可见窗口）"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    birth_info: BirthInfo
+    from_date: Optional[date] = Field(None, alias="from", description="窗口起始日期，默认出生当日")
+    to_date: Optional[date] = Field(None, alias="to", description="窗口结束日期（含），默认寿命区间末日")
+    resolution: str = Field(
+        "auto", pattern="^(auto|day|week|month|year)$", description="粒度: auto/day/week/month/year"
+    )
+    mode: str = Field(
+        "multiplier", pattern="^(additive|multiplier)$", description="年K模式: additive/multiplier"
+    )
 
 
 class DayunRequest(BaseModel):
@@ -66,6 +133,13 @@ class AuxiliaryRequest(BaseModel):
     birth_info: BirthInfo
 
 
+class SolarTimeRequest(BaseModel):
+    """按坐标计算真太阳时请求"""
+    local_time: datetime = Field(..., description="北京时间")
+    latitude: float = Field(..., ge=-90, le=90, description="纬度")
+    longitude: float = Field(..., ge=-180, le=180, description="经度")
+
+
 class GongInfoResponse(BaseModel):
     """宫位信息响应"""
     name: str
@@ -87,4 +161,3 @@ class APIError(BaseModel):
     code: str
     message: str
     detail: Optional[str] = None
-
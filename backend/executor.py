@@ -0,0 +1,252 @@
+"""计算执行器 - 把路由中的计算与阻塞 I/O 移出事件循环
+
+- CPU 计算（排盘、流年、择日、K线等）提交到进程池，不受 GIL 限制，
+  单个慢请求不再阻塞同一 worker 上的其它请求
+- 查表类的轻量计算（年命纳音、称骨、最近城市）直接在路由中执行，
+  提交到进程池的序列化与调度开销比计算本身还大
+- 其它阻塞 I/O 提交到线程池（LLM 调用走 src.ai.client 的异步客户端，不占线程）
+- 背压：每类任务的排队长度有上限，已满时立即拒绝（路由返回 503），不无限堆积
+- 指标：提交/完成/失败/拒绝数，当前执行与排队数，排队峰值，平均等待与执行耗时
+
+进程池由多个单进程分片组成：带 affinity 的任务（通常是出生信息）固定落到同一分片，
+命盘、K线等进程内缓存按分片命中，不会在每个进程里各算一遍；不带 affinity 的任务
+交给最空闲的分片。compute_processes=0 时 CPU 任务在进程内线程池执行（共享缓存，
+但受 GIL 限制），用于开发调试。
+
+提交到进程池的函数和参数须可 pickle（模块级函数、pydantic 模型等）。
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Any, Callable, Hashable, Optional
+from fastapi import HTTPException
+from src.core.utils.config import get_settings
+from src.core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ExecutorBusyError(RuntimeError):
+    """任务排队已满"""
+
+
+def service_busy(error: ExecutorBusyError) -> HTTPException:
+    """排队已满对应的 HTTP 错误（503，提示客户端稍后重试）"""
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "1"})
+
+
+def _timed_call(func: Callable, args: tuple, kwargs: dict) -> tuple[float, float, Any]:
+    """在池中执行任务，附带开始时间与执行耗时"""
+    started = time.time()
+    t0 = time.perf_counter()
+    result = func(*args, **kwargs)
+    return started, time.perf_counter() - t0, result
+
+
+def _warm_up() -> None:
+    """计算进程启动时预先导入计算模块，避免首个请求承担导入开销"""
+    import src.core  # noqa: F401
+    import src.viz.kline_range  # noqa: F401
+
+
+class _Shard:
+    """一个执行池及其在途任务数"""
+
+    def __init__(self, factory: Callable[[], Executor], workers: int):
+        self.factory = factory
+        self.workers = workers
+        self.pending = 0
+        self._pool: Optional[Executor] = None
+
+    @property
+    def pool(self) -> Executor:
+        if self._pool is None:
+            self._pool = self.factory()
+        return self._pool
+
+    @property
+    def queued(self) -> int:
+        return max(self.pending - self.workers, 0)
+
+    def reset(self) -> None:
+        """丢弃已损坏的池（下次提交时重建）"""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+class _Lane:
+    """一类任务（cpu / io）：分片、排队上限与指标"""
+
+    def __init__(self, name: str, shards: list[_Shard], max_queue: int):
+        self.name = name
+        self.shards = shards
+        self.max_queue = max_queue
+        self.workers = sum(shard.workers for shard in shards)
+        self._lock = threading.Lock()
+        self.submitted = self.completed = self.failed = self.cancelled = self.rejected = 0
+        self.peak_queued = 0
+        self._wait_seconds = self._run_seconds = 0.0
+
+    def _pick(self, affinity: Optional[Hashable]) -> _Shard:
+        if affinity is not None:
+            return self.shards[hash(affinity) % len(self.shards)]
+        return min(self.shards, key=lambda shard: shard.pending)
+
+    def submit(self, func: Callable, args: tuple, kwargs: dict,
+               affinity: Optional[Hashable] = None) -> Future:
+        """提交任务；在途任务超过 工作数 + 排队上限 时抛出 ExecutorBusyError"""
+        with self._lock:
+            if sum(shard.pending for shard in self.shards) >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorBusyError(f"服务繁忙（{self.name} 任务队列已满），请稍后重试")
+            shard = self._pick(affinity)
+            try:
+                future = shard.pool.submit(_timed_call, func, args, kwargs)
+            except BrokenProcessPool:
+                shard.reset()
+                future = shard.pool.submit(_timed_call, func, args, kwargs)
+            shard.pending += 1
+            self.submitted += 1
+            self.peak_queued = max(self.peak_queued, sum(s.queued for s in self.shards))
+        submitted_at = time.time()
+        future.add_done_callback(lambda f: self._finish(shard, f, submitted_at))
+        return future
+
+    def _finish(self, shard: _Shard, future: Future, submitted_at: float) -> None:
+        with self._lock:
+            shard.pending -= 1
+            if future.cancelled():
+                self.cancelled += 1
+                return
+            error = future.exception()
+            if error is None:
+                started, run_seconds, _ = future.result()
+                self.completed += 1
+                self._wait_seconds += max(started - submitted_at, 0.0)
+                self._run_seconds += run_seconds
+                return
+            self.failed += 1
+            if isinstance(error, BrokenProcessPool):
+                logger.error("%s 计算进程异常退出，重建进程池", self.name)
+                shard.reset()
+
+    async def run(self, func: Callable, *args, affinity: Optional[Hashable] = None, **kwargs):
+        future = self.submit(func, args, kwargs, affinity)
+        _, _, result = await asyncio.wrap_future(future)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = sum(shard.pending for shard in self.shards)
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": min(pending, self.workers),
+                "queued": sum(shard.queued for shard in self.shards),
+                "peak_queued": self.peak_queued,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self._wait_seconds / self.completed * 1000, 3)
+                if self.completed else 0.0,
+                "avg_run_ms": round(self._run_seconds / self.completed * 1000, 3)
+                if self.completed else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        for shard in self.shards:
+            shard.shutdown(wait)
+
+
+class ComputeExecutor:
+    """计算执行器：cpu 任务走进程池，io 任务走线程池"""
+
+    def __init__(self, processes: int, threads: int, max_queue: int):
+        """
+        Args:
+            processes: 计算进程数，0 表示在进程内线程池执行
+            threads: I/O 线程数
+            max_queue: 每类任务在工作数之外允许排队的任务数
+        """
+        self.processes = processes
+        if processes > 0:
+            context = get_context("spawn")
+            cpu_shards = [
+                _Shard(lambda: ProcessPoolExecutor(1, mp_context=context, initializer=_warm_up), 1)
+                for _ in range(processes)
+            ]
+        else:
+            workers = os.cpu_count() or 1
+            cpu_shards = [_Shard(
+                lambda: ThreadPoolExecutor(workers, thread_name_prefix="compute"), workers
+            )]
+        self.cpu = _Lane("cpu", cpu_shards, max_queue)
+        self.io = _Lane("io", [_Shard(
+            lambda: ThreadPoolExecutor(threads, thread_name_prefix="api-io"), threads
+        )], max_queue)
+
+    async def run_cpu(self, func: Callable, *args, affinity: Optional[Hashable] = None, **kwargs):
+        """在计算池中执行 CPU 密集任务；affinity 相同的任务落到同一计算进程"""
+        return await self.cpu.run(func, *args, affinity=affinity, **kwargs)
+
+    async def run_io(self, func: Callable, *args, **kwargs):
+        """在线程池中执行阻塞 I/O 任务"""
+        return await self.io.run(func, *args, **kwargs)
+
+    def stats(self) -> dict:
+        return {"processes": self.processes, "cpu": self.cpu.stats(), "io": self.io.stats()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.cpu.shutdown(wait)
+        self.io.shutdown(wait)
+
+
+_executor: Optional[ComputeExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ComputeExecutor:
+    """获取全局计算执行器（首次使用时按配置创建，池在首个任务提交时启动）"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                settings = get_settings()
+                processes = settings.compute_processes
+                if processes < 0:
+                    processes = os.cpu_count() or 1
+                _executor = ComputeExecutor(
+                    processes, settings.io_threads, settings.executor_max_queue
+                )
+    return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """关闭全局计算执行器"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait)
+
+
+async def run_cpu(func: Callable, *args, affinity: Optional[Hashable] = None, **kwargs):
+    """在全局计算池中执行 CPU 密集任务"""
+    return await get_executor().run_cpu(func, *args, affinity=affinity, **kwargs)
+
+
+async def run_io(func: Callable, *args, **kwargs):
+    """在全局 I/O 线程池中执行阻塞任务"""
+    return await get_executor().run_io(func, *args, **kwargs)
@@ -1,14 +1,25 @@
 """FastAPI后端主入口"""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.api.routes import bazi, compatibility, date_selection, advanced, bonefate
+from backend.api.routes import bazi, compatibility, date_selection, advanced, bonefate, fortune, geo
+from backend.executor import get_executor, shutdown_executor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：退出时关闭计算进程池与 I/O 线程池"""
+    yield
+    shutdown_executor()
+
 
 app = FastAPI(
     title="Fortune Tracer API",
     description="生辰八字AI解读服务 - RESTful API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS配置
@@ -26,6 +37,8 @@ app.include_router(compatibility.router, prefix="/api")
 app.include_router(date_selection.router, prefix="/api")
 app.include_router(advanced.router, prefix="/api")
 app.include_router(bonefate.router, prefix="/api")
+app.include_router(fortune.router, prefix="/api")
+app.include_router(geo.router, prefix="/api")
 
 
 @app.get("/")
@@ -43,3 +56,9 @@ async def health_check():
     """健康检查"""
     return {"status": "healthy"}
 
+
+
+@app.get("/metrics/executor")
+async def executor_metrics():
+    """计算执行器指标：执行/排队数、拒绝数、平均等待与执行耗时"""
+    return get_executor().stats()
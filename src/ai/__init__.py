@@ -1,15 +1,22 @@
 """AI解读模块"""
-from .interpreter import interpret_bazi, interpret_bazi_full, calculate_year_fortunes
+from .interpreter import (
+    interpret_bazi, ainterpret_bazi, interpret_bazi_full, calculate_year_fortunes,
+    calculate_year_scores, materialize_year_details,
+)
 from .session import Session, Message, get_or_create_session
 from .chat import chat_with_llm, interpret_result
 from .config import AIConfig, get_ai_config, reset_ai_config
+from .client import complete, acomplete, close_llm_clients
 from .serializer import serialize_bazi_for_ai, serialize_for_prompt
 from .prompts import SYSTEM_PROMPT, build_analysis_prompt, build_full_analysis_prompt
 
 __all__ = [
     "interpret_bazi",
+    "ainterpret_bazi",
     "interpret_bazi_full",
     "calculate_year_fortunes",
+    "calculate_year_scores",
+    "materialize_year_details",
     "Session",
     "Message",
     "get_or_create_session",
@@ -18,6 +25,9 @@ __all__ = [
     "AIConfig",
     "get_ai_config",
     "reset_ai_config",
+    "complete",
+    "acomplete",
+    "close_llm_clients",
     "serialize_bazi_for_ai",
     "serialize_for_prompt",
     "SYSTEM_PROMPT",
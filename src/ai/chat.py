@@ -1,9 +1,15 @@
 """LLM对话模块 - 处理带上下文的对话"""
-import os
-from openai import OpenAI
+from .client import complete
+from .config import AIConfig, get_ai_config
 from .session import Session
 
 
+def _config(api_key: str | None) -> AIConfig:
+    """全局配置，指定 api_key 时覆盖"""
+    cfg = get_ai_config()
+    return cfg.with_api_key(api_key) if api_key else cfg
+
+
 def chat_with_llm(
     session: Session,
     user_message: str,
@@ -21,8 +27,8 @@ def chat_with_llm(
     Returns:
         LLM回复
     """
-    key = api_key or os.getenv("OPENAI_API_KEY")
-    if not key:
+    cfg = _config(api_key)
+    if not cfg.is_valid():
         return "请提供OpenAI API Key以启用AI对话功能。"
     
     # 添加用户消息
@@ -34,14 +40,7 @@ def chat_with_llm(
     messages.extend(session.get_messages_for_api())
     
     try:
-        client = OpenAI(api_key=key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=1000
-        )
-        reply = response.choices[0].message.content
+        reply = complete(cfg, messages, max_tokens=1000)
         session.add_message("assistant", reply)
         return reply
     except Exception as e:
@@ -65,24 +64,17 @@ def interpret_result(
     Returns:
         LLM解读结果
     """
-    key = api_key or os.getenv("OPENAI_API_KEY")
-    if not key:
+    cfg = _config(api_key)
+    if not cfg.is_valid():
         return _get_default_interpretation(feature)
     
     prompt = _build_interpret_prompt(context_data, feature)
     
     try:
-        client = OpenAI(api_key=key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "你是命理学专家，请用通俗易懂的语言进行解读。"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=800
-        )
-        return response.choices[0].message.content
+        return complete(cfg, [
+            {"role": "system", "content": "你是命理学专家，请用通俗易懂的语言进行解读。"},
+            {"role": "user", "content": prompt}
+        ], max_tokens=800)
     except Exception:
         return _get_default_interpretation(feature)
 
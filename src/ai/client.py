@@ -0,0 +1,212 @@
+"""共享的异步 LLM 客户端
+
+所有 LLM 请求都在一个后台事件循环线程中执行：
+- 按 (api_key, base_url) 复用 AsyncOpenAI 客户端及其连接池（安装 h2 时使用 HTTP/2），
+  不再每次请求新建连接、重新握手；api_key 可能来自请求参数，客户端数有上限，
+  超出时淘汰最久未用的客户端，待其在途请求结束后关闭连接池
+- 失败重试：限流（RateLimitError）优先按服务端 Retry-After 等待，连接错误、超时与 5xx
+  按指数退避加随机抖动等待，最多重试 AIConfig.max_retries 次
+- 全局并发上限：所有调用方共用一个信号量（AIConfig.max_concurrency），退避等待时不占用
+
+同步调用方（Streamlit 页面、API 的 I/O 线程）用 complete()，异步调用方用 acomplete()。
+连接池绑定在后台事件循环上，因此不论调用方在哪个线程或事件循环都能共用。
+"""
+import asyncio
+import importlib.util
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Coroutine, Optional
+import httpx
+from openai import (
+    APIConnectionError, APIStatusError, AsyncOpenAI, DefaultAsyncHttpxClient,
+    InternalServerError, RateLimitError,
+)
+from .config import AIConfig, get_ai_config
+
+# 退避基数与上限（秒）
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+# 服务端 Retry-After 的最长等待（秒）
+RETRY_AFTER_MAX = 60.0
+# 每个客户端的连接池大小
+POOL_MAX_CONNECTIONS = 32
+POOL_MAX_KEEPALIVE = 16
+POOL_KEEPALIVE_EXPIRY = 60.0
+# 共享客户端数上限（按最近使用淘汰）
+MAX_CLIENTS = 8
+
+# 可重试的错误（APITimeoutError 是 APIConnectionError 的子类）
+_RETRYABLE = (RateLimitError, APIConnectionError, InternalServerError)
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+class _PooledClient:
+    """共享客户端及其在途请求数"""
+    __slots__ = ("client", "leases", "evicted")
+
+    def __init__(self, client: AsyncOpenAI):
+        self.client = client
+        self.leases = 0
+        self.evicted = False
+
+
+# 以下状态只在后台事件循环中访问
+_clients: "OrderedDict[tuple[str, Optional[str]], _PooledClient]" = OrderedDict()
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """后台事件循环（首次使用时在守护线程中启动）"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-client", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def _submit(coro: Coroutine) -> Future:
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+
+def _new_client(api_key: str, base_url: Optional[str]) -> AsyncOpenAI:
+    """新建客户端；重试由本模块负责，客户端自身不重试"""
+    http_client = DefaultAsyncHttpxClient(
+        http2=_HTTP2,
+        limits=httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+        ),
+    )
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0, http_client=http_client)
+
+
+@asynccontextmanager
+async def _lease(api_key: str, base_url: Optional[str]) -> AsyncIterator[AsyncOpenAI]:
+    """按 (api_key, base_url) 借用共享客户端；超出上限时淘汰最久未用的客户端"""
+    key = (api_key, base_url)
+    entry = _clients.get(key)
+    if entry is None:
+        entry = _clients[key] = _PooledClient(_new_client(api_key, base_url))
+    _clients.move_to_end(key)
+    entry.leases += 1
+    while len(_clients) > MAX_CLIENTS:
+        _, old = _clients.popitem(last=False)
+        old.evicted = True
+        if old.leases == 0:
+            await old.client.close()
+    try:
+        yield entry.client
+    finally:
+        entry.leases -= 1
+        if entry.evicted and entry.leases == 0:
+            await entry.client.close()
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(get_ai_config().max_concurrency)
+    return _semaphore
+
+
+def _retry_after(error: APIStatusError) -> Optional[float]:
+    """服务端建议的等待秒数（retry-after-ms / retry-after，后者可为秒数或 HTTP 日期）"""
+    headers = error.response.headers
+    try:
+        if value := headers.get("retry-after-ms"):
+            return float(value) / 1000
+        if value := headers.get("retry-after"):
+            try:
+                return float(value)
+            except ValueError:
+                return (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def backoff_delay(attempt: int, error: Exception) -> float:
+    """
+    第 attempt 次（从 0 开始）失败后的等待秒数
+
+    指数退避取 [0, min(上限, 基数·2^attempt)] 内的随机值（full jitter），
+    限流错误带 Retry-After 时至少等待该时长
+    """
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    if isinstance(error, RateLimitError):
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(max(retry_after, 0.0), RETRY_AFTER_MAX))
+    return delay
+
+
+async def _complete(cfg: AIConfig, messages: list[dict], params: dict) -> str:
+    """在后台事件循环中执行一次对话补全（含重试与并发限制）"""
+    request = {
+        "model": cfg.model,
+        "temperature": cfg.temperature,
+        "max_tokens": cfg.max_tokens,
+        "timeout": cfg.timeout,
+        **params,
+        "messages": messages,
+    }
+    attempt = 0
+    async with _lease(cfg.api_key, cfg.base_url) as client:
+        while True:
+            try:
+                async with _get_semaphore():
+                    response = await client.chat.completions.create(**request)
+                return response.choices[0].message.content
+            except _RETRYABLE as e:
+                if attempt >= cfg.max_retries:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt, e))
+                attempt += 1
+
+
+def complete(cfg: AIConfig, messages: list[dict], **params: Any) -> str:
+    """
+    对话补全（同步，阻塞到完成）
+
+    Args:
+        cfg: AI配置（api_key、base_url、model、重试次数等）
+        messages: 消息列表
+        **params: 覆盖或追加的请求参数（如 max_tokens、response_format）
+
+    Returns:
+        回复文本；重试用尽或不可重试的错误照常抛出
+    """
+    return _submit(_complete(cfg, messages, params)).result()
+
+
+async def acomplete(cfg: AIConfig, messages: list[dict], **params: Any) -> str:
+    """对话补全（异步），参数同 complete"""
+    return await asyncio.wrap_future(_submit(_complete(cfg, messages, params)))
+
+
+async def _close_all() -> None:
+    global _semaphore
+    entries = list(_clients.values())
+    _clients.clear()
+    _semaphore = None
+    for entry in entries:
+        entry.evicted = True
+        await entry.client.close()
+
+
+def close_llm_clients() -> None:
+    """关闭全部共享客户端并重置并发上限（下次请求时按当前配置重建）"""
+    if _loop is not None:
+        _submit(_close_all()).result()
@@ -15,6 +15,7 @@ class AIConfig:
     # 请求设置
     timeout: int = 30
     max_retries: int = 2
+    max_concurrency: int = 8  # 全进程同时进行的请求数上限
     temperature: float = 0.7
     max_tokens: int = 2000
     
@@ -31,6 +32,7 @@ class AIConfig:
             model=os.getenv("AI_MODEL", "gpt-4o-mini"),
             timeout=int(os.getenv("AI_TIMEOUT", "30")),
             max_retries=int(os.getenv("AI_MAX_RETRIES", "2")),
+            max_concurrency=int(os.getenv("AI_MAX_CONCURRENCY", "8")),
             temperature=float(os.getenv("AI_TEMPERATURE", "0.7")),
             max_tokens=int(os.getenv("AI_MAX_TOKENS", "2000")),
             enabled=os.getenv("AI_ENABLED", "true").lower() == "true",
@@ -45,6 +47,7 @@ class AIConfig:
             model=self.model,
             timeout=self.timeout,
             max_retries=self.max_retries,
+            max_concurrency=self.max_concurrency,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
             enabled=self.enabled,
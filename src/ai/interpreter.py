@@ -1,9 +1,12 @@
 """AI命理解读模块 - 基于JSON中间数据的AI分析工具链"""
 import json
+from functools import partial
 from typing import Optional
-from openai import OpenAI
 from src.models import BaziChart, WuxingAnalysis, AIInterpretation, DaYunInfo
-from src.models.bazi_models import YearFortune
+from src.models.bazi_models import YearFortune, YearFortuneDetail
+# calculate_year_fortunes 用其计算分数；src.ai 也经此导出（实现位于 src.core.fortune）
+from src.core.fortune.year_scores import calculate_year_scores
+from .client import acomplete, complete
 from .config import AIConfig, get_ai_config
 from .serializer import serialize_bazi_for_ai, serialize_for_prompt
 from .prompts import SYSTEM_PROMPT, build_analysis_prompt
@@ -28,50 +31,65 @@ def interpret_bazi(
     Returns:
         AI解读结果
     """
+    request = _prepare_analysis(bazi, wuxing, api_key, dayun, config)
+    if request is None:
+        return _get_default_interpretation(bazi, wuxing)
+    cfg, messages, params = request
+    try:
+        return _parse_analysis(complete(cfg, messages, **params))
+    except Exception:
+        return _get_default_interpretation(bazi, wuxing)
+
+
+async def ainterpret_bazi(
+    bazi: BaziChart,
+    wuxing: WuxingAnalysis,
+    api_key: Optional[str] = None,
+    dayun: Optional[DaYunInfo] = None,
+    config: Optional[AIConfig] = None
+) -> AIInterpretation:
+    """使用AI解读八字（异步，供事件循环中的调用方使用），参数同 interpret_bazi"""
+    request = _prepare_analysis(bazi, wuxing, api_key, dayun, config)
+    if request is None:
+        return _get_default_interpretation(bazi, wuxing)
+    cfg, messages, params = request
+    try:
+        return _parse_analysis(await acomplete(cfg, messages, **params))
+    except Exception:
+        return _get_default_interpretation(bazi, wuxing)
+
+
+def _prepare_analysis(
+    bazi: BaziChart,
+    wuxing: WuxingAnalysis,
+    api_key: Optional[str],
+    dayun: Optional[DaYunInfo],
+    config: Optional[AIConfig]
+) -> Optional[tuple[AIConfig, list[dict], dict]]:
+    """构建AI分析请求 (配置, 消息, 请求参数)；没有可用的 API Key 时返回 None"""
     # 获取配置
     cfg = config or get_ai_config()
     if api_key:
         cfg = cfg.with_api_key(api_key)
 
     if not cfg.is_valid():
-        return _get_default_interpretation(bazi, wuxing)
+        return None
 
     # 序列化数据为JSON
     bazi_data = serialize_bazi_for_ai(bazi, wuxing, dayun)
     bazi_json = serialize_for_prompt(bazi_data)
 
-    # 调用AI分析
-    return _call_ai_analysis(bazi_json, cfg, bazi, wuxing)
-
+    params = {"response_format": {"type": "json_object"}} if cfg.use_json_mode else {}
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_analysis_prompt(bazi_json)}
+    ]
+    return cfg, messages, params
 
-def _call_ai_analysis(
-    bazi_json: str, cfg: AIConfig, bazi: BaziChart, wuxing: WuxingAnalysis
-) -> AIInterpretation:
-    """调用AI进行分析"""
-    try:
-        client_kwargs = {"api_key": cfg.api_key, "timeout": cfg.timeout}
-        if cfg.base_url:
-            client_kwargs["base_url"] = cfg.base_url
-
-        client = OpenAI(**client_kwargs)
-
-        request_kwargs = {
-            "model": cfg.model,
-            "messages": [
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": build_analysis_prompt(bazi_json)}
-            ],
-            "temperature": cfg.temperature,
-            "max_tokens": cfg.max_tokens,
-        }
-        if cfg.use_json_mode:
-            request_kwargs["response_format"] = {"type": "json_object"}
 
-        response = client.chat.completions.create(**request_kwargs)
-        result = json.loads(response.choices[0].message.content)
-        return AIInterpretation(**result)
-    except Exception:
-        return _get_default_interpretation(bazi, wuxing)
+def _parse_analysis(content: str) -> AIInterpretation:
+    """解析AI返回的JSON解读"""
+    return AIInterpretation(**json.loads(content))
 
 
 def interpret_bazi_full(
@@ -108,22 +126,12 @@ def _call_ai_full_analysis(
     """调用AI进行完整分析"""
     from .prompts import build_full_analysis_prompt
     try:
-        client_kwargs = {"api_key": cfg.api_key, "timeout": cfg.timeout}
-        if cfg.base_url:
-            client_kwargs["base_url"] = cfg.base_url
-
-        client = OpenAI(**client_kwargs)
-        response = client.chat.completions.create(
-            model=cfg.model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": build_full_analysis_prompt(bazi_json)}
-            ],
-            temperature=cfg.temperature,
-            max_tokens=cfg.max_tokens,
-            response_format={"type": "json_object"} if cfg.use_json_mode else None,
-        )
-        result = json.loads(response.choices[0].message.content)
+        params = {"response_format": {"type": "json_object"}} if cfg.use_json_mode else {}
+        content = complete(cfg, [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": build_full_analysis_prompt(bazi_json)}
+        ], **params)
+        result = json.loads(content)
         return AIInterpretation(**result)
     except Exception:
         return _get_full_default_interpretation(bazi, wuxing, all_analysis)
@@ -248,60 +256,28 @@ def _get_default_interpretation(bazi: BaziChart, wuxing: WuxingAnalysis) -> AIIn
     return _get_full_default_interpretation(bazi, wuxing, None)
 
 
-def _calculate_year_score(
-    year: int, age: int, year_wx: str, year_zhi: str,
-    bazi: BaziChart, wuxing: WuxingAnalysis
-) -> float:
-    """基于命理规则计算流年分数
-
-    计算因素：
-    1. 喜用神加分（+15-20），忌神减分（-10-15）
-    2. 干支冲合关系（六合+8，六冲-12，刑-8）
-    3. 五行生克关系（被生+5，被克-8）
-    4. 年龄阶段微调（青年中年运势基数略高）
-    """
-    from src.core.bazi.constants import DIZHI_LIUHE, DIZHI_LIUCHONG, DIZHI_XING
-
-    # 基础分60分（对应"平"级别）
-    score = 60.0
-
-    # 1. 喜忌判断（核心因素）
-    favorable_wx = [w.value for w in wuxing.favorable]
-    unfavorable_wx = [w.value for w in wuxing.unfavorable]
-
-    if year_wx in favorable_wx:
-        score += 18  # 喜神年大幅加分
-    elif year_wx in unfavorable_wx:
-        score -= 12  # 忌神年减分
-
-    # 2. 地支关系分析
-    bazi_zhis = [
-        bazi.year_pillar.dizhi.value,
-        bazi.month_pillar.dizhi.value,
-        bazi.day_pillar.dizhi.value,
-        bazi.hour_pillar.dizhi.value,
-    ]
-
-    for zhi in bazi_zhis:
-        pair = tuple(sorted([year_zhi, zhi]))
-        if pair in DIZHI_LIUHE or (pair[1], pair[0]) in DIZHI_LIUHE:
-            score += 6  # 六合加分
-        if pair in DIZHI_LIUCHONG or (pair[1], pair[0]) in DIZHI_LIUCHONG:
-            score -= 10  # 六冲减分（冲日支影响更大）
-            if zhi == bazi.day_pillar.dizhi.value:
-                score -= 5  # 冲日支额外减分
-        if pair in DIZHI_XING or (pair[1], pair[0]) in DIZHI_XING:
-            score -= 6  # 刑减分
-
-    # 3. 年龄阶段微调
-    if 25 <= age <= 50:
-        score += 3  # 壮年期基数略高
-    elif age < 10 or age > 75:
-        score -= 2  # 幼年老年微调
+def _build_year_detail(
+    year: int, age: int, score: float, bazi: BaziChart, wuxing: WuxingAnalysis
+) -> YearFortuneDetail:
+    """生成单年详细解读"""
+    from src.core.fortune.fortune_interpreter import generate_year_detail
 
-    # 4. 确保分数在合理范围且与评级匹配
-    # 30-95分，避免极端值过多
-    return round(min(max(score, 32), 93), 1)
+    detail_data = generate_year_detail(year, age, score, bazi, wuxing)
+    return YearFortuneDetail(
+        level=detail_data["level"],
+        emoji=detail_data["emoji"],
+        wuxing_effect=detail_data["wuxing_effect"],
+        ganzhi_relations=detail_data["ganzhi_relations"],
+        career=detail_data["career"],
+        love=detail_data["love"],
+        health=detail_data["health"],
+        wealth=detail_data["wealth"],
+        suitable=detail_data["suitable"],
+        unsuitable=detail_data["unsuitable"],
+        score_factors=detail_data.get("score_factors", []),
+        is_favorable_year=detail_data.get("is_favorable_year", False),
+        wuxing_relation=detail_data.get("wuxing_relation", ""),
+    )
 
 
 def calculate_year_fortunes(
@@ -310,56 +286,43 @@ def calculate_year_fortunes(
     years: int = 91,
     with_detail: bool = True
 ) -> list[YearFortune]:
-    """计算流年运势（从出生到指定年数）"""
+    """计算流年运势（从出生到指定年数）
+
+    分数一次性向量化计算；with_detail=False 时不生成解读（detail 为 None），
+    调用 YearFortune.get_detail() 时才按需生成
+    """
     from src.core.bazi.constants import TIANGAN, DIZHI, TIANGAN_WUXING
-    from src.core.fortune.fortune_interpreter import generate_year_detail
-    from src.models.bazi_models import YearFortuneDetail
+    from src.core.fortune.fortune_data import get_fortune_level
 
     birth_year = bazi.birth_datetime.year
+    scores = calculate_year_scores(bazi, wuxing, years).tolist()
     fortunes = []
 
-    for age in range(years):
+    for age, score in enumerate(scores):
         year = birth_year + age
-        gan_idx = (year - 4) % 10
-        zhi_idx = (year - 4) % 12
-        year_gan = TIANGAN[gan_idx]
-        year_zhi = DIZHI[zhi_idx]
-        ganzhi = f"{year_gan}{year_zhi}"
-        year_wx = TIANGAN_WUXING[year_gan]
-
-        # 基于命理规则计算分数
-        score = _calculate_year_score(
-            year, age, year_wx, year_zhi, bazi, wuxing
-        )
+        year_gan = TIANGAN[(year - 4) % 10]
+        ganzhi = f"{year_gan}{DIZHI[(year - 4) % 12]}"
 
-        detail = None
-        if with_detail:
-            detail_data = generate_year_detail(year, age, score, bazi, wuxing)
-            detail = YearFortuneDetail(
-                level=detail_data["level"],
-                emoji=detail_data["emoji"],
-                wuxing_effect=detail_data["wuxing_effect"],
-                ganzhi_relations=detail_data["ganzhi_relations"],
-                career=detail_data["career"],
-                love=detail_data["love"],
-                health=detail_data["health"],
-                wealth=detail_data["wealth"],
-                suitable=detail_data["suitable"],
-                unsuitable=detail_data["unsuitable"],
-                score_factors=detail_data.get("score_factors", []),
-                is_favorable_year=detail_data.get("is_favorable_year", False),
-                wuxing_relation=detail_data.get("wuxing_relation", ""),
-            )
-
-        fortunes.append(YearFortune(
+        fortune = YearFortune(
             year=year,
             score=score,
             description=f"{age}岁 {ganzhi}年",
             age=age,
             ganzhi=ganzhi,
-            wuxing=year_wx,
-            detail=detail
-        ))
+            wuxing=TIANGAN_WUXING[year_gan],
+            level=get_fortune_level(score)[0],
+            detail=_build_year_detail(year, age, score, bazi, wuxing) if with_detail else None,
+        )
+        if not with_detail:
+            fortune._detail_factory = partial(_build_year_detail, year, age, score, bazi, wuxing)
+        fortunes.append(fortune)
 
     return fortunes
 
+
+def materialize_year_details(fortunes: list[YearFortune]) -> list[YearFortune]:
+    """带完整解读的流年列表（导出完整报告前使用），返回副本，不修改传入的共享对象"""
+    return [
+        f if f.detail is not None else f.model_copy(update={"detail": f.get_detail()})
+        for f in fortunes
+    ]
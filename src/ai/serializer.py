@@ -121,7 +121,7 @@ def _serialize_dayun(dayun: DaYunInfo) -> dict:
 
 
 def _serialize_fortunes(fortunes: list[YearFortune], count: int) -> list[dict]:
-    """序列化流年运势"""
+    """序列化流年运势（仅前 count 年进入提示词，只为这些年份生成解读）"""
     return [
         {
             "year": f.year,
@@ -129,10 +129,11 @@ def _serialize_fortunes(fortunes: list[YearFortune], count: int) -> list[dict]:
             "ganzhi": f.ganzhi,
             "wuxing": f.wuxing,
             "score": f.score,
-            "level": f.detail.level if f.detail else None,
-            "suitable": f.detail.suitable if f.detail else [],
+            "level": f.level or None,
+            "suitable": detail.suitable if detail else [],
         }
         for f in fortunes[:count]
+        for detail in (f.get_detail(),)
     ]
 
 
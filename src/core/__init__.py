@@ -6,10 +6,12 @@
 - analysis/: 专项分析（配对、择日、称骨算命）
 - ziwei/: 紫微斗数（星盘计算、宫位分析）
 - utils/: 工具模块（配置、日志、缓存、历法、城市）
+- pipeline.py: 全量分析流水线（按依赖图并发计算并整体缓存）
 """
 # 八字核心计算
 from src.core.bazi import (
-    calculate_bazi, analyze_wuxing, analyze_shishen,
+    calculate_bazi, calculate_bazi_batch, analyze_wuxing, analyze_shishen,
+    get_chart, CachedChart, chart_cache_stats, clear_chart_cache,
     calculate_shensha, calculate_nayin, get_year_nayin,
     calculate_ming_gong, calculate_tai_yuan, calculate_shen_gong,
     calculate_auxiliary, calculate_auxiliary_from_bazi,
@@ -20,11 +22,12 @@ from src.core.fortune import (
     get_jieqi_month, is_before_lichun, get_jieqi_for_year,
     calculate_daily_fortune, calculate_three_days_fortune,
     generate_daily_fortune_report, calculate_hour_fortunes, get_lucky_hours,
+    daily_fortune_timeline, daily_cycle_table, cycle_table_rows, DailyScoreRow,
     generate_year_detail, generate_dayun_detail,
 )
 # 专项分析
 from src.core.analysis import (
-    calculate_compatibility, select_dates,
+    calculate_compatibility, select_dates, select_dates_for_group, GroupMember,
     calculate_bone_weight, get_bone_poem, get_weight_level, analyze_bonefate,
 )
 # 工具模块
@@ -37,14 +40,25 @@ from src.core.utils import (
 )
 # 紫微斗数
 from src.core.ziwei import calculate_ziwei_chart, generate_ziwei_analysis
+# 全量分析流水线
+from src.core.pipeline import (
+    compute_full_analysis, BirthInput, FullAnalysis, ALL_STAGES,
+)
 
 __all__ = [
     # 核心计算
     "calculate_bazi",
+    "calculate_bazi_batch",
     "analyze_wuxing",
+    "get_chart",
+    "CachedChart",
+    "chart_cache_stats",
+    "clear_chart_cache",
     "solar_to_lunar",
     "calculate_compatibility",
     "select_dates",
+    "select_dates_for_group",
+    "GroupMember",
     "calculate_dayun",
     "get_current_dayun",
     "analyze_shishen",
@@ -94,8 +108,17 @@ __all__ = [
     "generate_daily_fortune_report",
     "calculate_hour_fortunes",
     "get_lucky_hours",
+    "daily_fortune_timeline",
+    "daily_cycle_table",
+    "cycle_table_rows",
+    "DailyScoreRow",
     # 紫微斗数
     "calculate_ziwei_chart",
     "generate_ziwei_analysis",
+    # 全量分析流水线
+    "compute_full_analysis",
+    "BirthInput",
+    "FullAnalysis",
+    "ALL_STAGES",
 ]
 
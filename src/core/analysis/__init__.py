@@ -1,6 +1,8 @@
 """专项分析模块"""
 from src.core.analysis.compatibility import calculate_compatibility
-from src.core.analysis.date_selection import select_dates
+from src.core.analysis.date_selection import (
+    select_dates, select_dates_for_group, GroupMember,
+)
 from src.core.analysis.bonefate import (
     calculate_bone_weight,
     get_bone_poem,
@@ -12,7 +14,7 @@ __all__ = [
     # 配对
     "calculate_compatibility",
     # 择日
-    "select_dates",
+    "select_dates", "select_dates_for_group", "GroupMember",
     # 称骨算命
     "calculate_bone_weight", "get_bone_poem",
     "get_weight_level", "analyze_bonefate",
@@ -4,21 +4,13 @@ from src.models.compatibility_models import (
     CompatibilityResult, WuxingCompatibility, GanZhiRelations,
     CompatibilityAdvice, RelationshipType
 )
-from src.core.bazi.constants import (
-    TIANGAN_HE, TIANGAN_CHONG, DIZHI_LIUHE, DIZHI_LIUCHONG,
-    DIZHI_SANHE, DIZHI_XING, WUXING_SHENG, WUXING_KE
+from src.core.bazi.constants import TIANGAN, DIZHI, WUXING_SHENG, WUXING_KE
+from src.core.bazi.packed import PackedChart, pack
+from src.core.bazi.relations import (
+    GAN_HE, GAN_CHONG, ZHI_LIUHE, ZHI_LIUCHONG, ZHI_XING
 )
 
 
-def _check_pair(pairs_dict: dict, a: str, b: str) -> tuple | None:
-    """检查两个元素是否在配对字典中"""
-    if (a, b) in pairs_dict:
-        return (a, b), pairs_dict[(a, b)]
-    if (b, a) in pairs_dict:
-        return (b, a), pairs_dict[(b, a)]
-    return None
-
-
 def _analyze_wuxing_compat(wx1: WuxingAnalysis, wx2: WuxingAnalysis) -> WuxingCompatibility:
     """分析五行互补性"""
     c1, c2 = wx1.counts.to_dict(), wx2.counts.to_dict()
@@ -50,48 +42,49 @@ def _analyze_wuxing_compat(wx1: WuxingAnalysis, wx2: WuxingAnalysis) -> WuxingCo
     )
 
 
-def _analyze_ganzhi_relations(bazi1: BaziChart, bazi2: BaziChart) -> GanZhiRelations:
+def _analyze_ganzhi_relations(
+    bazi1: BaziChart | PackedChart, bazi2: BaziChart | PackedChart
+) -> GanZhiRelations:
     """分析天干地支关系"""
-    pillars1 = [bazi1.year_pillar, bazi1.month_pillar, bazi1.day_pillar, bazi1.hour_pillar]
-    pillars2 = [bazi2.year_pillar, bazi2.month_pillar, bazi2.day_pillar, bazi2.hour_pillar]
+    packed1, packed2 = pack(bazi1), pack(bazi2)
     
     tiangan_he, tiangan_chong = [], []
     dizhi_he, dizhi_chong, dizhi_xing = [], [], []
     
-    for p1 in pillars1:
-        for p2 in pillars2:
-            g1, g2 = p1.tiangan.value, p2.tiangan.value
-            z1, z2 = p1.dizhi.value, p2.dizhi.value
+    for i1, j1 in zip(packed1.gans, packed1.zhis):
+        for i2, j2 in zip(packed2.gans, packed2.zhis):
+            g1, g2 = TIANGAN[i1], TIANGAN[i2]
+            z1, z2 = DIZHI[j1], DIZHI[j2]
             
             # 天干合
-            if result := _check_pair(TIANGAN_HE, g1, g2):
+            if desc := GAN_HE[i1][i2]:
                 tiangan_he.append(RelationshipType(
                     relation="天干合", elements=[g1, g2],
-                    score_impact=8, description=result[1]
+                    score_impact=8, description=desc
                 ))
             # 天干冲
-            if result := _check_pair(TIANGAN_CHONG, g1, g2):
+            if desc := GAN_CHONG[i1][i2]:
                 tiangan_chong.append(RelationshipType(
                     relation="天干冲", elements=[g1, g2],
-                    score_impact=-5, description=result[1]
+                    score_impact=-5, description=desc
                 ))
             # 地支合
-            if result := _check_pair(DIZHI_LIUHE, z1, z2):
+            if desc := ZHI_LIUHE[j1][j2]:
                 dizhi_he.append(RelationshipType(
                     relation="六合", elements=[z1, z2],
-                    score_impact=10, description=f"合化{result[1]}"
+                    score_impact=10, description=f"合化{desc}"
                 ))
             # 地支冲
-            if result := _check_pair(DIZHI_LIUCHONG, z1, z2):
+            if desc := ZHI_LIUCHONG[j1][j2]:
                 dizhi_chong.append(RelationshipType(
                     relation="六冲", elements=[z1, z2],
-                    score_impact=-8, description=result[1]
+                    score_impact=-8, description=desc
                 ))
             # 地支刑
-            if result := _check_pair(DIZHI_XING, z1, z2):
+            if desc := ZHI_XING[j1][j2]:
                 dizhi_xing.append(RelationshipType(
                     relation="相刑", elements=[z1, z2],
-                    score_impact=-6, description=result[1]
+                    score_impact=-6, description=desc
                 ))
     
     return GanZhiRelations(
@@ -1,11 +1,18 @@
 """择日计算模块"""
-from datetime import date, timedelta, datetime
+import heapq
+from datetime import date, timedelta
+from typing import Iterator, NamedTuple, Sequence
+import numpy as np
 from src.models import BaziChart, WuxingAnalysis
 from src.models.date_selection_models import (
-    EventType, DayQuality, DayInfo, DateRecommendation
+    EventType, DayQuality, DayInfo, DateRecommendation,
+    GroupDayInfo, GroupDateRecommendation,
 )
-from src.core.bazi.constants import TIANGAN, DIZHI, TIANGAN_WUXING, DIZHI_LIUCHONG
-from src.core.bazi.pillars import _get_day_pillar
+from src.core.bazi.constants import TIANGAN, DIZHI, TIANGAN_WUXING
+from src.core.bazi.packed import PackedChart, ZHI_INDEX, pack
+from src.core.bazi.pillars import _day_cycle_index
+from src.core.bazi.relations import ZHI_CHONG_PARTNER
+from src.core.utils.hashing import stable_noise
 
 # 事件与五行关系
 EVENT_WUXING = {
@@ -25,6 +32,13 @@ DEFAULT_SUITABLE = {
     EventType.SIGNING: ["签约", "交易", "立券", "会友", "求财"],
 }
 
+# 结果保留的吉日/凶日数量
+TOP_RECOMMENDED = 10
+TOP_AVOIDED = 5
+
+_GOOD_QUALITIES = (DayQuality.EXCELLENT, DayQuality.GOOD)
+_BAD_QUALITIES = (DayQuality.BAD, DayQuality.TERRIBLE)
+
 # 地支对应生肖
 DIZHI_SHENGXIAO = {
     "子": "鼠", "丑": "牛", "寅": "虎", "卯": "兔",
@@ -35,12 +49,9 @@ DIZHI_SHENGXIAO = {
 
 def _get_clash_zodiac(dizhi: str) -> str:
     """获取冲的生肖"""
-    for (a, b), _ in DIZHI_LIUCHONG.items():
-        if a == dizhi:
-            return DIZHI_SHENGXIAO.get(b, "")
-        if b == dizhi:
-            return DIZHI_SHENGXIAO.get(a, "")
-    return ""
+    if dizhi not in ZHI_INDEX:
+        return ""
+    return DIZHI_SHENGXIAO[DIZHI[ZHI_CHONG_PARTNER[ZHI_INDEX[dizhi]]]]
 
 
 def _calculate_day_score(
@@ -70,22 +81,22 @@ def _calculate_day_score(
         score -= 15
     
     # 随机因素（模拟黄历复杂计算）
-    score += (hash(day_pillar_gz) % 15) - 7
+    score += stable_noise(day_pillar_gz, 15) - 7
     score = max(20, min(95, score))
-    
-    # 确定质量
+    return score, _score_quality(score)
+
+
+def _score_quality(score: int) -> DayQuality:
+    """由得分确定质量"""
     if score >= 85:
-        quality = DayQuality.EXCELLENT
-    elif score >= 70:
-        quality = DayQuality.GOOD
-    elif score >= 50:
-        quality = DayQuality.NEUTRAL
-    elif score >= 35:
-        quality = DayQuality.BAD
-    else:
-        quality = DayQuality.TERRIBLE
-    
-    return score, quality
+        return DayQuality.EXCELLENT
+    if score >= 70:
+        return DayQuality.GOOD
+    if score >= 50:
+        return DayQuality.NEUTRAL
+    if score >= 35:
+        return DayQuality.BAD
+    return DayQuality.TERRIBLE
 
 
 def _get_suitable_avoid(
@@ -107,6 +118,47 @@ def _get_suitable_avoid(
     return suitable, avoid
 
 
+def _cycle_scores(
+    wuxing: WuxingAnalysis, event: EventType
+) -> list[tuple[int, DayQuality]]:
+    """六十甲子各日的得分与质量（按序号，0 为甲子）"""
+    return [
+        _calculate_day_score(TIANGAN[k % 10] + DIZHI[k % 12], wuxing, event)
+        for k in range(60)
+    ]
+
+
+def _scan_days(start_date: date, days: int) -> Iterator[tuple[int, date, int]]:
+    """逐日产出 (偏移, 日期, 日柱序号)，同月内序号逐日加一，每月只套用一次日柱公式"""
+    one_day = timedelta(days=1)
+    current, month, k = start_date, None, 0
+    for i in range(days):
+        if current.month != month:
+            month = current.month
+            k = _day_cycle_index(current.year, current.month, current.day)
+        yield i, current, k
+        current += one_day
+        k = (k + 1) % 60
+
+
+def _build_day_info(
+    current: date, k: int, score: int, quality: DayQuality, event: EventType
+) -> DayInfo:
+    """构造单日信息"""
+    ganzhi = TIANGAN[k % 10] + DIZHI[k % 12]
+    suitable, avoid = _get_suitable_avoid(event, quality)
+    return DayInfo(
+        date=current,
+        ganzhi=ganzhi,
+        quality=quality,
+        score=score,
+        suitable=suitable,
+        avoid=avoid,
+        clash_zodiac=DIZHI_SHENGXIAO[DIZHI[ZHI_CHONG_PARTNER[k % 12]]],
+        analysis=f"{ganzhi}日，{quality.value}"
+    )
+
+
 def select_dates(
     bazi: BaziChart,
     wuxing: WuxingAnalysis,
@@ -114,45 +166,155 @@ def select_dates(
     start_date: date,
     days: int = 30
 ) -> DateRecommendation:
-    """择日推荐"""
-    recommended, avoided = [], []
-    
-    for i in range(days):
-        current = start_date + timedelta(days=i)
-        dt = datetime(current.year, current.month, current.day, 12)
-        pillar = _get_day_pillar(dt)
-        ganzhi = pillar.display
-        
-        score, quality = _calculate_day_score(ganzhi, wuxing, event)
-        suitable, avoid = _get_suitable_avoid(event, quality)
-        clash = _get_clash_zodiac(pillar.dizhi.value)
-        
-        day_info = DayInfo(
-            date=current,
-            ganzhi=ganzhi,
-            quality=quality,
-            score=score,
-            suitable=suitable,
-            avoid=avoid,
-            clash_zodiac=clash,
-            analysis=f"{ganzhi}日，{quality.value}"
-        )
-        
-        if quality in [DayQuality.EXCELLENT, DayQuality.GOOD]:
-            recommended.append(day_info)
-        elif quality in [DayQuality.BAD, DayQuality.TERRIBLE]:
-            avoided.append(day_info)
-    
-    # 排序
-    recommended.sort(key=lambda x: x.score, reverse=True)
-    avoided.sort(key=lambda x: x.score)
-    
-    summary = f"未来{days}天内，推荐{len(recommended)}个吉日，需避开{len(avoided)}个凶日"
-    
+    """
+    择日推荐
+
+    六十甲子得分每次只算一遍，逐日扫描时查表；
+    吉日/凶日各用定长堆保留前 TOP_RECOMMENDED / TOP_AVOIDED 个，
+    仅为最终入选的日期构造 DayInfo，可扫描数年的区间。
+    """
+    table = _cycle_scores(wuxing, event)
+    # 吉日堆：保留高分、同分取较早日期；凶日堆：保留低分、同分取较早日期
+    recommended: list[tuple[int, int, date, int]] = []
+    avoided: list[tuple[int, int, date, int]] = []
+    n_recommended = n_avoided = 0
+
+    for i, current, k in _scan_days(start_date, days):
+        score, quality = table[k]
+        if quality in _GOOD_QUALITIES:
+            n_recommended += 1
+            item = (score, -i, current, k)
+            if len(recommended) < TOP_RECOMMENDED:
+                heapq.heappush(recommended, item)
+            elif item > recommended[0]:
+                heapq.heapreplace(recommended, item)
+        elif quality in _BAD_QUALITIES:
+            n_avoided += 1
+            item = (-score, -i, current, k)
+            if len(avoided) < TOP_AVOIDED:
+                heapq.heappush(avoided, item)
+            elif item > avoided[0]:
+                heapq.heapreplace(avoided, item)
+
+    recommended_dates = [
+        _build_day_info(current, k, *table[k], event)
+        for _, _, current, k in sorted(recommended, reverse=True)
+    ]
+    avoid_dates = [
+        _build_day_info(current, k, *table[k], event)
+        for _, _, current, k in sorted(avoided, reverse=True)
+    ]
+
+    summary = f"未来{days}天内，推荐{n_recommended}个吉日，需避开{n_avoided}个凶日"
+
     return DateRecommendation(
         event_type=event,
-        recommended_dates=recommended[:10],
-        avoid_dates=avoided[:5],
+        recommended_dates=recommended_dates,
+        avoid_dates=avoid_dates,
         summary=summary
     )
 
+
+# 多人择日的聚合方式
+AGGREGATIONS = ("min", "mean")
+
+
+class GroupMember(NamedTuple):
+    """多人择日成员"""
+    name: str
+    bazi: BaziChart | PackedChart
+    wuxing: WuxingAnalysis
+    weight: float = 1.0
+
+
+def _group_day_info(
+    current: date, k: int, score: int, quality: DayQuality, event: EventType,
+    member_scores: dict[str, int], clash_members: list[str]
+) -> GroupDayInfo:
+    """构造多人择日的单日信息"""
+    base = _build_day_info(current, k, score, quality, event)
+    analysis = base.analysis
+    if clash_members:
+        analysis = f"{base.ganzhi}日，冲{'、'.join(clash_members)}，{quality.value}"
+    return GroupDayInfo(
+        **base.model_dump(exclude={"analysis"}), analysis=analysis,
+        member_scores=member_scores, clash_members=clash_members,
+    )
+
+
+def select_dates_for_group(
+    charts: Sequence[GroupMember],
+    event: EventType,
+    start_date: date,
+    days: int = 30,
+    aggregation: str = "min",
+    veto_clash: bool = True,
+) -> GroupDateRecommendation:
+    """
+    多人择日推荐
+
+    各成员的六十甲子得分表拼成矩阵，按日柱序号一次取出全部成员×全部日期的得分，
+    再按 aggregation 聚合：min 取最低分（人人都好才算好），mean 按成员权重加权平均。
+    veto_clash 为真时，日支冲某成员年支（冲生肖）的日期不入吉日，并优先列入凶日。
+    各成员得分与被冲成员按称呼区分，称呼须唯一。
+    """
+    if not charts:
+        raise ValueError("至少需要一位成员")
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"不支持的聚合方式: {aggregation}")
+
+    names = [m.name for m in charts]
+    if len(set(names)) != len(names):
+        raise ValueError("成员称呼不能重复")
+    weights = np.array([m.weight for m in charts], dtype=float)
+    if (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError("成员权重必须非负且不全为零")
+
+    tables = np.array([
+        [score for score, _ in _cycle_scores(m.wuxing, event)] for m in charts
+    ])
+    ks = np.fromiter((k for _, _, k in _scan_days(start_date, days)), dtype=np.intp, count=days)
+    scores = tables[:, ks]
+
+    if aggregation == "min":
+        group_scores = scores.min(axis=0)
+    else:
+        group_scores = np.rint(weights @ scores / weights.sum()).astype(int)
+
+    year_zhis = np.array([pack(m.bazi).year_zhi for m in charts])
+    clash_zhis = np.asarray(ZHI_CHONG_PARTNER)[ks % 12]
+    clashes = clash_zhis[None, :] == year_zhis[:, None]
+    vetoed = clashes.any(axis=0) if veto_clash else np.zeros(days, dtype=bool)
+
+    good = (group_scores >= 70) & ~vetoed
+    bad = (group_scores < 50) | vetoed
+    offsets = np.arange(days)
+
+    # 吉日：高分在前、同分取较早；凶日：被冲日优先，其次低分在前、同分取较早
+    good_idx = offsets[good][np.lexsort((offsets[good], -group_scores[good]))][:TOP_RECOMMENDED]
+    bad_idx = offsets[bad][np.lexsort((offsets[bad], group_scores[bad], ~vetoed[bad]))][:TOP_AVOIDED]
+
+    def day_info(i: int) -> GroupDayInfo:
+        score = int(group_scores[i])
+        quality = DayQuality.TERRIBLE if vetoed[i] else _score_quality(score)
+        return _group_day_info(
+            start_date + timedelta(days=int(i)), int(ks[i]), score, quality, event,
+            {name: int(s) for name, s in zip(names, scores[:, i])},
+            [name for name, c in zip(names, clashes[:, i]) if c],
+        )
+
+    summary = (
+        f"{len(charts)}人共同择日，未来{days}天内，推荐{int(good.sum())}个吉日，"
+        f"需避开{int(bad.sum())}个凶日"
+    )
+    if veto_clash:
+        summary += f"（其中{int(vetoed.sum())}日冲犯成员生肖）"
+
+    return GroupDateRecommendation(
+        event_type=event,
+        members=names,
+        aggregation=aggregation,
+        recommended_dates=[day_info(i) for i in good_idx],
+        avoid_dates=[day_info(i) for i in bad_idx],
+        summary=summary,
+    )
@@ -1,6 +1,10 @@
 """八字核心计算模块"""
-from src.core.bazi.pillars import calculate_bazi
+from src.core.bazi.pillars import calculate_bazi, calculate_bazi_batch, BaziBatch
+from src.core.bazi.packed import PackedChart, pack
 from src.core.bazi.wuxing import analyze_wuxing
+from src.core.bazi.chart_cache import (
+    get_chart, CachedChart, chart_cache_stats, clear_chart_cache,
+)
 from src.core.bazi.shishen import analyze_shishen, _get_shishen, _is_yang_gan
 from src.core.bazi.shensha import calculate_shensha
 from src.core.bazi.nayin import calculate_nayin, get_year_nayin, get_nayin, get_nayin_wuxing
@@ -14,12 +18,15 @@ from src.core.bazi.auxiliary import (
 from src.core.bazi.constants import (
     TIANGAN, DIZHI, TIANGAN_WUXING, DIZHI_WUXING,
     WUXING_SHENG, WUXING_KE, DIZHI_CANGAN,
-    DIZHI_LIUHE, DIZHI_LIUCHONG, DIZHI_XING,
+    DIZHI_LIUHE, DIZHI_LIUCHONG, DIZHI_XING, DIZHI_LIUHAI,
 )
 
 __all__ = [
     # 核心计算
-    "calculate_bazi", "analyze_wuxing", "analyze_shishen",
+    "calculate_bazi", "calculate_bazi_batch", "BaziBatch", "PackedChart", "pack",
+    "analyze_wuxing", "analyze_shishen",
+    # 命盘缓存
+    "get_chart", "CachedChart", "chart_cache_stats", "clear_chart_cache",
     "calculate_shensha", "calculate_nayin", "get_year_nayin",
     # 内部函数（供其他模块使用）
     "_get_shishen", "_is_yang_gan", "get_nayin", "get_nayin_wuxing",
@@ -29,6 +36,6 @@ __all__ = [
     # 常量
     "TIANGAN", "DIZHI", "TIANGAN_WUXING", "DIZHI_WUXING",
     "WUXING_SHENG", "WUXING_KE", "DIZHI_CANGAN",
-    "DIZHI_LIUHE", "DIZHI_LIUCHONG", "DIZHI_XING",
+    "DIZHI_LIUHE", "DIZHI_LIUCHONG", "DIZHI_XING", "DIZHI_LIUHAI",
 ]
 
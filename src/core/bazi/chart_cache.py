@@ -0,0 +1,122 @@
+"""命盘缓存 - 按规范化的出生信息缓存排盘结果
+
+同一用户的多个分析请求（大运、十神、神煞、纳音、宫位等）共用一次
+真太阳时换算 + calculate_bazi + analyze_wuxing。
+键为规范化后的 (出生时间, 性别, 地点, 是否真太阳时, 节气模式)，
+LRU + TTL 淘汰，并提供命中统计。FastAPI 路由、Streamlit 页面与批处理共用。
+"""
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+from src.models import BaziChart, Gender, WuxingAnalysis
+from src.core.bazi.pillars import calculate_bazi
+from src.core.bazi.wuxing import analyze_wuxing
+from src.core.utils.cache import BoundedCache, get_cache
+from src.core.utils.config import get_settings
+from src.core.utils.solar_time import Location, convert_to_true_solar_time
+
+# 排盘结果版本：排盘或五行算法变更时递增，使持久化缓存中的旧结果失效
+CHART_CACHE_VERSION = 1
+
+# 坐标地点的经纬度保留位数（约 10 米），避免 GPS 抖动使缓存失效
+_COORDINATE_DIGITS = 4
+
+# 带时区的出生时间统一换算为北京时间
+_BEIJING = timezone(timedelta(hours=8))
+
+
+class ChartKey(NamedTuple):
+    """规范化的出生信息"""
+    birth_datetime: datetime
+    gender: Gender
+    birth_place: Optional[str | Location]
+    true_solar_time: bool
+    precise_jieqi: bool
+
+
+class CachedChart(NamedTuple):
+    """缓存的排盘结果"""
+    bazi: BaziChart
+    wuxing: WuxingAnalysis
+    solar_datetime: datetime
+
+
+def _get_chart_cache() -> BoundedCache:
+    """获取命盘缓存（chart 命名空间）"""
+    return get_cache(
+        "chart", maxsize=get_settings().chart_cache_size, version=CHART_CACHE_VERSION
+    )
+
+
+def normalize_birth_input(
+    birth_datetime: datetime,
+    gender: Gender | str,
+    birth_place: Optional[str | Location] = None,
+    true_solar_time: bool = True,
+) -> ChartKey:
+    """规范化出生信息：时区换算为北京时间、去掉微秒、地点去空白、坐标取整"""
+    if birth_datetime.tzinfo is not None:
+        birth_datetime = birth_datetime.astimezone(_BEIJING).replace(tzinfo=None)
+    if isinstance(birth_place, Location):
+        place = Location(
+            birth_place.name,
+            round(birth_place.longitude, _COORDINATE_DIGITS),
+            round(birth_place.latitude, _COORDINATE_DIGITS),
+        )
+    else:
+        place = (birth_place or "").strip() or None
+    return ChartKey(
+        birth_datetime.replace(microsecond=0),
+        Gender(gender),
+        place,
+        bool(true_solar_time and place),
+        get_settings().use_precise_jieqi,
+    )
+
+
+def _compute_chart(key: ChartKey) -> CachedChart:
+    """排盘"""
+    solar_dt = key.birth_datetime
+    if key.true_solar_time:
+        solar_dt = convert_to_true_solar_time(solar_dt, key.birth_place)
+    place = key.birth_place
+    bazi = calculate_bazi(solar_dt, key.gender, place.name if isinstance(place, Location) else place)
+    return CachedChart(bazi, analyze_wuxing(bazi), solar_dt)
+
+
+def get_chart(
+    birth_datetime: datetime,
+    gender: Gender | str,
+    birth_place: Optional[str | Location] = None,
+    true_solar_time: bool = True,
+) -> CachedChart:
+    """
+    获取命盘（带缓存）
+
+    Args:
+        birth_datetime: 出生时间（当地钟表时间）
+        gender: 性别
+        birth_place: 出生地点（城市名或带经纬度的 Location）
+        true_solar_time: 有地点时是否先换算真太阳时
+
+    返回的 BaziChart / WuxingAnalysis 为共享对象，调用方不应修改
+    """
+    key = normalize_birth_input(birth_datetime, gender, birth_place, true_solar_time)
+    if not get_settings().cache_enabled:
+        return _compute_chart(key)
+
+    cache = _get_chart_cache()
+    chart = cache.get(key)
+    if chart is None:
+        chart = _compute_chart(key)
+        cache.set(key, chart)
+    return chart
+
+
+def chart_cache_stats() -> dict:
+    """命盘缓存统计"""
+    return _get_chart_cache().stats()
+
+
+def clear_chart_cache() -> None:
+    """清空命盘缓存"""
+    _get_chart_cache().clear()
@@ -101,6 +101,16 @@ DIZHI_LIUCHONG = {
     ("巳", "亥"): "火水相冲",
 }
 
+# 地支六害
+DIZHI_LIUHAI = {
+    ("子", "未"): "势家之害",
+    ("丑", "午"): "官鬼之害",
+    ("寅", "巳"): "临官之害",
+    ("卯", "辰"): "凌长之害",
+    ("申", "亥"): "争进之害",
+    ("酉", "戌"): "嫉妒之害",
+}
+
 # 地支三合局
 DIZHI_SANHE = {
     ("申", "子", "辰"): "水局",
@@ -0,0 +1,75 @@
+"""紧凑八字表示 - 以天干地支下标存储四柱
+
+PackedChart 与 BaziChart 可无损互转，供热点分析循环直接使用整数下标，
+避免反复读取枚举 .value、重建字符串列表
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+from src.models import BaziChart, BaziPillar, Gender
+from src.models.bazi_models import TianGan, DiZhi
+from src.core.bazi.constants import TIANGAN, DIZHI
+
+# 枚举/字符 -> 下标（str 枚举与对应字符哈希相同，两者均可查询）
+GAN_INDEX = {gan: i for i, gan in enumerate(TIANGAN)}
+ZHI_INDEX = {zhi: i for i, zhi in enumerate(DIZHI)}
+
+_TIANGAN_ENUMS = [TianGan(gan) for gan in TIANGAN]
+_DIZHI_ENUMS = [DiZhi(zhi) for zhi in DIZHI]
+
+
+class PackedChart(NamedTuple):
+    """紧凑八字盘：四柱天干（0-9）、地支（0-11）下标"""
+    year_gan: int
+    year_zhi: int
+    month_gan: int
+    month_zhi: int
+    day_gan: int
+    day_zhi: int
+    hour_gan: int
+    hour_zhi: int
+    birth_datetime: datetime
+    gender: Gender
+    birth_place: Optional[str] = None
+
+    @property
+    def gans(self) -> tuple[int, int, int, int]:
+        """年月日时天干下标"""
+        return self.year_gan, self.month_gan, self.day_gan, self.hour_gan
+
+    @property
+    def zhis(self) -> tuple[int, int, int, int]:
+        """年月日时地支下标"""
+        return self.year_zhi, self.month_zhi, self.day_zhi, self.hour_zhi
+
+    @classmethod
+    def from_chart(cls, bazi: BaziChart) -> "PackedChart":
+        """由 BaziChart 构造"""
+        return cls(
+            GAN_INDEX[bazi.year_pillar.tiangan], ZHI_INDEX[bazi.year_pillar.dizhi],
+            GAN_INDEX[bazi.month_pillar.tiangan], ZHI_INDEX[bazi.month_pillar.dizhi],
+            GAN_INDEX[bazi.day_pillar.tiangan], ZHI_INDEX[bazi.day_pillar.dizhi],
+            GAN_INDEX[bazi.hour_pillar.tiangan], ZHI_INDEX[bazi.hour_pillar.dizhi],
+            bazi.birth_datetime, bazi.gender, bazi.birth_place,
+        )
+
+    def to_chart(self) -> BaziChart:
+        """转换为 BaziChart"""
+        def pillar(gan: int, zhi: int) -> BaziPillar:
+            return BaziPillar(tiangan=_TIANGAN_ENUMS[gan], dizhi=_DIZHI_ENUMS[zhi])
+
+        return BaziChart(
+            year_pillar=pillar(self.year_gan, self.year_zhi),
+            month_pillar=pillar(self.month_gan, self.month_zhi),
+            day_pillar=pillar(self.day_gan, self.day_zhi),
+            hour_pillar=pillar(self.hour_gan, self.hour_zhi),
+            birth_datetime=self.birth_datetime,
+            gender=self.gender,
+            birth_place=self.birth_place,
+        )
+
+
+def pack(bazi: BaziChart | PackedChart) -> PackedChart:
+    """统一转为 PackedChart（已是则原样返回）"""
+    if isinstance(bazi, PackedChart):
+        return bazi
+    return PackedChart.from_chart(bazi)
@@ -1,9 +1,15 @@
 """四柱计算模块"""
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Iterator, Sequence
+import numpy as np
 from src.models import BaziPillar, BaziChart, Gender
 from src.models.bazi_models import TianGan, DiZhi
 from src.core.bazi.constants import TIANGAN, DIZHI
+from src.core.bazi.packed import PackedChart
+from src.core.fortune.jieqi import get_jie_boundaries
 from src.core.utils.calendar import get_jieqi_month
+from src.core.utils.config import get_settings
 
 
 def _get_year_pillar(year: int, month: int, day: int) -> BaziPillar:
@@ -11,7 +17,11 @@ def _get_year_pillar(year: int, month: int, day: int) -> BaziPillar:
     # 简化判断：2月4日前算上一年
     if month < 2 or (month == 2 and day < 4):
         year -= 1
-    
+    return _ganzhi_year_pillar(year)
+
+
+def _ganzhi_year_pillar(year: int) -> BaziPillar:
+    """按干支纪年年份（立春起算）计算年柱"""
     # 年干支计算：以1984年甲子年为基准
     gan_idx = (year - 4) % 10
     zhi_idx = (year - 4) % 12
@@ -29,7 +39,11 @@ def _get_month_pillar(year_gan: str, month: int, day: int) -> BaziPillar:
     月柱天干由年干推算
     """
     jieqi_month = get_jieqi_month(datetime(2000, month, day))
-    
+    return jieqi_month_pillar(year_gan, jieqi_month)
+
+
+def jieqi_month_pillar(year_gan: str, jieqi_month: int) -> BaziPillar:
+    """由年干和节气月份（1=寅月）计算月柱"""
     # 月支对应表（正月=寅）
     month_zhi_map = {
         1: 2, 2: 3, 3: 4, 4: 5, 5: 6, 6: 7,
@@ -48,15 +62,11 @@ def _get_month_pillar(year_gan: str, month: int, day: int) -> BaziPillar:
     )
 
 
-def _get_day_pillar(dt: datetime) -> BaziPillar:
+def _day_cycle_index(year: int, month: int, day: int) -> int:
     """
-    计算日柱
+    日柱在六十甲子中的序号（0 为甲子）
     使用高氏日柱公式简化版
     """
-    year = dt.year
-    month = dt.month
-    day = dt.day
-    
     # 世纪常数
     century = year // 100
     c_const = (century // 4 - century - 2) % 60
@@ -74,16 +84,18 @@ def _get_day_pillar(dt: datetime) -> BaziPillar:
     if is_leap and month <= 2:
         m_const -= 1
     
-    total = (c_const + y_const + m_const + day) % 60
-    if total <= 0:
-        total += 60
-    
-    gan_idx = (total - 1) % 10
-    zhi_idx = (total - 1) % 12
-    
+    return (c_const + y_const + m_const + day - 1) % 60
+
+
+def _get_day_pillar(dt: datetime) -> BaziPillar:
+    """
+    计算日柱
+    使用高氏日柱公式简化版
+    """
+    idx = _day_cycle_index(dt.year, dt.month, dt.day)
     return BaziPillar(
-        tiangan=TianGan(TIANGAN[gan_idx]),
-        dizhi=DiZhi(DIZHI[zhi_idx])
+        tiangan=TianGan(TIANGAN[idx % 10]),
+        dizhi=DiZhi(DIZHI[idx % 12])
     )
 
 
@@ -112,11 +124,24 @@ def calculate_bazi(
     gender: Gender,
     birth_place: str | None = None
 ) -> BaziChart:
-    """计算完整八字"""
-    year_pillar = _get_year_pillar(birth_dt.year, birth_dt.month, birth_dt.day)
-    month_pillar = _get_month_pillar(
-        year_pillar.tiangan.value, birth_dt.month, birth_dt.day
-    )
+    """
+    计算完整八字
+
+    Settings.use_precise_jieqi 开启时年柱、月柱以精确节气时刻为界，
+    否则使用固定节气日期
+    """
+    if get_settings().use_precise_jieqi:
+        boundaries = get_jie_boundaries(birth_dt.year)
+        year = birth_dt.year - 1 if birth_dt < boundaries.lichun else birth_dt.year
+        year_pillar = _ganzhi_year_pillar(year)
+        month_pillar = jieqi_month_pillar(
+            year_pillar.tiangan.value, boundaries.jieqi_month(birth_dt)
+        )
+    else:
+        year_pillar = _get_year_pillar(birth_dt.year, birth_dt.month, birth_dt.day)
+        month_pillar = _get_month_pillar(
+            year_pillar.tiangan.value, birth_dt.month, birth_dt.day
+        )
     day_pillar = _get_day_pillar(birth_dt)
     hour_pillar = _get_hour_pillar(day_pillar.tiangan.value, birth_dt.hour)
     
@@ -130,3 +155,159 @@ def calculate_bazi(
         birth_place=birth_place
     )
 
+
+
+# 非精确模式下每月"节"的固定日期（与 calendar.get_jieqi_month 一致）
+_FIXED_JIE_DAYS = np.array([0, 6, 4, 6, 5, 6, 6, 7, 8, 8, 9, 8, 7])
+# 高氏日柱公式月份常数
+_MONTH_CONSTS = np.array([0, 0, 31, -1, 30, 0, 31, 1, 32, 3, 33, 4, 34])
+
+
+@dataclass(frozen=True)
+class BaziBatch:
+    """
+    批量八字计算结果
+
+    四柱以天干（0-9）、地支（0-11）下标数组表示，
+    BaziChart 仅在调用 chart()/charts() 时构造
+    """
+    year_gan: np.ndarray
+    year_zhi: np.ndarray
+    month_gan: np.ndarray
+    month_zhi: np.ndarray
+    day_gan: np.ndarray
+    day_zhi: np.ndarray
+    hour_gan: np.ndarray
+    hour_zhi: np.ndarray
+    birth_datetimes: np.ndarray  # datetime64[s]
+    is_male: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.birth_datetimes)
+
+    def chart(self, i: int) -> BaziChart:
+        """构造第 i 条记录的 BaziChart"""
+        return self.packed(i).to_chart()
+
+    def packed(self, i: int) -> PackedChart:
+        """构造第 i 条记录的 PackedChart（不经过 pydantic）"""
+        return PackedChart(
+            int(self.year_gan[i]), int(self.year_zhi[i]),
+            int(self.month_gan[i]), int(self.month_zhi[i]),
+            int(self.day_gan[i]), int(self.day_zhi[i]),
+            int(self.hour_gan[i]), int(self.hour_zhi[i]),
+            self.birth_datetimes[i].astype(datetime),
+            Gender.MALE if self.is_male[i] else Gender.FEMALE,
+        )
+
+    def charts(self) -> Iterator[BaziChart]:
+        """逐条构造 BaziChart"""
+        return (self.chart(i) for i in range(len(self)))
+
+
+def _civil_from_days(days: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """1970-01-01 起的天数转公历年月日（Hinnant 算法，纯整数运算）"""
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+    return year, month, day
+
+
+def _precise_jie_positions(
+    seconds: np.ndarray, years: np.ndarray, months: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    精确节气：返回（干支纪年年份, 节气月份）
+
+    每个公历月恰有一个"节"（1月小寒……12月大雪），
+    取当月的节比较一次即可定位，无需二分查找
+    """
+    first_year = int(years.min())
+    jie = np.array(
+        [
+            m for y in range(first_year, int(years.max()) + 1)
+            for m in get_jie_boundaries(y).moments
+        ],
+        dtype="datetime64[s]"
+    ).astype(np.int64)
+    # k: dt 之前最近的"节"的序号，每年12个，小寒为0、立春为1
+    k = (years - first_year) * 12 + months - 1
+    k -= seconds < jie[k]
+    ganzhi_years = first_year + (k - 1) // 12
+    jieqi_months = (k % 12 - 1) % 12 + 1
+    return ganzhi_years, jieqi_months
+
+
+def calculate_bazi_batch(
+    datetimes: Sequence[datetime] | np.ndarray,
+    genders: Gender | Sequence[Gender | str] | np.ndarray
+) -> BaziBatch:
+    """
+    批量计算八字（NumPy 向量化）
+
+    结果与逐条调用 calculate_bazi 一致，适合离线批量任务
+
+    Args:
+        datetimes: 出生时间序列（datetime 或 datetime64）
+        genders: 性别，单个值或与 datetimes 等长的序列
+    """
+    dts = np.asarray(datetimes, dtype="datetime64[s]")
+    if isinstance(genders, (Gender, str)):
+        is_male = np.full(len(dts), Gender(genders) == Gender.MALE)
+    else:
+        is_male = np.asarray([Gender(g) == Gender.MALE for g in genders], dtype=bool)
+    if len(is_male) != len(dts):
+        raise ValueError("genders 与 datetimes 长度不一致")
+
+    seconds = dts.astype(np.int64)
+    years, months, days = _civil_from_days(seconds // 86400)
+    hours = seconds % 86400 // 3600
+
+    # 年柱、月柱
+    if len(dts) and get_settings().use_precise_jieqi:
+        ganzhi_years, jieqi_months = _precise_jie_positions(seconds, years, months)
+    else:
+        before_lichun = (months < 2) | ((months == 2) & (days < 4))
+        ganzhi_years = years - before_lichun
+        past_jie = days >= _FIXED_JIE_DAYS[months]
+        jieqi_months = np.where(past_jie, months, (months - 2) % 12 + 1)
+
+    year_gan = (ganzhi_years - 4) % 10
+    year_zhi = (ganzhi_years - 4) % 12
+    month_zhi = (jieqi_months + 1) % 12
+    month_gan = ((year_gan % 5) * 2 + 2 + jieqi_months - 1) % 10
+
+    # 日柱（高氏公式）
+    century = years // 100
+    c_const = (century // 4 - century - 2) % 60
+    y = years % 100
+    y_const = (5 * y + y // 4) % 60
+    is_leap = ((years % 4 == 0) & (years % 100 != 0)) | (years % 400 == 0)
+    m_const = _MONTH_CONSTS[months] - (is_leap & (months <= 2))
+    total = (c_const + y_const + m_const + days) % 60
+    total = np.where(total <= 0, total + 60, total)
+    day_gan = (total - 1) % 10
+    day_zhi = (total - 1) % 12
+
+    # 时柱
+    hour_zhi = ((hours + 1) % 24) // 2
+    hour_gan = ((day_gan % 5) * 2 + hour_zhi) % 10
+
+    return BaziBatch(
+        year_gan=year_gan.astype(np.int8),
+        year_zhi=year_zhi.astype(np.int8),
+        month_gan=month_gan.astype(np.int8),
+        month_zhi=month_zhi.astype(np.int8),
+        day_gan=day_gan.astype(np.int8),
+        day_zhi=day_zhi.astype(np.int8),
+        hour_gan=hour_gan.astype(np.int8),
+        hour_zhi=hour_zhi.astype(np.int8),
+        birth_datetimes=dts,
+        is_male=is_male,
+    )
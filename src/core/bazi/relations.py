@@ -0,0 +1,71 @@
+"""干支关系矩阵 - 合冲刑害的 O(1) 下标查询
+
+由 constants 中的关系表预先展开为对称矩阵：
+GAN_HE[a][b] 为天干 a、b（0-9）相合的描述，无关系时为 None，其余同理。
+ZHI_RELATION_FLAGS[a][b] 将地支间的全部关系压成一个位掩码，
+评分循环中一次查表即可判断六合、六冲、相刑、六害、三合。
+"""
+from src.core.bazi.constants import (
+    TIANGAN, DIZHI, TIANGAN_HE, TIANGAN_CHONG,
+    DIZHI_LIUHE, DIZHI_LIUCHONG, DIZHI_XING, DIZHI_LIUHAI, DIZHI_SANHE,
+)
+
+# 地支关系位
+LIUHE = 1
+LIUCHONG = 2
+XING = 4
+LIUHAI = 8
+SANHE = 16
+
+Matrix = tuple[tuple[str | None, ...], ...]
+
+
+def _build_matrix(pairs: dict, names: list[str]) -> Matrix:
+    """将关系表展开为对称矩阵"""
+    index = {name: i for i, name in enumerate(names)}
+    matrix = [[None] * len(names) for _ in names]
+    for (a, b), desc in pairs.items():
+        matrix[index[a]][index[b]] = desc
+        matrix[index[b]][index[a]] = desc
+    return tuple(tuple(row) for row in matrix)
+
+
+def _build_sanhe_matrix() -> Matrix:
+    """三合局：同局两支互为三合（半合），值为局名"""
+    index = {name: i for i, name in enumerate(DIZHI)}
+    matrix = [[None] * 12 for _ in range(12)]
+    for members, ju in DIZHI_SANHE.items():
+        for a in members:
+            for b in members:
+                if a != b:
+                    matrix[index[a]][index[b]] = ju
+    return tuple(tuple(row) for row in matrix)
+
+
+# 天干五合、相冲
+GAN_HE = _build_matrix(TIANGAN_HE, TIANGAN)
+GAN_CHONG = _build_matrix(TIANGAN_CHONG, TIANGAN)
+
+# 地支六合、六冲、相刑、六害、三合
+ZHI_LIUHE = _build_matrix(DIZHI_LIUHE, DIZHI)
+ZHI_LIUCHONG = _build_matrix(DIZHI_LIUCHONG, DIZHI)
+ZHI_XING = _build_matrix(DIZHI_XING, DIZHI)
+ZHI_LIUHAI = _build_matrix(DIZHI_LIUHAI, DIZHI)
+ZHI_SANHE = _build_sanhe_matrix()
+
+# 每个地支的六冲对象
+ZHI_CHONG_PARTNER = tuple(
+    next(b for b in range(12) if ZHI_LIUCHONG[a][b]) for a in range(12)
+)
+
+ZHI_RELATION_FLAGS: tuple[tuple[int, ...], ...] = tuple(
+    tuple(
+        (LIUHE if ZHI_LIUHE[a][b] else 0)
+        | (LIUCHONG if ZHI_LIUCHONG[a][b] else 0)
+        | (XING if ZHI_XING[a][b] else 0)
+        | (LIUHAI if ZHI_LIUHAI[a][b] else 0)
+        | (SANHE if ZHI_SANHE[a][b] else 0)
+        for b in range(12)
+    )
+    for a in range(12)
+)
@@ -5,18 +5,15 @@ from src.core.bazi.shensha_data import (
     TIANYI_GUIREN, WENCHANG, YIMA, TAOHUA,
     HUAGAI, JIANGXING, YANGREN, LUSHEN, SHENSHA_DESC
 )
+from src.core.bazi.constants import TIANGAN, DIZHI
+from src.core.bazi.packed import PackedChart, pack
 
 PILLAR_NAMES = ["年支", "月支", "日支", "时支"]
 
 
-def _get_all_dizhi(bazi: BaziChart) -> list[str]:
+def _get_all_dizhi(bazi: BaziChart | PackedChart) -> list[str]:
     """获取八字所有地支"""
-    return [
-        bazi.year_pillar.dizhi.value,
-        bazi.month_pillar.dizhi.value,
-        bazi.day_pillar.dizhi.value,
-        bazi.hour_pillar.dizhi.value,
-    ]
+    return [DIZHI[zhi] for zhi in pack(bazi).zhis]
 
 
 def _check_shensha(target_zhi: str | list, all_dizhi: list[str]) -> list[str]:
@@ -48,11 +45,12 @@ def _add_shensha(
         xiong_sha.append(name)
 
 
-def calculate_shensha(bazi: BaziChart) -> ShenShaAnalysis:
+def calculate_shensha(bazi: BaziChart | PackedChart) -> ShenShaAnalysis:
     """计算八字神煞"""
-    day_gan = bazi.day_pillar.tiangan.value
-    day_zhi = bazi.day_pillar.dizhi.value
-    all_dizhi = _get_all_dizhi(bazi)
+    packed = pack(bazi)
+    day_gan = TIANGAN[packed.day_gan]
+    day_zhi = DIZHI[packed.day_zhi]
+    all_dizhi = _get_all_dizhi(packed)
     
     shensha_list = []
     ji_shen = []
@@ -1,44 +1,52 @@
 """五行分析模块"""
 from src.models import BaziChart, WuxingAnalysis
 from src.models.bazi_models import WuxingCount, Wuxing
-from src.core.bazi.constants import TIANGAN_WUXING, DIZHI_WUXING, DIZHI_CANGAN, WUXING_SHENG, WUXING_KE
+from src.core.bazi.constants import (
+    TIANGAN, DIZHI, TIANGAN_WUXING, DIZHI_WUXING, DIZHI_CANGAN, WUXING_SHENG, WUXING_KE
+)
+from src.core.bazi.packed import PackedChart, pack
 
+# 五行下标顺序与 WuxingCount 字段一致
+_WUXING_ORDER = ["木", "火", "土", "金", "水"]
+_WUXING_INDEX = {wx: i for i, wx in enumerate(_WUXING_ORDER)}
 
-def _count_wuxing(bazi: BaziChart) -> WuxingCount:
+# 天干五行下标
+_GAN_WUXING = [_WUXING_INDEX[TIANGAN_WUXING[gan]] for gan in TIANGAN]
+
+# 地支五行权重：主气0.7，藏干首个0.3、其余0.15
+_ZHI_WUXING_WEIGHTS = [
+    [(_WUXING_INDEX[DIZHI_WUXING[zhi]], 0.7)] + [
+        (_WUXING_INDEX[TIANGAN_WUXING[cg]], 0.3 if i == 0 else 0.15)
+        for i, cg in enumerate(DIZHI_CANGAN.get(zhi, []))
+    ]
+    for zhi in DIZHI
+]
+
+
+def _count_wuxing(bazi: BaziChart | PackedChart) -> WuxingCount:
     """统计八字中五行数量（含藏干）"""
-    counts = {"木": 0, "火": 0, "土": 0, "金": 0, "水": 0}
-    
-    pillars = [bazi.year_pillar, bazi.month_pillar, bazi.day_pillar, bazi.hour_pillar]
+    packed = pack(bazi)
+    counts = [0.0] * 5
     
-    for pillar in pillars:
+    for gan, zhi in zip(packed.gans, packed.zhis):
         # 天干五行
-        gan_wx = TIANGAN_WUXING[pillar.tiangan.value]
-        counts[gan_wx] += 1
-        
-        # 地支五行（主气）
-        zhi_wx = DIZHI_WUXING[pillar.dizhi.value]
-        counts[zhi_wx] += 0.7
-        
-        # 藏干五行（余气）
-        cangans = DIZHI_CANGAN.get(pillar.dizhi.value, [])
-        for i, cg in enumerate(cangans):
-            weight = 0.3 if i == 0 else 0.15
-            cg_wx = TIANGAN_WUXING[cg]
-            counts[cg_wx] += weight
+        counts[_GAN_WUXING[gan]] += 1
+        # 地支五行（主气）及藏干五行（余气）
+        for wx, weight in _ZHI_WUXING_WEIGHTS[zhi]:
+            counts[wx] += weight
     
     return WuxingCount(
-        mu=round(counts["木"], 1),
-        huo=round(counts["火"], 1),
-        tu=round(counts["土"], 1),
-        jin=round(counts["金"], 1),
-        shui=round(counts["水"], 1)
+        mu=round(counts[0], 1),
+        huo=round(counts[1], 1),
+        tu=round(counts[2], 1),
+        jin=round(counts[3], 1),
+        shui=round(counts[4], 1)
     )
 
 
-def _get_day_master(bazi: BaziChart) -> Wuxing:
+def _get_day_master(bazi: BaziChart | PackedChart) -> Wuxing:
     """获取日主五行"""
-    day_gan = bazi.day_pillar.tiangan.value
-    return Wuxing(TIANGAN_WUXING[day_gan])
+    return Wuxing(_WUXING_ORDER[_GAN_WUXING[pack(bazi).day_gan]])
 
 
 def _analyze_strength(counts: WuxingCount, day_master: Wuxing) -> str:
@@ -99,10 +107,11 @@ def _get_favorable_unfavorable(
     return favorable, unfavorable
 
 
-def analyze_wuxing(bazi: BaziChart) -> WuxingAnalysis:
+def analyze_wuxing(bazi: BaziChart | PackedChart) -> WuxingAnalysis:
     """完整五行分析"""
-    counts = _count_wuxing(bazi)
-    day_master = _get_day_master(bazi)
+    packed = pack(bazi)
+    counts = _count_wuxing(packed)
+    day_master = _get_day_master(packed)
     strength = _analyze_strength(counts, day_master)
     favorable, unfavorable = _get_favorable_unfavorable(day_master, strength)
     
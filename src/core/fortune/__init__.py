@@ -1,23 +1,32 @@
 """运势分析模块"""
 from src.core.fortune.dayun import calculate_dayun, get_current_dayun
 from src.core.fortune.liunian import calculate_liunian
-from src.core.fortune.jieqi import get_jieqi_month, is_before_lichun, get_jieqi_for_year
+from src.core.fortune.jieqi import (
+    get_jieqi_month, is_before_lichun, get_jieqi_for_year, term_at, prev_jie, next_jie,
+)
 from src.core.fortune.daily_fortune import calculate_daily_fortune, calculate_three_days_fortune, DailyFortune
 from src.core.fortune.daily_fortune_engine import DailyFortuneEngine
 from src.core.fortune.daily_fortune_report import generate_daily_fortune_report
 from src.core.fortune.dimension_scorer import DimensionScorer
+from src.core.fortune.daily_timeline import (
+    daily_fortune_timeline, daily_cycle_table, cycle_table_rows, DailyScoreRow,
+)
+from src.core.fortune.year_scores import calculate_year_scores, year_score_tables
 from src.core.fortune.hour_fortune import calculate_hour_fortunes, get_lucky_hours
 from src.core.fortune.fortune_interpreter import generate_year_detail, generate_dayun_detail
 
 __all__ = [
     # 大运流年
     "calculate_dayun", "get_current_dayun", "calculate_liunian",
+    "calculate_year_scores", "year_score_tables",
     # 节气
     "get_jieqi_month", "is_before_lichun", "get_jieqi_for_year",
+    "term_at", "prev_jie", "next_jie",
     # 每日运势
     "calculate_daily_fortune", "calculate_three_days_fortune", "DailyFortune",
     "DailyFortuneEngine", "generate_daily_fortune_report",
     "DimensionScorer", "calculate_hour_fortunes", "get_lucky_hours",
+    "daily_fortune_timeline", "daily_cycle_table", "cycle_table_rows", "DailyScoreRow",
     # 解读
     "generate_year_detail", "generate_dayun_detail",
 ]
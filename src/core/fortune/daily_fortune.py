@@ -1,10 +1,9 @@
 """每日运势计算模块"""
 from datetime import datetime, date, timedelta
 from pydantic import BaseModel, Field
-from src.core.bazi.constants import (
-    TIANGAN, DIZHI, TIANGAN_WUXING, DIZHI_WUXING,
-    DIZHI_LIUHE, DIZHI_LIUCHONG, DIZHI_XING
-)
+from src.core.bazi.constants import TIANGAN, DIZHI, TIANGAN_WUXING, DIZHI_WUXING
+from src.core.bazi.packed import PackedChart, pack, ZHI_INDEX
+from src.core.bazi.relations import ZHI_RELATION_FLAGS, LIUHE, LIUCHONG, XING
 from src.models.bazi_models import BaziChart, WuxingAnalysis
 
 
@@ -90,7 +89,7 @@ def _get_day_ganzhi(target_date: date) -> tuple[str, str]:
 
 
 def _calculate_score(
-    day_gan: str, day_zhi: str, bazi: BaziChart, wuxing: WuxingAnalysis
+    day_gan: str, day_zhi: str, bazi: BaziChart | PackedChart, wuxing: WuxingAnalysis
 ) -> float:
     """计算日运势分数"""
     score = 60.0
@@ -106,20 +105,14 @@ def _calculate_score(
         score -= 10
     
     # 地支关系
-    bazi_zhis = [
-        bazi.year_pillar.dizhi.value,
-        bazi.month_pillar.dizhi.value,
-        bazi.day_pillar.dizhi.value,
-        bazi.hour_pillar.dizhi.value,
-    ]
-    
-    for zhi in bazi_zhis:
-        pair = tuple(sorted([day_zhi, zhi]))
-        if pair in DIZHI_LIUHE or (pair[1], pair[0]) in DIZHI_LIUHE:
+    relation_flags = ZHI_RELATION_FLAGS[ZHI_INDEX[day_zhi]]
+    for zhi in pack(bazi).zhis:
+        flags = relation_flags[zhi]
+        if flags & LIUHE:
             score += 5
-        if pair in DIZHI_LIUCHONG or (pair[1], pair[0]) in DIZHI_LIUCHONG:
+        if flags & LIUCHONG:
             score -= 8
-        if pair in DIZHI_XING or (pair[1], pair[0]) in DIZHI_XING:
+        if flags & XING:
             score -= 5
     
     return round(min(max(score, 30), 95), 1)
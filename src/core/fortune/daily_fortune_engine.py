@@ -1,19 +1,24 @@
 """每日运势核心计算引擎 - 干支关系与十神分析"""
 from datetime import date
-from src.core.bazi.constants import (
-    TIANGAN, DIZHI, TIANGAN_WUXING, DIZHI_WUXING, DIZHI_CANGAN,
-    DIZHI_LIUHE, DIZHI_LIUCHONG, DIZHI_XING, DIZHI_SANHE,
-    TIANGAN_HE, TIANGAN_CHONG, WUXING_SHENG, WUXING_KE
-)
+from src.core.bazi.constants import TIANGAN, DIZHI, TIANGAN_WUXING
 from src.models.bazi_models import BaziChart, WuxingAnalysis
-from src.core.bazi.shishen import _get_shishen, _is_yang_gan
+from src.core.bazi.packed import PackedChart, pack, GAN_INDEX, ZHI_INDEX
+from src.core.bazi.relations import (
+    GAN_HE, GAN_CHONG, ZHI_RELATION_FLAGS, LIUHE, LIUCHONG, XING
+)
+from src.core.bazi.shishen import _get_shishen
+
+_PILLAR_ZHI_NAMES = ["年支", "月支", "日支", "时支"]
 
 
 class DailyFortuneEngine:
     """每日运势计算引擎"""
     
-    def __init__(self, bazi: BaziChart, wuxing: WuxingAnalysis, target_date: date):
+    def __init__(
+        self, bazi: BaziChart | PackedChart, wuxing: WuxingAnalysis, target_date: date
+    ):
         self.bazi = bazi
+        self.packed = pack(bazi)
         self.wuxing = wuxing
         self.target_date = target_date
         
@@ -61,25 +66,19 @@ class DailyFortuneEngine:
     
     def _analyze_tiangan_relations(self):
         """天干合冲分析"""
-        bazi_gans = [
-            self.bazi.year_pillar.tiangan.value,
-            self.bazi.month_pillar.tiangan.value,
-            self.bazi.day_pillar.tiangan.value,
-            self.bazi.hour_pillar.tiangan.value,
-        ]
+        day_gan_idx = GAN_INDEX[self.day_gan]
         
         gan_score = 0
-        for gan in bazi_gans:
-            pair = tuple(sorted([self.day_gan, gan]))
-            rev_pair = (pair[1], pair[0])
+        for gan_idx in self.packed.gans:
+            gan = TIANGAN[gan_idx]
             
             # 天干五合
-            if pair in TIANGAN_HE or rev_pair in TIANGAN_HE:
+            if GAN_HE[day_gan_idx][gan_idx]:
                 self.factors["favorable"].append(f"{self.day_gan}与{gan}天干相合(+8)")
                 gan_score += 8
             
             # 天干相冲
-            if pair in TIANGAN_CHONG or rev_pair in TIANGAN_CHONG:
+            if GAN_CHONG[day_gan_idx][gan_idx]:
                 self.factors["unfavorable"].append(f"{self.day_gan}与{gan}天干相冲(-10)")
                 gan_score -= 10
         
@@ -87,32 +86,29 @@ class DailyFortuneEngine:
     
     def _analyze_dizhi_relations(self):
         """地支合冲刑害分析"""
-        bazi_zhis = [
-            (self.bazi.year_pillar.dizhi.value, "年支"),
-            (self.bazi.month_pillar.dizhi.value, "月支"),
-            (self.bazi.day_pillar.dizhi.value, "日支"),
-            (self.bazi.hour_pillar.dizhi.value, "时支"),
-        ]
+        relation_flags = ZHI_RELATION_FLAGS[ZHI_INDEX[self.day_zhi]]
         
         zhi_score = 0
-        for zhi, name in bazi_zhis:
-            pair = tuple(sorted([self.day_zhi, zhi]))
-            rev_pair = (pair[1], pair[0])
+        for zhi_idx, name in zip(self.packed.zhis, _PILLAR_ZHI_NAMES):
+            flags = relation_flags[zhi_idx]
+            if not flags:
+                continue
+            zhi = DIZHI[zhi_idx]
             
             # 六合
-            if pair in DIZHI_LIUHE or rev_pair in DIZHI_LIUHE:
+            if flags & LIUHE:
                 bonus = 10 if name == "日支" else 6
                 self.factors["favorable"].append(f"{self.day_zhi}与{name}{zhi}六合(+{bonus})")
                 zhi_score += bonus
             
             # 六冲
-            if pair in DIZHI_LIUCHONG or rev_pair in DIZHI_LIUCHONG:
+            if flags & LIUCHONG:
                 penalty = -15 if name == "日支" else -10
                 self.factors["unfavorable"].append(f"{self.day_zhi}与{name}{zhi}六冲({penalty})")
                 zhi_score += penalty
             
             # 三刑
-            if pair in DIZHI_XING or rev_pair in DIZHI_XING:
+            if flags & XING:
                 self.factors["unfavorable"].append(f"{self.day_zhi}与{name}{zhi}相刑(-8)")
                 zhi_score -= 8
         
@@ -120,7 +116,7 @@ class DailyFortuneEngine:
     
     def _analyze_shishen(self):
         """十神星宿分析"""
-        day_master = self.bazi.day_pillar.tiangan.value
+        day_master = TIANGAN[self.packed.day_gan]
         day_shishen = _get_shishen(day_master, self.day_gan)
         
         # 十神评分调整
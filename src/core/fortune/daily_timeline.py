@@ -0,0 +1,92 @@
+"""终身每日运势时间线 - 按日流式输出紧凑评分
+
+每日运势只取决于命盘与流日干支，而流日干支六十日一循环。
+因此对同一命盘先用 DailyFortuneEngine 计算六十甲子各日的总分与七维度分数，
+之后任意日期区间只需按干支序号查表，逐日产出 DailyScoreRow，
+不再为每一天重建引擎、因素描述和建议文本。
+"""
+from datetime import date, timedelta
+from typing import Iterator, NamedTuple
+from src.models.bazi_models import BaziChart, WuxingAnalysis
+from src.models.daily_fortune_models import get_fortune_level
+from src.core.bazi.packed import PackedChart
+from src.core.fortune.daily_fortune_engine import DailyFortuneEngine
+from src.core.fortune.dimension_calculators import dimension_score
+from src.core.fortune.dimension_scorer import DIMENSION_KEYS
+
+# 2000-01-01 为己亥日，在六十甲子中的序号为 35
+_CYCLE_BASE_DATE = date(2000, 1, 1)
+_CYCLE_BASE_INDEX = 35
+
+
+class DailyScoreRow(NamedTuple):
+    """单日紧凑评分"""
+    date: date
+    ganzhi: str
+    score: float
+    level: str
+    career: float
+    wealth: float
+    love: float
+    health: float
+    emotion: float
+    family: float
+    opportunity: float
+
+    def as_dict(self) -> dict:
+        """转换为可 JSON 序列化的字典"""
+        row = self._asdict()
+        row["date"] = self.date.isoformat()
+        return row
+
+
+def cycle_index(target_date: date) -> int:
+    """日期对应的六十甲子序号（0 为甲子）"""
+    return (_CYCLE_BASE_INDEX + (target_date - _CYCLE_BASE_DATE).days) % 60
+
+
+def daily_cycle_table(
+    bazi: BaziChart | PackedChart, wuxing: WuxingAnalysis
+) -> list[tuple]:
+    """计算命盘在六十甲子各日的 (干支, 总分, 等级, 七维度分数...)"""
+    table = []
+    for k in range(60):
+        sample = _CYCLE_BASE_DATE + timedelta(days=(k - _CYCLE_BASE_INDEX) % 60)
+        engine = DailyFortuneEngine(bazi, wuxing, sample)
+        score, _ = engine.get_base_score()
+        day_shishen = engine.factors.get("day_shishen", "比肩")
+        dizhi_score = engine.factors["scores"].get("dizhi", 0)
+        dims = tuple(
+            dimension_score(key, day_shishen, engine.day_wx,
+                            engine.favorable, engine.unfavorable, dizhi_score)
+            for key in DIMENSION_KEYS
+        )
+        table.append((f"{engine.day_gan}{engine.day_zhi}", score,
+                      get_fortune_level(score)[0]) + dims)
+    return table
+
+
+def cycle_table_rows(table: list[tuple], start: date, end: date) -> Iterator[DailyScoreRow]:
+    """按 daily_cycle_table 的结果逐日查表产出 [start, end] 区间（含两端）的评分"""
+    k = cycle_index(start)
+    current = start
+    one_day = timedelta(days=1)
+    for _ in range((end - start).days + 1):
+        yield DailyScoreRow(current, *table[k])
+        current += one_day
+        k = (k + 1) % 60
+
+
+def daily_fortune_timeline(
+    bazi: BaziChart | PackedChart, wuxing: WuxingAnalysis, start: date, end: date
+) -> Iterator[DailyScoreRow]:
+    """
+    逐日生成 [start, end] 区间（含两端）的运势评分
+
+    分数与 generate_daily_fortune_report 的总分及各维度分数一致，
+    适合跨越数十年的时间线与流式输出。参数校验与六十甲子表在调用时立即完成，
+    返回的迭代器只做查表。
+    """
+    if end < start:
+        raise ValueError("结束日期不能早于起始日期")
+    return cycle_table_rows(daily_cycle_table(bazi, wuxing), start, end)
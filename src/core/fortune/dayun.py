@@ -3,6 +3,8 @@ from datetime import datetime
 from src.models import BaziChart, Gender
 from src.models.bazi_models import DaYun, DaYunInfo
 from src.core.bazi.constants import TIANGAN, DIZHI, TIANGAN_WUXING
+from src.core.fortune.jieqi import get_jie_span
+from src.core.utils.config import get_settings
 
 
 def _get_dayun_direction(year_gan: str, gender: Gender) -> int:
@@ -34,8 +36,14 @@ def _calculate_start_age(
     """
     direction = _get_dayun_direction(year_gan, gender)
     
+    if get_settings().use_precise_jieqi:
+        # 精确节气：一天折四个月
+        prev_jie, next_jie = get_jie_span(birth_dt)
+        delta = next_jie - birth_dt if direction > 0 else birth_dt - prev_jie
+        months = int(delta.total_seconds() / 86400 * 4)
+        return months // 12, months % 12
+    
     # 简化计算：使用近似节气日期
-    # 实际应使用精确节气计算
     month = birth_dt.month
     day = birth_dt.day
     
@@ -88,33 +88,49 @@ def create_dimension(key: str, score: float, factors: list) -> DimensionScore:
     )
 
 
+# 地支冲合对各维度的权重（未列出的维度为 0.3）
+ZHI_WEIGHTS = {"career": 0.5, "love": 0.8, "health": 0.6, "opportunity": 1.0}
+
+
+def _raw_dimension_score(key: str, day_shishen: str, day_wx: str,
+                         favorable: list, unfavorable: list, dizhi_score: float) -> float:
+    """维度分数（限制在 20-95，未取整）：基础分 + 十神 + 喜忌 + 地支冲合"""
+    score = DIM_CONFIG[key]["base"] + SHISHEN_WEIGHTS[key].get(day_shishen, 0)
+    if day_wx in favorable:
+        score += 10
+    elif day_wx in unfavorable:
+        score -= 8
+    # 地支冲合影响（不同维度权重不同）
+    score += dizhi_score * ZHI_WEIGHTS.get(key, 0.3)
+    return min(max(score, 20), 95)
+
+
+def dimension_score(key: str, day_shishen: str, day_wx: str,
+                    favorable: list, unfavorable: list, dizhi_score: float) -> float:
+    """仅计算维度分数（不生成因素与建议），与 calc_dimension 的分数一致"""
+    return round(_raw_dimension_score(
+        key, day_shishen, day_wx, favorable, unfavorable, dizhi_score
+    ), 0)
+
+
 def calc_dimension(key: str, day_shishen: str, day_wx: str, 
                    favorable: list, unfavorable: list, dizhi_score: float) -> DimensionScore:
     """通用维度计算"""
-    score = DIM_CONFIG[key]["base"]
+    score = _raw_dimension_score(key, day_shishen, day_wx, favorable, unfavorable, dizhi_score)
     factors = []
     
-    # 十神影响
-    shishen_bonus = SHISHEN_WEIGHTS[key].get(day_shishen, 0)
-    score += shishen_bonus
-    
+    # 十神因素
     factor_info = SHISHEN_FACTORS[key]
     if day_shishen in factor_info["positive"]:
         factors.append(f"{day_shishen}当值，{factor_info['pos_text']}")
     elif day_shishen in factor_info["negative"]:
         factors.append(f"{day_shishen}流日，{factor_info['neg_text']}")
     
-    # 喜用神影响
+    # 喜用神因素
     if day_wx in favorable:
-        score += 10
         factors.append("喜用神当值")
-    elif day_wx in unfavorable:
-        score -= 8
-    
-    # 地支冲合影响（不同维度权重不同）
-    zhi_weight = {"career": 0.5, "love": 0.8, "health": 0.6, "opportunity": 1.0}.get(key, 0.3)
-    score += dizhi_score * zhi_weight
     
+    # 地支冲合因素
     if key == "love" and dizhi_score > 0:
         factors.append("地支相合，人际和谐")
     if key == "health" and dizhi_score < -10:
@@ -122,5 +138,4 @@ def calc_dimension(key: str, day_shishen: str, day_wx: str,
     if key == "opportunity" and dizhi_score > 5:
         factors.append("地支相合，贵人运旺")
     
-    return create_dimension(key, min(max(score, 20), 95), factors)
-
+    return create_dimension(key, score, factors)
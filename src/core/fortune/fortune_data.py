@@ -40,6 +40,9 @@ FORTUNE_LEVELS = {
     (0, 40): ("大凶", "⚠️", "运势低迷，韬光养晦"),
 }
 
+# 运势等级对应的表情
+LEVEL_EMOJI = {level: emoji for level, emoji, _ in FORTUNE_LEVELS.values()}
+
 # 年龄阶段特征
 AGE_STAGE = {
     (0, 10): ("童年期", "基础奠定期，受家庭影响大"),
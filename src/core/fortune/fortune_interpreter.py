@@ -1,31 +1,30 @@
 """运势详细解读生成器"""
 from src.models import BaziChart, WuxingAnalysis
 from src.core.bazi.constants import TIANGAN, DIZHI, TIANGAN_WUXING, DIZHI_WUXING
-from src.core.bazi.constants import DIZHI_LIUHE, DIZHI_LIUCHONG, DIZHI_XING
+from src.core.bazi.packed import PackedChart, pack, ZHI_INDEX
+from src.core.bazi.relations import ZHI_RELATION_FLAGS, LIUHE, LIUCHONG, XING
 from src.core.fortune.fortune_data import (
     WUXING_RELATION, get_fortune_level, get_age_stage,
     CAREER_ADVICE, LOVE_ADVICE, HEALTH_ADVICE, WEALTH_ADVICE, get_activities_by_age
 )
 
 
+_PILLAR_ZHI_NAMES = ["年支", "月支", "日支", "时支"]
+
+
 def _get_ganzhi_relations(
-    year_zhi: str, bazi: BaziChart
+    year_zhi: str, bazi: BaziChart | PackedChart
 ) -> list[tuple[str, str]]:
     """分析流年地支与八字的关系"""
     relations = []
-    pillars = [
-        ("年支", bazi.year_pillar.dizhi.value),
-        ("月支", bazi.month_pillar.dizhi.value),
-        ("日支", bazi.day_pillar.dizhi.value),
-        ("时支", bazi.hour_pillar.dizhi.value),
-    ]
-    for name, zhi in pillars:
-        pair = tuple(sorted([year_zhi, zhi]))
-        if pair in DIZHI_LIUHE or (pair[1], pair[0]) in DIZHI_LIUHE:
+    relation_flags = ZHI_RELATION_FLAGS[ZHI_INDEX[year_zhi]]
+    for name, zhi in zip(_PILLAR_ZHI_NAMES, pack(bazi).zhis):
+        flags = relation_flags[zhi]
+        if flags & LIUHE:
             relations.append((name, f"六合{name}"))
-        if pair in DIZHI_LIUCHONG or (pair[1], pair[0]) in DIZHI_LIUCHONG:
+        if flags & LIUCHONG:
             relations.append((name, f"冲{name}"))
-        if pair in DIZHI_XING or (pair[1], pair[0]) in DIZHI_XING:
+        if flags & XING:
             relations.append((name, f"刑{name}"))
     return relations
 
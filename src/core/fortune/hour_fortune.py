@@ -1,8 +1,8 @@
 """吉时推荐模块 - 分析12时辰运势"""
 from datetime import date
-from src.core.bazi.constants import (
-    TIANGAN, DIZHI, TIANGAN_WUXING, DIZHI_LIUHE, DIZHI_LIUCHONG, DIZHI_XING
-)
+from src.core.bazi.constants import TIANGAN, TIANGAN_WUXING
+from src.core.bazi.packed import PackedChart, pack
+from src.core.bazi.relations import ZHI_RELATION_FLAGS, LIUHE, LIUCHONG, XING
 from src.models.bazi_models import BaziChart, WuxingAnalysis
 from src.models.daily_fortune_models import HourFortune, get_fortune_level
 
@@ -28,23 +28,19 @@ HOUR_SUITABLE = {
 
 
 def calculate_hour_fortunes(
-    target_date: date, day_gan: str, bazi: BaziChart, wuxing: WuxingAnalysis
+    target_date: date, day_gan: str, bazi: BaziChart | PackedChart, wuxing: WuxingAnalysis
 ) -> list[HourFortune]:
     """计算当日12时辰运势"""
     favorable = [w.value for w in wuxing.favorable]
     unfavorable = [w.value for w in wuxing.unfavorable]
-    
-    bazi_zhis = [
-        bazi.year_pillar.dizhi.value, bazi.month_pillar.dizhi.value,
-        bazi.day_pillar.dizhi.value, bazi.hour_pillar.dizhi.value,
-    ]
+    bazi_zhis = pack(bazi).zhis
     
     results = []
     gan_start = HOUR_GAN_START.get(day_gan, 0)
     
     for i, (zhi, name, time_range) in enumerate(HOUR_INFO):
         hour_gan = TIANGAN[(gan_start + i) % 10]
-        score = _calc_hour_score(hour_gan, zhi, favorable, unfavorable, bazi_zhis)
+        score = _calc_hour_score(hour_gan, i, favorable, unfavorable, bazi_zhis)
         level, emoji, _ = get_fortune_level(score)
         
         # 根据分数确定适宜事项
@@ -64,9 +60,9 @@ def calculate_hour_fortunes(
 
 
 def _calc_hour_score(
-    hour_gan: str, hour_zhi: str, favorable: list, unfavorable: list, bazi_zhis: list
+    hour_gan: str, hour_zhi: int, favorable: list, unfavorable: list, bazi_zhis: tuple
 ) -> float:
-    """计算时辰分数"""
+    """计算时辰分数（hour_zhi、bazi_zhis 为地支下标）"""
     score = 60.0
     hour_wx = TIANGAN_WUXING[hour_gan]
     
@@ -77,15 +73,14 @@ def _calc_hour_score(
         score -= 12
     
     # 地支关系
+    relation_flags = ZHI_RELATION_FLAGS[hour_zhi]
     for zhi in bazi_zhis:
-        pair = tuple(sorted([hour_zhi, zhi]))
-        rev_pair = (pair[1], pair[0])
-        
-        if pair in DIZHI_LIUHE or rev_pair in DIZHI_LIUHE:
+        flags = relation_flags[zhi]
+        if flags & LIUHE:
             score += 6
-        if pair in DIZHI_LIUCHONG or rev_pair in DIZHI_LIUCHONG:
+        if flags & LIUCHONG:
             score -= 8
-        if pair in DIZHI_XING or rev_pair in DIZHI_XING:
+        if flags & XING:
             score -= 5
     
     return min(max(score, 20), 95)
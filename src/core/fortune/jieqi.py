@@ -2,11 +2,26 @@
 
 使用天文算法计算二十四节气的精确时间
 节气是根据太阳黄经位置确定的
+
+1800-2200 年的节气时刻预先计算并存放在 src/assets/jieqi_1800_2200.bin，
+查询时二分查找，超出范围才实时计算（牛顿迭代，太阳黄经模型由
+Settings.jieqi_solar_model 选择：ephem 或纯 Python 的 Meeus 公式）。
+节气时间均为 UTC，以不带时区的 datetime 表示。精度对比见 docs/jieqi.md。
+
+重新生成节气表：
+    from src.core.fortune.jieqi import write_jieqi_table
+    write_jieqi_table()
 """
-from datetime import datetime, timedelta
-from typing import NamedTuple
+import sys
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Sequence
 import ephem
 import math
+from src.core.utils.config import get_settings
 
 
 class JieQiInfo(NamedTuple):
@@ -32,91 +47,386 @@ JIE_NAMES = [
     "立秋", "白露", "寒露", "立冬", "大雪", "小寒"
 ]
 
+# 节气名称到月份的映射（1=寅月）
+_JIE_TO_MONTH = {name: i + 1 for i, name in enumerate(JIE_NAMES)}
+
+# 预计算节气表
+TABLE_START_YEAR = 1800
+TABLE_END_YEAR = 2200
+_TABLE_FILE = (
+    Path(__file__).parent.parent.parent / "assets"
+    / f"jieqi_{TABLE_START_YEAR}_{TABLE_END_YEAR}.bin"
+)
+
+# 公历年内节气顺序：小寒(JIEQI_TABLE[22]) 开始，冬至结束
+_YEAR_FIRST_INDEX = 22
+_YEAR_ORDER = [(_YEAR_FIRST_INDEX + k) % 24 for k in range(24)]
+
+_EPOCH = datetime(1970, 1, 1)
+# 排盘时节气按北京时间（UTC+8）与出生时间比较
+JIEQI_UTC_OFFSET = timedelta(hours=8)
+# 距表首尾不足此秒数时回退到 ephem，保证前后一个"节"都在表内
+_TABLE_MARGIN = 40 * 86400
+
+
+class JieBoundaries(NamedTuple):
+    """公历年内12个"节"的时刻（北京时间），小寒至大雪"""
+    year: int
+    moments: tuple[datetime, ...]
+
+    @property
+    def lichun(self) -> datetime:
+        """立春时刻（年柱分界）"""
+        return self.moments[1]
+
+    def jieqi_month(self, dt: datetime) -> int:
+        """
+        节气月份（1-12，其中1=寅月），dt 须在本年内
+
+        小寒前为子月(11)，小寒至立春为丑月(12)
+        """
+        return (bisect_right(self.moments, dt) - 2) % 12 + 1
+
+
+class _TermTable(NamedTuple):
+    """按时间排序的节气时刻序列"""
+    seconds: Sequence[int]  # 节气时刻（UTC 秒）
+    first_index: int        # seconds[0] 在 JIEQI_TABLE 中的下标
+
+
+def _to_seconds(dt: datetime) -> int:
+    """datetime 转为 UTC 秒数（不带时区视为 UTC）"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((dt - _EPOCH).total_seconds())
+
+
+def _from_seconds(seconds: int) -> datetime:
+    """UTC 秒数转为不带时区的 datetime"""
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+# 儒略日换算：Unix 纪元对应的儒略日，ephem 日期（Dublin JD）的零点
+_JD_UNIX_EPOCH = 2440587.5
+_JD_DUBLIN_EPOCH = 2415020.0
+_JD_J2000 = 2451545.0
+
+# 太阳平均角速度（度/秒），作为牛顿迭代的初始导数
+_MEAN_SOLAR_MOTION = 360.0 / (365.2422 * 86400)
+# 黄经收敛阈值（度），约合1秒
+_LONGITUDE_TOLERANCE = 1e-5
+_MAX_ITERATIONS = 12
+
+
+def _julian_day(seconds: float) -> float:
+    """UTC 秒数转儒略日"""
+    return _JD_UNIX_EPOCH + seconds / 86400
+
 
-def _get_sun_longitude(dt: datetime) -> float:
-    """获取指定时间的地心太阳黄经（度）"""
+def _longitude_diff(longitude: float, target: float) -> float:
+    """黄经差，归一到 [-180, 180)"""
+    return (longitude - target + 180) % 360 - 180
+
+
+def _sun_longitude_ephem(seconds: float) -> float:
+    """ephem：地心视黄经（当日春分点）"""
+    date = _julian_day(seconds) - _JD_DUBLIN_EPOCH
+    sun = ephem.Sun(date)
+    apparent = ephem.Equatorial(sun.ra, sun.dec, epoch=date)
+    return math.degrees(ephem.Ecliptic(apparent, epoch=date).lon)
+
+
+def _sun_longitude_meeus(seconds: float) -> float:
+    """
+    Meeus《天文算法》第25章低精度公式：地心视黄经
+
+    不依赖 ephem，精度约0.01度（节气时刻误差约15分钟内）
+    """
+    jd = _julian_day(seconds)
+    # ΔT 长期近似（Morrison & Stephenson），UT 转 TT
+    u = (jd - _JD_J2000) / 36525 + 1.8
+    jd += (-20 + 32 * u * u) / 86400
+    t = (jd - _JD_J2000) / 36525
+
+    mean_longitude = 280.46646 + 36000.76983 * t + 0.0003032 * t * t
+    mean_anomaly = math.radians(357.52911 + 35999.05029 * t - 0.0001537 * t * t)
+    center = (
+        (1.914602 - 0.004817 * t - 0.000014 * t * t) * math.sin(mean_anomaly)
+        + (0.019993 - 0.000101 * t) * math.sin(2 * mean_anomaly)
+        + 0.000289 * math.sin(3 * mean_anomaly)
+    )
+    # 章动与光行差修正
+    omega = math.radians(125.04 - 1934.136 * t)
+    return mean_longitude + center - 0.00569 - 0.00478 * math.sin(omega)
+
+
+def _sun_longitude_legacy(seconds: float) -> float:
+    """旧实现：J2000 历元黄经（未计岁差），仅用于精度对比"""
     sun = ephem.Sun()
     observer = ephem.Observer()
-    observer.date = ephem.Date(dt)
+    observer.date = _julian_day(seconds) - _JD_DUBLIN_EPOCH
     sun.compute(observer)
-    
-    # 使用黄道坐标获取地心黄经（弧度转度数）
-    ecliptic = ephem.Ecliptic(sun)
-    longitude = float(ecliptic.lon) * 180.0 / math.pi
-    return longitude % 360
+    return math.degrees(ephem.Ecliptic(sun).lon)
+
 
+# 太阳黄经模型
+SOLAR_MODELS = {
+    "ephem": _sun_longitude_ephem,
+    "meeus": _sun_longitude_meeus,
+    "legacy": _sun_longitude_legacy,
+}
 
-def _find_jieqi_moment(year: int, target_longitude: float) -> datetime:
+
+def _get_sun_longitude(dt: datetime, model: str = "ephem") -> float:
+    """获取指定时间的地心太阳视黄经（度）"""
+    return SOLAR_MODELS[model](_to_seconds(dt)) % 360
+
+
+def _initial_guess(year: int, target_longitude: float) -> float:
+    """按太阳平均运动估算节气时刻（以春分约在3月20日为起点）"""
+    equinox = _to_seconds(datetime(year, 3, 20, 12))
+    guess = equinox + (target_longitude % 360) / _MEAN_SOLAR_MOTION
+    # 小寒、大寒落在当年1月
+    if guess >= _to_seconds(datetime(year + 1, 1, 1)):
+        guess -= 360 / _MEAN_SOLAR_MOTION
+    return guess
+
+
+def _solve_newton(year: int, target_longitude: float, longitude_fn) -> float:
     """
-    查找指定太阳黄经对应的精确时刻
-    使用二分法逼近
+    牛顿/割线法求解节气时刻（UTC 秒）
+
+    首步以太阳平均角速度为导数，之后用割线斜率，通常4-5次求值收敛
     """
-    # 估算初始日期
-    if target_longitude == 315:  # 立春
-        start = datetime(year, 2, 1)
-    elif target_longitude == 0:  # 春分
-        start = datetime(year, 3, 18)
-    elif target_longitude == 90:  # 夏至
-        start = datetime(year, 6, 18)
-    elif target_longitude == 180:  # 秋分
-        start = datetime(year, 9, 20)
-    elif target_longitude == 270:  # 冬至
-        start = datetime(year, 12, 18)
-    else:
-        # 根据黄经估算日期
-        day_of_year = int((target_longitude / 360) * 365) + 80
-        if day_of_year > 365:
-            day_of_year -= 365
-        start = datetime(year, 1, 1) + timedelta(days=day_of_year)
-    
-    # 二分法搜索
-    low = start - timedelta(days=15)
-    high = start + timedelta(days=15)
-    
-    for _ in range(50):  # 迭代50次足够精确到分钟
-        mid = low + (high - low) / 2
-        lon = _get_sun_longitude(mid)
-        
-        # 处理0度附近的跨界情况
-        diff = lon - target_longitude
-        if diff > 180:
-            diff -= 360
-        elif diff < -180:
-            diff += 360
-        
-        if abs(diff) < 0.0001:  # 精度约为秒级
-            return mid
-        elif diff > 0:
+    t0 = _initial_guess(year, target_longitude)
+    f0 = _longitude_diff(longitude_fn(t0), target_longitude)
+    t1 = t0 - f0 / _MEAN_SOLAR_MOTION
+    for _ in range(_MAX_ITERATIONS):
+        f1 = _longitude_diff(longitude_fn(t1), target_longitude)
+        if abs(f1) < _LONGITUDE_TOLERANCE:
+            break
+        slope = (f1 - f0) / (t1 - t0) if t1 != t0 else _MEAN_SOLAR_MOTION
+        t0, f0 = t1, f1
+        t1 -= f1 / slope
+    return t1
+
+
+def _solve_bisect(year: int, target_longitude: float, longitude_fn) -> float:
+    """二分法求解节气时刻（UTC 秒），旧实现的搜索方式"""
+    guess = _initial_guess(year, target_longitude)
+    low = guess - 15 * 86400
+    high = guess + 15 * 86400
+    for _ in range(50):
+        mid = (low + high) / 2
+        diff = _longitude_diff(longitude_fn(mid), target_longitude)
+        if abs(diff) < _LONGITUDE_TOLERANCE:
+            break
+        if diff > 0:
             high = mid
         else:
             low = mid
-    
     return mid
 
 
+_SOLVERS = {"newton": _solve_newton, "bisect": _solve_bisect}
+
+
+def _find_jieqi_moment(
+    year: int,
+    target_longitude: float,
+    solver: str = "newton",
+    model: str = "ephem"
+) -> datetime:
+    """
+    查找指定太阳黄经对应的精确时刻（落在公历 year 年内）
+
+    Args:
+        year: 公历年份
+        target_longitude: 目标太阳黄经（度）
+        solver: 求解方式 newton/bisect
+        model: 太阳黄经模型 ephem/meeus/legacy
+    """
+    seconds = _SOLVERS[solver](year, target_longitude, SOLAR_MODELS[model])
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+@lru_cache(maxsize=64)
+def _compute_year_seconds(year: int, model: str = "ephem") -> tuple[int, ...]:
+    """实时计算公历年内24个节气的时刻（小寒至冬至）"""
+    longitude_fn = SOLAR_MODELS[model]
+    return tuple(
+        round(_solve_newton(year, JIEQI_TABLE[idx][0], longitude_fn))
+        for idx in _YEAR_ORDER
+    )
+
+
+def compare_jieqi_solvers(
+    years: Sequence[int],
+    solver: str = "newton",
+    model: str = "ephem",
+    reference_solver: str = "bisect",
+    reference_model: str = "legacy"
+) -> dict:
+    """
+    比较两种节气计算方式的差异
+
+    Returns:
+        dict: 节气数、最大/平均偏差（秒）、最大偏差出现的节气
+    """
+    diffs = []
+    for year in years:
+        for longitude, name in JIEQI_TABLE:
+            moment = _find_jieqi_moment(year, longitude, solver, model)
+            reference = _find_jieqi_moment(year, longitude, reference_solver, reference_model)
+            diffs.append(((moment - reference).total_seconds(), year, name))
+    worst = max(diffs, key=lambda d: abs(d[0]))
+    return {
+        "count": len(diffs),
+        "max_abs_seconds": abs(worst[0]),
+        "mean_seconds": sum(d[0] for d in diffs) / len(diffs),
+        "mean_abs_seconds": sum(abs(d[0]) for d in diffs) / len(diffs),
+        "worst": f"{worst[1]}年{worst[2]}",
+    }
+
+
+def build_jieqi_table(
+    start_year: int = TABLE_START_YEAR,
+    end_year: int = TABLE_END_YEAR
+) -> array:
+    """
+    计算节气表
+
+    格式：int64 小端序，头部 [起始年, 结束年, 首个节气下标]，
+    随后为每年24个节气的 UTC 秒数（小寒至冬至）
+    """
+    seconds = array("q")
+    for year in range(start_year, end_year + 1):
+        seconds.extend(_compute_year_seconds(year))
+    # 相邻节气间隔约14-16天，超出说明求解失败
+    for prev, cur in zip(seconds, seconds[1:]):
+        if not 13 * 86400 < cur - prev < 17 * 86400:
+            raise ValueError(f"节气时刻不连续: {_from_seconds(cur)}")
+    return array("q", [start_year, end_year, _YEAR_FIRST_INDEX]) + seconds
+
+
+def write_jieqi_table(path: Path = _TABLE_FILE) -> None:
+    """生成并写入节气表文件"""
+    table = build_jieqi_table()
+    if sys.byteorder != "little":
+        table.byteswap()
+    path.write_bytes(table.tobytes())
+    _load_table.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _load_table() -> _TermTable | None:
+    """加载预计算节气表（文件缺失时返回 None）"""
+    if not _TABLE_FILE.exists():
+        return None
+    data = array("q")
+    data.frombytes(_TABLE_FILE.read_bytes())
+    if sys.byteorder != "little":
+        data.byteswap()
+    return _TermTable(seconds=data[3:], first_index=data[2])
+
+
+@lru_cache(maxsize=32)
+def _fallback_table(year: int, model: str = "ephem") -> _TermTable:
+    """表外年份：实时计算前后三年的节气"""
+    seconds = [
+        s for y in (year - 1, year, year + 1)
+        for s in _compute_year_seconds(y, model)
+    ]
+    return _TermTable(seconds=seconds, first_index=_YEAR_FIRST_INDEX)
+
+
+def _table_for(dt: datetime) -> _TermTable:
+    """选择覆盖指定时刻的节气表"""
+    table = _load_table()
+    if table is not None:
+        ts = _to_seconds(dt)
+        if table.seconds[0] + _TABLE_MARGIN <= ts < table.seconds[-1] - _TABLE_MARGIN:
+            return table
+    return _fallback_table(dt.year, get_settings().jieqi_solar_model)
+
+
+def _year_seconds(year: int) -> Sequence[int]:
+    """获取公历年内24个节气的时刻（小寒至冬至）"""
+    table = _load_table()
+    if table is not None and TABLE_START_YEAR <= year <= TABLE_END_YEAR:
+        offset = (year - TABLE_START_YEAR) * 24
+        return table.seconds[offset:offset + 24]
+    return _compute_year_seconds(year, get_settings().jieqi_solar_model)
+
+
+def _term_info(index: int, seconds: int) -> JieQiInfo:
+    """由 JIEQI_TABLE 下标和时刻构造节气信息"""
+    longitude, name = JIEQI_TABLE[index % 24]
+    return JieQiInfo(
+        name=name,
+        solar_longitude=longitude,
+        datetime=_from_seconds(seconds)
+    )
+
+
+@lru_cache(maxsize=512)
+def get_jie_boundaries(year: int) -> JieBoundaries:
+    """获取公历年内12个"节"的北京时间（按年缓存，供年柱、月柱、起运共用）"""
+    # _YEAR_ORDER 中"节"与"气"交替，小寒为首
+    moments = tuple(
+        _from_seconds(seconds) + JIEQI_UTC_OFFSET
+        for seconds in _year_seconds(year)[::2]
+    )
+    return JieBoundaries(year=year, moments=moments)
+
+
+def get_jie_span(dt: datetime) -> tuple[datetime, datetime]:
+    """获取北京时间 dt 所在节气月的起止时刻（前一个节、后一个节）"""
+    boundaries = get_jie_boundaries(dt.year)
+    i = bisect_right(boundaries.moments, dt)
+    start = (
+        boundaries.moments[i - 1] if i > 0
+        else get_jie_boundaries(dt.year - 1).moments[-1]
+    )
+    end = (
+        boundaries.moments[i] if i < len(boundaries.moments)
+        else get_jie_boundaries(dt.year + 1).moments[0]
+    )
+    return start, end
+
+
+def term_at(dt: datetime) -> JieQiInfo:
+    """获取指定时刻所处的节气（该时刻及之前最近的节气）"""
+    table = _table_for(dt)
+    i = bisect_right(table.seconds, _to_seconds(dt)) - 1
+    return _term_info(table.first_index + i, table.seconds[i])
+
+
+def prev_jie(dt: datetime) -> JieQiInfo:
+    """获取指定时刻及之前最近的"节"（月柱分界）"""
+    table = _table_for(dt)
+    i = bisect_right(table.seconds, _to_seconds(dt)) - 1
+    # JIEQI_TABLE 偶数下标为"节"，奇数为"气"
+    if (table.first_index + i) % 2:
+        i -= 1
+    return _term_info(table.first_index + i, table.seconds[i])
+
+
+def next_jie(dt: datetime) -> JieQiInfo:
+    """获取指定时刻之后最近的"节"（不含该时刻）"""
+    table = _table_for(dt)
+    i = bisect_right(table.seconds, _to_seconds(dt))
+    if (table.first_index + i) % 2:
+        i += 1
+    return _term_info(table.first_index + i, table.seconds[i])
+
+
 def get_jieqi_for_year(year: int) -> list[JieQiInfo]:
-    """获取指定年份的所有节气"""
-    jieqi_list = []
-    
-    for longitude, name in JIEQI_TABLE:
-        # 冬至、小寒、大寒可能跨年
-        if longitude >= 270:
-            # 可能在前一年末或本年初
-            dt = _find_jieqi_moment(year, longitude)
-            if dt.month > 6:  # 属于前一年
-                dt = _find_jieqi_moment(year + 1, longitude)
-        else:
-            dt = _find_jieqi_moment(year, longitude)
-        
-        jieqi_list.append(JieQiInfo(
-            name=name,
-            solar_longitude=longitude,
-            datetime=dt
-        ))
-    
-    # 按日期排序
-    jieqi_list.sort(key=lambda x: x.datetime)
-    return jieqi_list
+    """获取指定公历年份的所有节气（按时间排序，小寒至冬至）"""
+    return [
+        _term_info(idx, seconds)
+        for idx, seconds in zip(_YEAR_ORDER, _year_seconds(year))
+    ]
 
 
 def get_jie_for_month(year: int, month: int) -> JieQiInfo:
@@ -124,30 +434,9 @@ def get_jie_for_month(year: int, month: int) -> JieQiInfo:
     获取指定月份的节（用于月柱计算）
     返回该月的节气精确时间
     """
-    # 月份对应的节气索引（立春开始）
-    jie_index_map = {
-        2: 0,   # 立春 -> 寅月
-        3: 2,   # 惊蛰 -> 卯月
-        4: 4,   # 清明 -> 辰月
-        5: 6,   # 立夏 -> 巳月
-        6: 8,   # 芒种 -> 午月
-        7: 10,  # 小暑 -> 未月
-        8: 12,  # 立秋 -> 申月
-        9: 14,  # 白露 -> 酉月
-        10: 16, # 寒露 -> 戌月
-        11: 18, # 立冬 -> 亥月
-        12: 20, # 大雪 -> 子月
-        1: 22,  # 小寒 -> 丑月
-    }
-    
-    idx = jie_index_map.get(month, 0)
-    longitude, name = JIEQI_TABLE[idx % 24]
-    
-    # 1月的小寒可能在上一年
-    target_year = year if month > 1 else year
-    dt = _find_jieqi_moment(target_year, longitude)
-    
-    return JieQiInfo(name=name, solar_longitude=longitude, datetime=dt)
+    # 2月立春 -> 寅月，依次类推，1月小寒 -> 丑月
+    idx = ((month - 2) % 12) * 2
+    return _term_info(idx, _year_seconds(year)[_YEAR_ORDER.index(idx)])
 
 
 def get_jieqi_month(dt: datetime) -> int:
@@ -155,41 +444,10 @@ def get_jieqi_month(dt: datetime) -> int:
     根据精确节气计算月份（用于月柱）
     返回农历月份（1-12，其中1=寅月）
     """
-    year = dt.year
-    
-    # 获取当年所有节气
-    jieqi_list = get_jieqi_for_year(year)
-    
-    # 找到dt之前最近的"节"
-    current_jie = None
-    for jq in jieqi_list:
-        if jq.name in JIE_NAMES and jq.datetime <= dt:
-            current_jie = jq
-    
-    # 如果在立春之前，检查前一年的节气
-    if current_jie is None or dt < jieqi_list[0].datetime:
-        prev_jieqi = get_jieqi_for_year(year - 1)
-        for jq in reversed(prev_jieqi):
-            if jq.name in JIE_NAMES and jq.datetime <= dt:
-                current_jie = jq
-                break
-    
-    if current_jie is None:
-        # 默认返回丑月
-        return 12
-    
-    # 节气名称到月份的映射
-    jie_to_month = {
-        "立春": 1, "惊蛰": 2, "清明": 3, "立夏": 4,
-        "芒种": 5, "小暑": 6, "立秋": 7, "白露": 8,
-        "寒露": 9, "立冬": 10, "大雪": 11, "小寒": 12
-    }
-    
-    return jie_to_month.get(current_jie.name, 1)
+    return _JIE_TO_MONTH[prev_jie(dt).name]
 
 
 def is_before_lichun(dt: datetime) -> bool:
     """判断日期是否在立春之前（用于年柱计算）"""
-    year = dt.year
-    lichun = _find_jieqi_moment(year, 315)  # 立春黄经315度
-    return dt < lichun
+    lichun = _year_seconds(dt.year)[_YEAR_ORDER.index(0)]  # 立春黄经315度
+    return _to_seconds(dt) < lichun
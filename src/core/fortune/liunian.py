@@ -2,9 +2,14 @@
 from datetime import datetime
 from src.models import BaziChart, WuxingAnalysis
 from src.models.bazi_models import LiuNianFortune, LiuNianAnalysis, DaYunInfo
-from src.core.bazi.constants import TIANGAN, DIZHI, TIANGAN_WUXING, DIZHI_LIUHE, DIZHI_LIUCHONG
+from src.core.bazi.constants import TIANGAN, DIZHI, TIANGAN_WUXING
+from src.core.bazi.packed import PackedChart, pack, ZHI_INDEX
+from src.core.bazi.relations import ZHI_RELATION_FLAGS, LIUHE, LIUCHONG
 from src.core.bazi.nayin import get_nayin, get_nayin_wuxing
 from src.core.fortune.liunian_data import WUXING_MATTERS, get_level
+from src.core.utils.hashing import stable_noise
+
+_PILLAR_NAMES = ["年", "月", "日", "时"]
 
 
 def _get_year_ganzhi(year: int) -> tuple[str, str]:
@@ -12,24 +17,21 @@ def _get_year_ganzhi(year: int) -> tuple[str, str]:
     return TIANGAN[(year - 4) % 10], DIZHI[(year - 4) % 12]
 
 
-def _analyze_relations(year_zhi: str, bazi: BaziChart) -> list[tuple[str, str, str]]:
+def _analyze_relations(
+    year_zhi: str, bazi: BaziChart | PackedChart
+) -> list[tuple[str, str, str]]:
     """分析流年地支与八字的合冲关系"""
     relations = []
-    pillars = [
-        ("年", bazi.year_pillar), ("月", bazi.month_pillar),
-        ("日", bazi.day_pillar), ("时", bazi.hour_pillar),
-    ]
+    relation_flags = ZHI_RELATION_FLAGS[ZHI_INDEX[year_zhi]]
     
-    for name, pillar in pillars:
-        bazi_zhi = pillar.dizhi.value
+    for name, bazi_zhi in zip(_PILLAR_NAMES, pack(bazi).zhis):
+        flags = relation_flags[bazi_zhi]
         # 检查六合
-        for (a, b) in DIZHI_LIUHE:
-            if {year_zhi, bazi_zhi} == {a, b}:
-                relations.append((f"{name}支", "合", f"流年与{name}支相合"))
+        if flags & LIUHE:
+            relations.append((f"{name}支", "合", f"流年与{name}支相合"))
         # 检查六冲
-        for (a, b) in DIZHI_LIUCHONG:
-            if {year_zhi, bazi_zhi} == {a, b}:
-                relations.append((f"{name}支", "冲", f"流年与{name}支相冲"))
+        if flags & LIUCHONG:
+            relations.append((f"{name}支", "冲", f"流年与{name}支相冲"))
     
     return relations
 
@@ -49,7 +51,7 @@ def _calc_score(year_gan: str, wuxing: WuxingAnalysis, relations: list) -> int:
     for _, rel_type, _ in relations:
         score += 10 if rel_type == "合" else -12 if rel_type == "冲" else 0
     
-    score += (hash(year_gan) % 10) - 5
+    score += stable_noise(year_gan, 10) - 5
     return max(25, min(95, score))
 
 
@@ -0,0 +1,67 @@
+"""流年评分 - 向量化计算流年分数（不生成解读）
+
+流年分数只取决于命盘与流年干支，先按天干、地支下标展开成两张表，
+任意年份区间的分数都只需查表相加，供流年运势、大运K线与区间K线共用。
+"""
+import numpy as np
+from src.models.bazi_models import BaziChart, WuxingAnalysis
+from src.core.bazi.constants import TIANGAN, TIANGAN_WUXING
+from src.core.bazi.packed import pack
+from src.core.bazi.relations import ZHI_RELATION_FLAGS, LIUHE, LIUCHONG, XING
+
+
+def year_score_tables(
+    bazi: BaziChart, wuxing: WuxingAnalysis
+) -> tuple[np.ndarray, np.ndarray]:
+    """流年评分中只取决于命盘的部分，按流年天干（10）、地支（12）下标预先展开
+
+    计算因素：
+    1. 喜用神加分（+18），忌神减分（-12）
+    2. 地支冲合关系（六合+6，六冲-10、冲日支再-5，刑-6）
+    """
+    # 1. 喜忌判断（核心因素）
+    favorable_wx = {w.value for w in wuxing.favorable}
+    unfavorable_wx = {w.value for w in wuxing.unfavorable}
+    gan_delta = np.array([
+        18 if TIANGAN_WUXING[gan] in favorable_wx      # 喜神年大幅加分
+        else -12 if TIANGAN_WUXING[gan] in unfavorable_wx  # 忌神年减分
+        else 0
+        for gan in TIANGAN
+    ])
+
+    # 2. 地支关系分析
+    packed = pack(bazi)
+    zhi_delta = np.zeros(12, dtype=int)
+    for year_zhi in range(12):
+        relation_flags = ZHI_RELATION_FLAGS[year_zhi]
+        for zhi in packed.zhis:
+            flags = relation_flags[zhi]
+            if flags & LIUHE:
+                zhi_delta[year_zhi] += 6  # 六合加分
+            if flags & LIUCHONG:
+                zhi_delta[year_zhi] -= 10  # 六冲减分（冲日支影响更大）
+                if zhi == packed.day_zhi:
+                    zhi_delta[year_zhi] -= 5  # 冲日支额外减分
+            if flags & XING:
+                zhi_delta[year_zhi] -= 6  # 刑减分
+    return gan_delta, zhi_delta
+
+
+def calculate_year_scores(
+    bazi: BaziChart, wuxing: WuxingAnalysis, years: int = 91
+) -> np.ndarray:
+    """一次算出从出生起 years 年的流年分数向量（不生成解读）
+
+    分数 = 60 + 喜忌 + 地支关系 + 年龄阶段微调（壮年+3，幼年老年-2），
+    限制在 32-93 分，避免极端值过多
+    """
+    gan_delta, zhi_delta = year_score_tables(bazi, wuxing)
+    ages = np.arange(years)
+    cycle = bazi.birth_datetime.year + ages - 4
+
+    # 基础分60分（对应"平"级别）
+    scores = 60 + gan_delta[cycle % 10] + zhi_delta[cycle % 12]
+    # 年龄阶段微调
+    scores += np.where((ages >= 25) & (ages <= 50), 3, 0)
+    scores -= np.where((ages < 10) | (ages > 75), 2, 0)
+    return np.clip(scores, 32, 93).astype(float)
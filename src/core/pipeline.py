@@ -0,0 +1,212 @@
+"""全量分析流水线 - 一次出生信息，按依赖图计算全部分析
+
+各分析阶段声明所依赖的阶段，共享排盘等中间结果：
+
+    chart ─┬─ shishen / dayun / shensha / nayin / auxiliary / fortunes / daily_reports
+           └─ bonefate（真太阳时）
+
+配置 analysis_workers > 1 时，依赖就绪的阶段提交到线程池并发执行（各阶段多为
+纯 Python 计算、单个仅毫秒级，受 GIL 限制默认顺序执行反而更快）。
+结果按 (出生信息, 当天日期) 整体缓存在 full_analysis 命名空间，只请求部分阶段时
+仅计算缺少的阶段并补入缓存。
+返回的对象为共享对象，调用方不应修改（流年解读经 YearFortune.get_detail() 按需生成，
+记在对象私有缓存中、加锁，不改动公开字段）。
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+from src.models import BaziChart, Gender, WuxingAnalysis
+from src.core.bazi.auxiliary import calculate_auxiliary_from_bazi
+from src.core.bazi.chart_cache import CachedChart, ChartKey, get_chart, normalize_birth_input
+from src.core.bazi.nayin import calculate_nayin
+from src.core.bazi.shensha import calculate_shensha
+from src.core.bazi.shishen import analyze_shishen
+from src.core.fortune.daily_fortune_report import generate_daily_fortune_report
+from src.core.fortune.dayun import calculate_dayun
+from src.core.analysis.bonefate import analyze_bonefate
+from src.core.utils.cache import get_cache
+from src.core.utils.config import get_settings
+from src.core.utils.solar_time import Location
+
+# 流水线结果版本：阶段或其算法变更时递增，使持久化缓存中的旧结果失效
+PIPELINE_CACHE_VERSION = 1
+# 流年覆盖的年数（0-90岁）
+FORTUNE_YEARS = 91
+# 每日运势报告天数（今日、明日、后日）
+DAILY_REPORT_DAYS = 3
+
+
+class BirthInput(NamedTuple):
+    """出生信息"""
+    birth_datetime: datetime
+    gender: Gender | str
+    birth_place: Optional[str | Location] = None
+    true_solar_time: bool = True
+
+
+class Stage(NamedTuple):
+    """分析阶段"""
+    deps: tuple[str, ...]
+    func: Callable[..., Any]  # 参数依次为各依赖阶段的结果与当天日期
+
+
+def _year_fortunes(chart: CachedChart, today: date):
+    from src.ai.interpreter import calculate_year_fortunes
+    # 解读文本按需生成（YearFortune.get_detail）
+    return calculate_year_fortunes(chart.bazi, chart.wuxing, FORTUNE_YEARS, with_detail=False)
+
+
+def _daily_reports(chart: CachedChart, today: date):
+    return [
+        generate_daily_fortune_report(today + timedelta(days=i), chart.bazi, chart.wuxing)
+        for i in range(DAILY_REPORT_DAYS)
+    ]
+
+
+# 阶段依赖图（chart 由出生信息直接得到，不在图中）
+STAGES: dict[str, Stage] = {
+    "shishen": Stage(("chart",), lambda chart, today: analyze_shishen(chart.bazi)),
+    "dayun": Stage(("chart",), lambda chart, today: calculate_dayun(chart.bazi, chart.wuxing)),
+    "shensha": Stage(("chart",), lambda chart, today: calculate_shensha(chart.bazi)),
+    "nayin": Stage(("chart",), lambda chart, today: calculate_nayin(chart.bazi)),
+    "auxiliary": Stage(("chart",), lambda chart, today: calculate_auxiliary_from_bazi(chart.bazi)),
+    "fortunes": Stage(("chart",), _year_fortunes),
+    "bonefate": Stage(("chart",), lambda chart, today: analyze_bonefate(chart.solar_datetime)),
+    "daily_reports": Stage(("chart",), _daily_reports),
+}
+ALL_STAGES = ("chart", *STAGES)
+
+
+class FullAnalysis(NamedTuple):
+    """全量分析结果（未请求的阶段为 None）"""
+    chart: CachedChart
+    shishen: Any = None
+    dayun: Any = None
+    shensha: Any = None
+    nayin: Any = None
+    auxiliary: Any = None
+    fortunes: Any = None
+    bonefate: Any = None
+    daily_reports: Any = None
+
+    @property
+    def bazi(self) -> BaziChart:
+        return self.chart.bazi
+
+    @property
+    def wuxing(self) -> WuxingAnalysis:
+        return self.chart.wuxing
+
+    @property
+    def solar_datetime(self) -> datetime:
+        return self.chart.solar_datetime
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """流水线线程池（首次使用时创建）"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_settings().analysis_workers,
+                    thread_name_prefix="full-analysis",
+                )
+    return _executor
+
+
+def resolve_stages(stages: Iterable[str] | None = None) -> list[str]:
+    """补全依赖并按拓扑序排列；None 表示全部阶段"""
+    if stages is None:
+        return list(ALL_STAGES)
+    ordered: list[str] = []
+
+    def visit(name: str) -> None:
+        if name in ordered:
+            return
+        if name != "chart" and name not in STAGES:
+            raise ValueError(f"未知分析阶段: {name}，可选 {ALL_STAGES}")
+        for dep in STAGES[name].deps if name != "chart" else ():
+            visit(dep)
+        ordered.append(name)
+
+    for name in stages:
+        visit(name)
+    return ordered
+
+
+def _run_stages(
+    results: dict[str, Any], pending: list[str], today: date, concurrent: bool
+) -> None:
+    """按依赖图执行 pending 中的阶段，结果写入 results"""
+    if not concurrent:
+        for name in pending:
+            stage = STAGES[name]
+            results[name] = stage.func(*(results[d] for d in stage.deps), today)
+        return
+
+    executor = _get_executor()
+    running: dict[Future, str] = {}
+    waiting = list(pending)
+    try:
+        while waiting or running:
+            for name in [n for n in waiting if all(d in results for d in STAGES[n].deps)]:
+                stage = STAGES[name]
+                running[executor.submit(stage.func, *(results[d] for d in stage.deps), today)] = name
+                waiting.remove(name)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    finally:
+        for future in running:
+            future.cancel()
+
+
+def compute_full_analysis(
+    birth_input: BirthInput,
+    stages: Iterable[str] | None = None,
+    today: date | None = None,
+    concurrent: bool | None = None,
+) -> FullAnalysis:
+    """
+    计算出生信息的全量分析
+
+    Args:
+        birth_input: 出生信息
+        stages: 需要的阶段（依赖自动补全），None 表示全部，见 ALL_STAGES
+        today: 每日运势的起始日期，默认今天
+        concurrent: 是否并发执行相互独立的阶段，None 表示按配置 analysis_workers > 1
+
+    Returns:
+        FullAnalysis，未请求且未缓存的阶段为 None
+    """
+    key: ChartKey = normalize_birth_input(*birth_input)
+    today = today or date.today()
+    wanted = resolve_stages(stages)
+
+    settings = get_settings()
+    if concurrent is None:
+        concurrent = settings.analysis_workers > 1
+    use_cache = settings.cache_enabled
+    cache = get_cache("full_analysis", version=PIPELINE_CACHE_VERSION)
+    cache_key = (key, today)
+    cached = cache.get(cache_key) if use_cache else None
+    results: dict[str, Any] = dict(cached or {})
+
+    missing = [name for name in wanted if name not in results]
+    if missing:
+        if "chart" not in results:
+            results["chart"] = get_chart(
+                key.birth_datetime, key.gender, key.birth_place, key.true_solar_time
+            )
+            missing.remove("chart")
+        _run_stages(results, missing, today, concurrent and len(missing) > 1)
+        if use_cache:
+            cache.set(cache_key, results)
+
+    return FullAnalysis(**{name: results[name] for name in ALL_STAGES if name in results})
@@ -1,127 +1,332 @@
 """缓存模块
 
-提供简单的内存缓存功能，用于缓存八字计算结果。
+提供有界的内存缓存，用于缓存八字计算结果。
+
+- 条目数与近似字节数双重上限，超出时按 LRU 淘汰（OrderedDict，O(1)）
+- 线程安全：写操作加锁；读操作不加锁查表，仅在锁空闲时顺带提升 LRU 位置
+- 按命名空间划分实例（如 default、chart），各自统计命中/未命中/淘汰
+- 后台线程定期清理过期条目，无需等到读取时才释放内存
+- 可选 SQLite 持久化二级缓存（见 persistent_cache），多进程共享、重启不丢
 """
 import hashlib
+import sys
+import threading
 import time
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Callable, Optional
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Optional
 from src.core.utils.config import get_settings
 
+if TYPE_CHECKING:
+    from src.core.utils.persistent_cache import TieredCache
+
+# 缺省值哨兵（允许缓存 None）
+_MISSING = object()
+# 估算对象大小时的最大递归深度
+_SIZE_DEPTH = 6
+
+
+def approx_size(obj: Any, _depth: int = 0, _seen: Optional[set] = None) -> int:
+    """
+    估算对象占用的字节数
+
+    递归累加容器元素、对象属性（含 pydantic 模型字段）的 sys.getsizeof，
+    numpy 数组取 nbytes；共享对象只计一次，超过深度的部分忽略
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return size + nbytes
+    if _depth >= _SIZE_DEPTH or isinstance(obj, (str, bytes, int, float, bool)):
+        return size
+
+    depth = _depth + 1
+    if isinstance(obj, dict):
+        size += sum(
+            approx_size(k, depth, _seen) + approx_size(v, depth, _seen)
+            for k, v in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_size(item, depth, _seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += approx_size(vars(obj), depth, _seen)
+    return size
+
+
+class BoundedCache:
+    """
+    有界 LRU + TTL 缓存
+
+    Args:
+        default_ttl: 默认过期时间（秒）
+        maxsize: 最大条目数
+        max_bytes: 近似字节预算，None 表示不限
+        namespace: 命名空间（用于统计展示）
 
-class SimpleCache:
-    """简单的内存缓存实现"""
-    
-    def __init__(self, default_ttl: int = 3600):
-        self._cache: dict[str, tuple[Any, float]] = {}
+    读路径上的命中计数不加锁，统计值为近似值
+    """
+
+    def __init__(
+        self,
+        default_ttl: int = 3600,
+        maxsize: int = 10000,
+        max_bytes: Optional[int] = None,
+        namespace: str = "default",
+    ):
+        # key -> (value, expire_time, nbytes)
+        self._cache: OrderedDict[Hashable, tuple[Any, float, int]] = OrderedDict()
         self._default_ttl = default_ttl
-    
-    def _make_key(self, *args, **kwargs) -> str:
-        """生成缓存键"""
-        key_data = str(args) + str(sorted(kwargs.items()))
-        return hashlib.md5(key_data.encode()).hexdigest()
-    
-    def get(self, key: str) -> Optional[Any]:
-        """获取缓存值"""
-        if key in self._cache:
-            value, expire_time = self._cache[key]
-            if time.time() < expire_time:
-                return value
-            else:
-                del self._cache[key]
-        return None
-    
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """设置缓存值"""
+        self._maxsize = maxsize
+        self._max_bytes = max_bytes
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _make_key(*args, **kwargs) -> Hashable:
+        """生成缓存键：参数可哈希时直接用元组，否则退化为 repr 摘要"""
+        key = (args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+            return key
+        except TypeError:
+            return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """获取缓存值（读路径不阻塞）"""
+        item = self._cache.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+        value, expire_time, _ = item
+        if time.time() >= expire_time:
+            with self._lock:
+                current = self._cache.get(key)
+                if current is item:
+                    self._remove(key)
+                    self.expirations += 1
+            self.misses += 1
+            return default
+        # 锁被占用时跳过 LRU 提升，近似 LRU 换取读不等待
+        if self._lock.acquire(blocking=False):
+            try:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+            finally:
+                self._lock.release()
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[int] = None) -> None:
+        """设置缓存值，超出条目数或字节预算时淘汰最久未使用的条目"""
         expire_time = time.time() + (ttl or self._default_ttl)
-        self._cache[key] = (value, expire_time)
-    
-    def delete(self, key: str) -> None:
+        nbytes = approx_size(value) if self._max_bytes is not None else 0
+        if self._max_bytes is not None and nbytes > self._max_bytes:
+            # 单个值超过总预算，不缓存
+            self.delete(key)
+            return
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            self._cache[key] = (value, expire_time, nbytes)
+            self._bytes += nbytes
+            while len(self._cache) > self._maxsize or (
+                self._max_bytes is not None and self._bytes > self._max_bytes
+            ):
+                oldest = next(iter(self._cache))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        """移除条目（调用方持有锁）"""
+        _, _, nbytes = self._cache.pop(key)
+        self._bytes -= nbytes
+
+    def delete(self, key: Hashable) -> None:
         """删除缓存"""
-        if key in self._cache:
-            del self._cache[key]
-    
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+
     def clear(self) -> None:
-        """清空缓存"""
-        self._cache.clear()
-    
+        """清空缓存并重置统计"""
+        with self._lock:
+            self._cache.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
     def cleanup(self) -> int:
         """清理过期缓存，返回清理数量"""
         now = time.time()
-        expired_keys = [
-            k for k, (_, expire_time) in self._cache.items()
-            if expire_time <= now
-        ]
-        for key in expired_keys:
-            del self._cache[key]
+        with self._lock:
+            expired_keys = [
+                k for k, (_, expire_time, _) in self._cache.items()
+                if expire_time <= now
+            ]
+            for key in expired_keys:
+                self._remove(key)
+            self.expirations += len(expired_keys)
         return len(expired_keys)
-    
+
     @property
     def size(self) -> int:
         """缓存大小"""
         return len(self._cache)
 
+    @property
+    def nbytes(self) -> int:
+        """已缓存值的近似字节数（未设字节预算时为 0）"""
+        return self._bytes
+
+    def stats(self) -> dict:
+        """命中统计"""
+        total = self.hits + self.misses
+        return {
+            "size": self.size,
+            "maxsize": self._maxsize,
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# 兼容旧名称
+SimpleCache = BoundedCache
+
+# 命名空间 -> 缓存实例
+_caches: dict[str, "BoundedCache | TieredCache"] = {}
+_registry_lock = threading.Lock()
+_sweeper: Optional[threading.Thread] = None
+
+
+def _sweep_loop(interval: float) -> None:
+    """后台定期清理所有命名空间的过期条目"""
+    while True:
+        time.sleep(interval)
+        for cache in list(_caches.values()):
+            cache.cleanup()
+
+
+def _ensure_sweeper() -> None:
+    """启动后台清理线程（每进程一个，守护线程）"""
+    global _sweeper
+    interval = get_settings().cache_sweep_interval
+    if _sweeper is None and interval > 0:
+        _sweeper = threading.Thread(
+            target=_sweep_loop, args=(interval,), name="cache-sweeper", daemon=True
+        )
+        _sweeper.start()
 
-# 全局缓存实例
-_cache: Optional[SimpleCache] = None
 
+def get_cache(
+    namespace: str = "default",
+    maxsize: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    ttl: Optional[int] = None,
+    version: int = 1,
+) -> "BoundedCache | TieredCache":
+    """
+    获取命名空间的缓存实例
 
-def get_cache() -> SimpleCache:
-    """获取缓存实例"""
-    global _cache
-    if _cache is None:
-        settings = get_settings()
-        _cache = SimpleCache(default_ttl=settings.cache_ttl)
-    return _cache
+    首次获取时创建，maxsize/max_bytes/ttl 缺省取配置中的 cache_max_entries、
+    cache_max_bytes、cache_ttl；之后再传入的参数被忽略。
+    配置 cache_backend=sqlite 时返回内存 + SQLite（cache_path）两级缓存，
+    version 为该命名空间的结果版本，算法变更时递增以使磁盘上的旧结果失效
+    """
+    cache = _caches.get(namespace)
+    if cache is not None:
+        return cache
+    with _registry_lock:
+        if namespace not in _caches:
+            settings = get_settings()
+            cache = BoundedCache(
+                default_ttl=ttl or settings.cache_ttl,
+                maxsize=maxsize or settings.cache_max_entries,
+                max_bytes=max_bytes or settings.cache_max_bytes,
+                namespace=namespace,
+            )
+            if settings.cache_backend == "sqlite":
+                from src.core.utils.persistent_cache import SQLiteCache, TieredCache
+                disk = SQLiteCache(
+                    settings.cache_path, ttl or settings.cache_ttl, namespace, version,
+                    settings.cache_disk_max_entries,
+                )
+                cache = TieredCache(cache, disk)
+            _caches[namespace] = cache
+            _ensure_sweeper()
+        return _caches[namespace]
 
 
-def cached(ttl: Optional[int] = None) -> Callable:
+def cached(ttl: Optional[int] = None, namespace: str = "default") -> Callable:
     """
     缓存装饰器
-    
+
     使用方法:
         @cached(ttl=3600)
         def expensive_calculation(arg1, arg2):
             ...
-    
+
     Args:
         ttl: 缓存过期时间（秒），None 使用默认值
+        namespace: 缓存命名空间
     """
     def decorator(func: Callable) -> Callable:
+        prefix = f"{func.__module__}.{func.__qualname__}"
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             settings = get_settings()
             if not settings.cache_enabled:
                 return func(*args, **kwargs)
-            
-            cache = get_cache()
-            key = f"{func.__module__}.{func.__name__}:" + cache._make_key(*args, **kwargs)
-            
+
+            cache = get_cache(namespace)
+            key = (prefix, cache._make_key(*args, **kwargs))
+
             # 尝试从缓存获取
-            result = cache.get(key)
-            if result is not None:
+            result = cache.get(key, _MISSING)
+            if result is not _MISSING:
                 return result
-            
+
             # 计算并缓存
             result = func(*args, **kwargs)
             cache.set(key, result, ttl)
             return result
-        
+
         return wrapper
     return decorator
 
 
-def clear_cache() -> None:
-    """清空全局缓存"""
-    cache = get_cache()
-    cache.clear()
+def clear_cache(namespace: Optional[str] = None) -> None:
+    """清空缓存（默认清空所有命名空间）"""
+    if namespace is None:
+        for cache in list(_caches.values()):
+            cache.clear()
+        get_cache().clear()
+    else:
+        get_cache(namespace).clear()
 
 
 def cache_stats() -> dict:
-    """获取缓存统计信息"""
+    """获取缓存统计信息（含各命名空间明细）"""
+    settings = get_settings()
     cache = get_cache()
     return {
         "size": cache.size,
-        "enabled": get_settings().cache_enabled,
-        "default_ttl": get_settings().cache_ttl,
+        "enabled": settings.cache_enabled,
+        "default_ttl": settings.cache_ttl,
+        "namespaces": {name: c.stats() for name, c in list(_caches.items())},
     }
@@ -2,11 +2,25 @@
 
 基于 src/assets/latlng.json 加载全国省市区经纬度数据
 支持省级、市级、区县级地理位置查询
+
+运行时读取由 JSON 预处理得到的紧凑二进制 src/assets/latlng.bin（内存映射，无需解析），
+文件头记录生成时 JSON 的摘要，JSON 更新后首次加载时自动重新生成。
+格式（小端序）：
+    头部   magic "CITY", 版本 u16, 保留 u16, 记录数 n u32, 字符串数 m u32, JSON 摘要 16 字节
+    经度   float32[n]      纬度 float32[n]（float32 精度约 1e-5 度，对应真太阳时误差远小于 1 秒）
+    名称/全称/省份  uint16[n] ×3，为字符串表下标（同名只存一份）
+    级别   int8[n]，LEVELS 中的下标，之后补零使文件偏移对齐到 4 字节
+    字符串偏移  uint32[m+1]，随后为 UTF-8 字符串数据
 """
+import hashlib
 import json
+import mmap
+import os
+import struct
 from functools import lru_cache
 from pathlib import Path
 from typing import NamedTuple
+import numpy as np
 
 
 class CityInfo(NamedTuple):
@@ -20,6 +34,14 @@ class CityInfo(NamedTuple):
 
 
 _DATA_FILE = Path(__file__).parent.parent.parent / "assets" / "latlng.json"
+_BINARY_FILE = _DATA_FILE.with_suffix(".bin")
+
+# 级别编码（二进制文件中的 level 为此元组下标）
+LEVELS = ("province", "city", "district")
+
+_MAGIC = b"CITY"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHHII16s")
 
 
 def _normalize_name(name: str) -> str:
@@ -83,12 +105,153 @@ def _parse_location_data(data: dict) -> list[CityInfo]:
     return results
 
 
+@lru_cache(maxsize=1)
+def source_digest() -> bytes:
+    """latlng.json 内容摘要（用于判断派生文件是否过期）"""
+    return hashlib.blake2b(_DATA_FILE.read_bytes(), digest_size=16).digest()
+
+
+class CityTable:
+    """
+    列式城市数据（数组为二进制文件的只读视图）
+
+    Attributes:
+        longitude/latitude: float32 经纬度
+        level_codes: int8 级别编码，见 LEVELS
+        name_ids/full_ids/province_ids: 字符串表下标
+    """
+
+    def __init__(self, buffer):
+        magic, version, _, count, strings, self.digest = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError("城市数据文件格式不匹配")
+        self._buffer = buffer
+        offset = _HEADER.size
+
+        def take(dtype, size):
+            nonlocal offset
+            array = np.frombuffer(buffer, dtype=dtype, count=size, offset=offset)
+            offset += array.nbytes
+            return array
+
+        self.longitude = take("<f4", count)
+        self.latitude = take("<f4", count)
+        self.name_ids = take("<u2", count)
+        self.full_ids = take("<u2", count)
+        self.province_ids = take("<u2", count)
+        self.level_codes = take("i1", count)
+        offset += -offset % 4
+        self._string_offsets = take("<u4", strings + 1)
+        self._string_base = offset
+
+    def __len__(self) -> int:
+        return len(self.longitude)
+
+    @property
+    def strings(self) -> tuple[str, ...]:
+        """字符串表（首次访问时解码）"""
+        if not hasattr(self, "_strings"):
+            data = bytes(self._buffer[self._string_base:])
+            bounds = self._string_offsets.tolist()
+            self._strings = tuple(
+                data[lo:hi].decode("utf-8") for lo, hi in zip(bounds, bounds[1:])
+            )
+        return self._strings
+
+    def city(self, i: int) -> CityInfo:
+        """第 i 条记录"""
+        strings = self.strings
+        return CityInfo(
+            name=strings[self.name_ids[i]],
+            province=strings[self.province_ids[i]],
+            longitude=float(self.longitude[i]),
+            latitude=float(self.latitude[i]),
+            level=LEVELS[self.level_codes[i]],
+            full_name=strings[self.full_ids[i]],
+        )
+
+    def cities(self) -> list[CityInfo]:
+        """全部记录"""
+        strings = self.strings
+        levels = [LEVELS[code] for code in self.level_codes.tolist()]
+        return [
+            CityInfo(strings[n], strings[p], lon, lat, level, strings[f])
+            for n, p, lon, lat, level, f in zip(
+                self.name_ids.tolist(), self.province_ids.tolist(),
+                self.longitude.tolist(), self.latitude.tolist(), levels,
+                self.full_ids.tolist(),
+            )
+        ]
+
+
+def build_city_table() -> bytes:
+    """由 latlng.json 生成二进制城市数据"""
+    with open(_DATA_FILE, "r", encoding="utf-8") as f:
+        cities = _parse_location_data(json.load(f))
+
+    strings: dict[str, int] = {}
+    for city in cities:
+        for text in (city.name, city.full_name, city.province):
+            strings.setdefault(text, len(strings))
+    if len(strings) > np.iinfo(np.uint16).max:
+        raise ValueError("字符串表超出 uint16 下标范围")
+
+    def ids(field: str) -> np.ndarray:
+        return np.array([strings[getattr(c, field)] for c in cities], dtype="<u2")
+
+    encoded = [text.encode("utf-8") for text in strings]
+    levels = np.array([LEVELS.index(c.level) for c in cities], dtype="i1")
+    parts = [
+        _HEADER.pack(_MAGIC, _FORMAT_VERSION, 0, len(cities), len(strings), source_digest()),
+        np.array([c.longitude for c in cities], dtype="<f4").tobytes(),
+        np.array([c.latitude for c in cities], dtype="<f4").tobytes(),
+        ids("name").tobytes(), ids("full_name").tobytes(), ids("province").tobytes(),
+        levels.tobytes(),
+    ]
+    parts.append(bytes(-sum(map(len, parts)) % 4))
+    parts.append(np.cumsum([0] + [len(b) for b in encoded], dtype="<u4").tobytes())
+    parts.append(b"".join(encoded))
+    return b"".join(parts)
+
+
+def write_city_table(path: Path = _BINARY_FILE) -> bytes:
+    """生成并写入二进制城市数据（先写临时文件再替换）"""
+    data = build_city_table()
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return data
+
+
+def _map_file(path: Path) -> mmap.mmap | None:
+    """只读内存映射（文件缺失或为空时返回 None）"""
+    try:
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=1)
+def load_city_table() -> CityTable:
+    """加载二进制城市数据，缺失或与 JSON 不一致时重新生成"""
+    buffer = _map_file(_BINARY_FILE)
+    if buffer is not None:
+        table = CityTable(buffer)
+        if table.digest == source_digest():
+            return table
+    try:
+        write_city_table(_BINARY_FILE)
+    except OSError:
+        # 安装目录只读时只在内存中使用
+        return CityTable(build_city_table())
+    return CityTable(_map_file(_BINARY_FILE))
+
+
 @lru_cache(maxsize=1)
 def _load_cities() -> list[CityInfo]:
     """加载并缓存所有城市数据"""
-    with open(_DATA_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return _parse_location_data(data)
+    return load_city_table().cities()
 
 
 @lru_cache(maxsize=1)
@@ -0,0 +1,177 @@
+"""城市坐标索引 - 由经纬度反查最近的城市
+
+在 cities_data 的经纬度列上建 1°×1° 的均匀网格（同一格的城市下标连续存放），
+查询从所在格向外逐圈扩展：扫描完第 r 圈后，圈外城市与查询点的球面距离有下界
+（由查询点到已扫描区域边界的纬差、经差得出，经差按跨越 ±180° 的较短方向计），
+当前最近距离不超过该下界即可停止。平均只检查查询点附近几格内的城市；
+网格范围以外的查询点直接逐个计算全部城市。
+"""
+import math
+from functools import lru_cache
+from typing import NamedTuple
+import numpy as np
+from src.core.utils.cities_data import CityInfo, LEVELS, load_city_table
+
+# 平均地球半径（公里）
+EARTH_RADIUS_KM = 6371.0088
+# 网格边长（度）
+GRID_CELL_DEG = 1.0
+
+# 距离相同时的级别优先顺序（市级优先，与搜索一致）
+_LEVEL_PRIORITY = np.array([{"city": 0, "district": 1, "province": 2}[lv] for lv in LEVELS])
+
+
+class NearestCity(NamedTuple):
+    """最近城市"""
+    city: CityInfo
+    distance_km: float
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """球面大圆距离（公里），参数可为数组"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    h = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+class CityGridIndex:
+    """城市经纬度网格索引"""
+
+    def __init__(self, longitude: np.ndarray, latitude: np.ndarray,
+                 level_codes: np.ndarray, cell_deg: float = GRID_CELL_DEG):
+        self.longitude = longitude.astype(np.float64)
+        self.latitude = latitude.astype(np.float64)
+        self.level_codes = level_codes
+        self.cell_deg = cell_deg
+        self.lon0 = float(self.longitude.min())
+        self.lat0 = float(self.latitude.min())
+        self.nx = int((self.longitude.max() - self.lon0) // cell_deg) + 1
+        self.ny = int((self.latitude.max() - self.lat0) // cell_deg) + 1
+        self.max_abs_lat = float(np.abs(self.latitude).max())
+        self.lon_span = float(self.longitude.max() - self.lon0)
+
+        cx = ((self.longitude - self.lon0) // cell_deg).astype(np.int64)
+        cy = ((self.latitude - self.lat0) // cell_deg).astype(np.int64)
+        cells = cy * self.nx + cx
+        # 按格排序后，格 c 的城市下标为 order[cell_start[c]:cell_start[c + 1]]
+        self.order = np.argsort(cells, kind="stable")
+        self.cell_start = np.searchsorted(cells[self.order], np.arange(self.nx * self.ny + 1))
+
+    def _ring(self, cx: int, cy: int, r: int) -> np.ndarray:
+        """第 r 圈（切比雪夫距离为 r 的格）内的城市下标"""
+        x0, x1 = max(cx - r, 0), min(cx + r, self.nx - 1)
+        spans = []
+        for y in (cy - r, cy + r) if r else (cy,):
+            if 0 <= y < self.ny:
+                spans.append((y * self.nx + x0, y * self.nx + x1))
+        if r:
+            for x in (cx - r, cx + r):
+                if 0 <= x < self.nx:
+                    for y in range(max(cy - r + 1, 0), min(cy + r - 1, self.ny - 1) + 1):
+                        spans.append((y * self.nx + x, y * self.nx + x))
+        if not spans:
+            return self.order[:0]
+        return np.concatenate([
+            self.order[self.cell_start[lo]:self.cell_start[hi + 1]] for lo, hi in spans
+        ])
+
+    def _contains(self, latitude: float, longitude: float) -> bool:
+        """查询点是否在网格范围内"""
+        return (0 <= longitude - self.lon0 < self.nx * self.cell_deg
+                and 0 <= latitude - self.lat0 < self.ny * self.cell_deg)
+
+    def _lower_bound_km(self, cx: int, cy: int, r: int,
+                        latitude: float, longitude: float) -> float:
+        """第 r 圈以外的城市与查询点（须在网格范围内）的最小可能距离"""
+        d = self.cell_deg
+        # 查询点到已扫描区域各边界的纬差、经差（区域已到网格边缘的一侧没有未扫描的城市）
+        lat_gaps = [latitude - (self.lat0 + (cy - r) * d)] if cy - r > 0 else []
+        if cy + r < self.ny - 1:
+            lat_gaps.append(self.lat0 + (cy + r + 1) * d - latitude)
+        lon_gaps = [longitude - (self.lon0 + (cx - r) * d)] if cx - r > 0 else []
+        if cx + r < self.nx - 1:
+            lon_gaps.append(self.lon0 + (cx + r + 1) * d - longitude)
+
+        bound = math.inf
+        if lat_gaps:
+            bound = math.radians(min(lat_gaps))
+        if lon_gaps:
+            # 经差取较短方向：反向绕过 ±180° 时经差至少为 360° 减去网格经度跨度
+            lon_gap = math.radians(min(min(lon_gaps), 360 - self.lon_span, 180))
+            # 经差下界由 hav(d) ≥ cos²φm·hav(Δλ) 得出，φm 为两端纬度绝对值上限
+            cos_max = math.cos(math.radians(max(abs(latitude), self.max_abs_lat)))
+            bound = min(bound, 2 * math.asin(min(cos_max * math.sin(lon_gap / 2), 1.0)))
+        return EARTH_RADIUS_KM * bound
+
+    def _best(self, ids: np.ndarray, latitude: float, longitude: float,
+              level_code: int | None) -> tuple[float, int, int] | None:
+        """ids 中最近的城市 (距离, 级别优先级, 下标)"""
+        if level_code is not None and len(ids):
+            ids = ids[self.level_codes[ids] == level_code]
+        if not len(ids):
+            return None
+        dist = haversine_km(latitude, longitude, self.latitude[ids], self.longitude[ids])
+        priority = _LEVEL_PRIORITY[self.level_codes[ids]]
+        k = int(np.lexsort((ids, priority, dist))[0])
+        return float(dist[k]), int(priority[k]), int(ids[k])
+
+    def nearest(self, latitude: float, longitude: float,
+                level_code: int | None = None) -> tuple[int, float] | None:
+        """
+        最近城市的下标与距离（公里）
+
+        距离相同时市级优先，其次区县、省级
+        """
+        if not self._contains(latitude, longitude):
+            best = self._best(self.order, latitude, longitude, level_code)
+            return None if best is None else (best[2], best[0])
+
+        cx = int((longitude - self.lon0) // self.cell_deg)
+        cy = int((latitude - self.lat0) // self.cell_deg)
+        best: tuple[float, int, int] | None = None
+        for r in range(max(self.nx, self.ny) + 1):
+            candidate = self._best(self._ring(cx, cy, r), latitude, longitude, level_code)
+            if candidate is not None and (best is None or candidate < best):
+                best = candidate
+            if best is not None and best[0] <= self._lower_bound_km(cx, cy, r, latitude, longitude):
+                break
+        return None if best is None else (best[2], best[0])
+
+
+@lru_cache(maxsize=1)
+def get_geo_index() -> CityGridIndex:
+    """获取城市网格索引（首次调用时构建）"""
+    table = load_city_table()
+    return CityGridIndex(table.longitude, table.latitude, table.level_codes)
+
+
+def nearest_city(
+    latitude: float,
+    longitude: float,
+    level: str | None = None,
+    max_distance_km: float | None = None,
+) -> NearestCity | None:
+    """
+    由经纬度反查最近的城市
+
+    Args:
+        latitude/longitude: 纬度、经度（度）
+        level: 限制级别 (province/city/district)，None表示不限
+        max_distance_km: 最远距离，超出返回 None
+
+    Returns:
+        NearestCity，无匹配返回 None
+    """
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError(f"经纬度超出范围: ({latitude}, {longitude})")
+    level_code = None if level is None else LEVELS.index(level)
+    found = get_geo_index().nearest(latitude, longitude, level_code)
+    if found is None:
+        return None
+    i, distance = found
+    if max_distance_km is not None and distance > max_distance_km:
+        return None
+    return NearestCity(load_city_table().city(i), distance)
@@ -0,0 +1,80 @@
+"""城市名拼音表
+
+src/assets/latlng_pinyin.json 由 latlng.json 一次性生成并随之存放，
+记录每个城市名称/全称的无声调拼音（ü 记为 v，音节以空格分隔）以及
+生成时 latlng.json 的摘要，运行时只读取该表，不依赖拼音库。
+
+重新生成拼音表（需安装 pypinyin，仅生成时需要）：
+    from src.core.utils.city_pinyin import write_pinyin_table
+    write_pinyin_table()
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+from src.core.utils.cities_data import _DATA_FILE, get_all_cities, source_digest
+from src.core.utils.logging import get_logger
+
+_PINYIN_FILE = _DATA_FILE.with_name("latlng_pinyin.json")
+
+# 地名中的多音字读音（拼音库按常用词读音给出的结果在地名里常常不对）
+_PLACE_CHAR_READINGS = {
+    "都": "du", "长": "chang", "朝": "chao", "涡": "guo",
+    "蔚": "yu", "单": "shan", "柏": "bai", "厦": "xia",
+}
+# 按字规则仍不对的地名
+_PLACE_WORD_READINGS = {
+    "长子": "zhang zi", "洪洞": "hong tong", "阿勒泰": "a le tai", "阿图什": "a tu shi",
+    "繁峙": "fan shi", "荥经": "ying jing", "蚌山": "beng shan",
+}
+
+logger = get_logger(__name__)
+
+
+def romanize(text: str) -> list[str]:
+    """地名转无声调拼音音节（需要 pypinyin）"""
+    from pypinyin import lazy_pinyin
+
+    syllables = [
+        _PLACE_CHAR_READINGS.get(char, syllable)
+        for char, syllable in zip(text, lazy_pinyin(text, v_to_u=False, errors=lambda s: list(s)))
+    ]
+    for word, reading in _PLACE_WORD_READINGS.items():
+        start = text.find(word)
+        if start >= 0:
+            syllables[start:start + len(word)] = reading.split()
+    return syllables
+
+
+def build_pinyin_table() -> dict:
+    """生成拼音表：{"source": 数据摘要, "pinyin": {名称: "音节 音节 ..."}}"""
+    texts = sorted({
+        text.strip() for city in get_all_cities() for text in (city.name, city.full_name)
+    })
+    return {
+        "source": source_digest().hex(),
+        "pinyin": {text: " ".join(romanize(text)).lower() for text in texts},
+    }
+
+
+def write_pinyin_table(path: Path = _PINYIN_FILE) -> None:
+    """生成并写入拼音表文件"""
+    table = build_pinyin_table()
+    path.write_text(json.dumps(table, ensure_ascii=False, indent=0), encoding="utf-8")
+    load_pinyin_table.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def load_pinyin_table() -> dict[str, tuple[str, ...]]:
+    """
+    加载拼音表：名称（去首尾空白）-> 拼音音节
+
+    文件缺失时返回空表（拼音检索不可用）；latlng.json 更新后表未重新生成时
+    仍使用旧表并告警，新增地名没有拼音。
+    """
+    if not _PINYIN_FILE.exists():
+        logger.warning("城市拼音表缺失: %s", _PINYIN_FILE)
+        return {}
+    table = json.loads(_PINYIN_FILE.read_text(encoding="utf-8"))
+    if table.get("source") != source_digest().hex():
+        logger.warning("城市拼音表与 latlng.json 不一致，请运行 write_pinyin_table() 重新生成")
+    return {text: tuple(pinyin.split()) for text, pinyin in table["pinyin"].items()}
@@ -1,13 +1,225 @@
 """城市智能搜索模块
 
 实现模糊匹配功能，提供良好的城市搜索体验
-基于 cities_data 模块加载的 JSON 数据
+城市数据来自 cities_data 内存映射的紧凑二进制表 src/assets/latlng.bin
+
+检索走预建索引，不再逐个城市比对：
+- 精确/前缀：名称与全称的前缀表（扁平化的前缀树，前缀 -> 城市下标）
+- 包含：单字与二字（bigram）倒排索引求交集后校验
+- 模糊：单字倒排索引按共有字数剪枝召回短名单，只对短名单计算有界编辑距离
+- 拼音：全拼/首字母的前缀表直接查，混合输入（"bjing"、"北jing"）由前两码倒排索引
+  召回后逐个校验；含拉丁字母的查询只走拼音检索，不进入模糊匹配
 """
-from difflib import SequenceMatcher
+import heapq
+import math
+from collections import Counter
 from functools import lru_cache
-from src.core.utils.cities_data import CityInfo, get_all_cities, get_cities_by_name
+from typing import Iterable, Sequence
+from src.core.utils.cities_data import CityInfo, get_all_cities
+from src.core.utils.city_pinyin import load_pinyin_table
 from src.core.utils.solar_time import Location
 
+# 各匹配层级的得分
+SCORE_EXACT = 1.0
+SCORE_PREFIX = 0.9
+SCORE_CONTAINS = 0.8
+# 模糊匹配得分 = 相似度 × 此系数，相似度需大于 FUZZY_MIN_SIMILARITY
+FUZZY_WEIGHT = 0.7
+FUZZY_MIN_SIMILARITY = 0.5
+# 模糊匹配的候选短名单长度
+FUZZY_SHORTLIST = 64
+
+# 拼音查询中忽略的分隔符
+_LATIN_SEPARATORS = str.maketrans("", "", " '-·’")
+
+# 同分时市级优先
+_LEVEL_PRIORITY = {"city": 0, "district": 1, "province": 2}
+
+
+def _grams(text: str) -> set[str]:
+    """单字与相邻二字"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _is_latin_query(query: str) -> bool:
+    """查询中含拉丁字母时按拼音检索"""
+    return any("a" <= char <= "z" for char in query.lower())
+
+
+def _normalize_latin(query: str) -> str:
+    """拼音查询规范化：小写、去分隔符，ü 记为 v"""
+    return query.lower().translate(_LATIN_SEPARATORS).replace("ü", "v").replace("u:", "v")
+
+
+def _spellings(syllables: Sequence[str]) -> set[str]:
+    """全拼写法（含 v 写作 u 的变体）"""
+    spelled = "".join(syllables)
+    return {spelled, spelled.replace("v", "u")}
+
+
+def match_romanized(query: str, text: str, syllables: Sequence[str]) -> int:
+    """
+    混合输入匹配：每个字可用汉字、全拼或拼音前缀（至少首字母）表示，从首字开始
+
+    Returns:
+        2 查询覆盖到最后一个字，1 只覆盖前几个字，0 不匹配
+    """
+    n = len(query)
+    positions = {0}
+    partial = False
+    for char, syllable in zip(text, syllables):
+        advanced = set()
+        for j in positions:
+            if j == n:
+                partial = True
+                continue
+            if query[j] == char:
+                advanced.add(j + 1)
+            k = 0
+            while k < len(syllable) and j + k < n and (
+                query[j + k] == syllable[k] or (syllable[k] == "v" and query[j + k] == "u")
+            ):
+                k += 1
+                advanced.add(j + k)
+        positions = advanced
+        if not positions:
+            break
+    if n in positions:
+        return 2
+    return 1 if partial else 0
+
+
+def bounded_edit_distance(a: str, b: str, bound: int) -> int:
+    """
+    插入/删除编辑距离（替换记为一删一插），超过 bound 时提前返回 bound + 1
+
+    该距离等于 len(a) + len(b) - 2 × 最长公共子序列长度，
+    因而 1 - 距离 / (len(a) + len(b)) 与 difflib 的相似度口径一致。
+    只计算对角线附近宽度为 2*bound+1 的带状区域。
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    inf = bound + 1
+    previous = [j if j <= bound else inf for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        lo, hi = max(1, i - bound), min(len(b), i + bound)
+        current = [inf] * (len(b) + 1)
+        current[0] = i if i <= bound else inf
+        for j in range(lo, hi + 1):
+            if ca == b[j - 1]:
+                current[j] = previous[j - 1]
+            else:
+                current[j] = min(previous[j], current[j - 1]) + 1
+        if min(current[lo - 1:hi + 1]) > bound:
+            return inf
+        previous = current
+    return min(previous[len(b)], inf)
+
+
+class CitySearchIndex:
+    """城市检索索引（构建一次，查询只读）"""
+
+    def __init__(self, cities: Sequence[CityInfo]):
+        self.cities = cities
+        self.exact: dict[str, list[int]] = {}
+        self.prefix: dict[str, list[int]] = {}
+        self.grams: dict[str, list[int]] = {}
+        self.chars: dict[str, list[tuple[int, int]]] = {}
+        # 拼音：全拼精确、全拼前缀、首字母前缀、混合输入前两码
+        self.romanized: list[tuple[tuple[str, tuple[str, ...]], ...]] = []
+        self.pinyin_exact: dict[str, list[int]] = {}
+        self.pinyin_prefix: dict[str, list[int]] = {}
+        self.initials_prefix: dict[str, list[int]] = {}
+        self.latin_pairs: dict[str, list[int]] = {}
+
+        pinyin_table = load_pinyin_table()
+        for i, city in enumerate(cities):
+            texts = {city.name, city.full_name}
+            for text in texts:
+                self.exact.setdefault(text, []).append(i)
+            for prefix in {t[:n] for t in texts for n in range(1, len(t) + 1)}:
+                self.prefix.setdefault(prefix, []).append(i)
+            for gram in set().union(*(_grams(t) for t in texts)):
+                self.grams.setdefault(gram, []).append(i)
+            # 模糊匹配只比较名称
+            for char, count in Counter(city.name).items():
+                self.chars.setdefault(char, []).append((i, count))
+
+            romanized = tuple(
+                (t.strip(), pinyin_table[t.strip()]) for t in texts if t.strip() in pinyin_table
+            )
+            self.romanized.append(romanized)
+            spellings = set().union(*(_spellings(syl) for _, syl in romanized))
+            initials = {"".join(s[0] for s in syl) for _, syl in romanized}
+            for spelled in spellings:
+                self.pinyin_exact.setdefault(spelled, []).append(i)
+            for prefix in {t[:n] for t in spellings for n in range(1, len(t) + 1)}:
+                self.pinyin_prefix.setdefault(prefix, []).append(i)
+            for prefix in {t[:n] for t in initials for n in range(1, len(t) + 1)}:
+                self.initials_prefix.setdefault(prefix, []).append(i)
+            # 查询前两码要么是首字拼音的前两个字母，要么是前两个字的首字母
+            pairs = {
+                first + second
+                for _, syl in romanized
+                for first, second in (
+                    [(syl[0][0], syl[0][1])] if len(syl[0]) > 1 else []
+                ) + ([(syl[0][0], syl[1][0])] if len(syl) > 1 else [])
+            }
+            for pair in pairs | {p.replace("v", "u") for p in pairs}:
+                self.latin_pairs.setdefault(pair, []).append(i)
+
+    def containing(self, query: str) -> Iterable[int]:
+        """名称或全称包含 query 的城市下标"""
+        grams = [query] if len(query) == 1 else [query[i:i + 2] for i in range(len(query) - 1)]
+        postings = sorted((self.grams.get(g, ()) for g in set(grams)), key=len)
+        if not postings or not postings[0]:
+            return ()
+        candidates = set(postings[0]).intersection(*postings[1:])
+        if len(query) <= 2:
+            return candidates
+        return (
+            i for i in candidates
+            if query in self.cities[i].name or query in self.cities[i].full_name
+        )
+
+    def romanized_matches(self, query: str) -> dict[int, int]:
+        """混合输入匹配：城市下标 -> match_romanized 结果（取名称与全称中较好者）"""
+        if "a" <= query[0] <= "z":
+            candidates = self.latin_pairs.get(query[:2], ()) if len(query) > 1 else ()
+        else:
+            candidates = self.prefix.get(query[0], ())
+        matches = {}
+        for i in candidates:
+            best = max((match_romanized(query, t, syl) for t, syl in self.romanized[i]), default=0)
+            if best:
+                matches[i] = best
+        return matches
+
+    def fuzzy_candidates(self, query: str, exclude: set[int]) -> list[int]:
+        """
+        模糊候选短名单
+
+        共有字数给出公共子序列长度的上界，相似度上界不超过阈值的城市直接剪掉，
+        其余按上界取前 FUZZY_SHORTLIST 个
+        """
+        shared = Counter()
+        for char, wanted in Counter(query).items():
+            for i, count in self.chars.get(char, ()):
+                shared[i] += min(wanted, count)
+        bounds = {}
+        for i, count in shared.items():
+            if i not in exclude:
+                upper = 2 * count / (len(query) + len(self.cities[i].name))
+                if upper > FUZZY_MIN_SIMILARITY:
+                    bounds[i] = upper
+        return heapq.nsmallest(FUZZY_SHORTLIST, bounds, key=lambda i: (-bounds[i], i))
+
+
+@lru_cache(maxsize=1)
+def get_search_index() -> CitySearchIndex:
+    """获取城市检索索引（首次调用时构建）"""
+    return CitySearchIndex(get_all_cities())
+
 
 @lru_cache(maxsize=1)
 def _get_city_index() -> dict[str, CityInfo]:
@@ -31,6 +243,17 @@ def _get_city_index() -> dict[str, CityInfo]:
     return index
 
 
+def _fuzzy_score(query: str, name: str) -> float:
+    """编辑距离相似度得分，不足阈值返回 0"""
+    total = len(query) + len(name)
+    # 相似度 1 - d/total > 阈值 等价于 d < total × (1 - 阈值)
+    bound = math.ceil(total * (1 - FUZZY_MIN_SIMILARITY)) - 1
+    distance = bounded_edit_distance(query, name, bound)
+    if distance > bound:
+        return 0.0
+    return (1 - distance / total) * FUZZY_WEIGHT
+
+
 def search_cities(
     query: str,
     limit: int = 10,
@@ -45,53 +268,81 @@ def search_cities(
         level: 限制级别 (province/city/district)，None表示不限
 
     Returns:
-        匹配的城市列表，按相关度排序
+        匹配的城市列表，按相关度排序（精确 > 前缀 > 包含 > 模糊，同分市级优先）
     """
     if not query:
         return []
 
     query = query.strip()
-    results: list[tuple[float, CityInfo]] = []
-    seen: set[str] = set()
+    if not query:
+        return []
+    index = get_search_index()
+    cities = index.cities
+    scores: dict[int, float] = {}
 
-    cities = get_all_cities()
-    if level:
-        cities = [c for c in cities if c.level == level]
+    def add(ids: Iterable[int], score: float) -> None:
+        for i in ids:
+            if i not in scores and (level is None or cities[i].level == level):
+                scores[i] = score
 
-    def add_result(score: float, city: CityInfo):
-        key = f"{city.name}_{city.province}_{city.level}"
-        if key not in seen:
-            seen.add(key)
-            results.append((score, city))
+    if _is_latin_query(query):
+        _search_latin(index, _normalize_latin(query), add)
+        return _top(scores, cities, limit)
 
-    for city in cities:
-        name = city.name
-        full = city.full_name
+    # 1-3. 精确、前缀、包含（各层只补充未命中的城市）
+    add(index.exact.get(query, ()), SCORE_EXACT)
+    add(index.prefix.get(query, ()), SCORE_PREFIX)
+    add(index.containing(query), SCORE_CONTAINS)
+
+    # 4. 模糊匹配得分低于前三层，前三层已足够 limit 个时无需计算
+    if len(_dedup(scores, cities)) < limit:
+        for i in index.fuzzy_candidates(query, exclude=set(scores)):
+            if level is None or cities[i].level == level:
+                score = _fuzzy_score(query, cities[i].name)
+                if score > 0:
+                    scores[i] = score
+
+    return _top(scores, cities, limit)
 
-        # 1. 精确匹配 (最高优先级)
-        if query == name or query == full:
-            add_result(1.0, city)
-            continue
 
-        # 2. 前缀匹配
-        if name.startswith(query) or full.startswith(query):
-            add_result(0.9, city)
-            continue
+def _search_latin(index: CitySearchIndex, query: str, add) -> None:
+    """
+    拼音检索
+
+    全拼相同为精确匹配；全拼前缀、首字母缩写及覆盖整个地名的混合输入
+    记为前缀匹配；只覆盖前几个字的首字母/混合输入记为包含匹配
+    """
+    if not query:
+        return
+    add(index.pinyin_exact.get(query, ()), SCORE_EXACT)
+    spelled = index.pinyin_prefix.get(query)
+    if spelled:
+        # 完整拼写的查询不再按缩写逐个校验
+        add(spelled, SCORE_PREFIX)
+        return
+    matches = index.romanized_matches(query)
+    add((i for i, m in matches.items() if m == 2), SCORE_PREFIX)
+    add(index.initials_prefix.get(query, ()), SCORE_CONTAINS)
+    add(matches, SCORE_CONTAINS)
+
 
-        # 3. 包含匹配
-        if query in name or query in full:
-            add_result(0.8, city)
-            continue
+def _top(scores: dict[int, float], cities: Sequence[CityInfo], limit: int) -> list[CityInfo]:
+    """去重后按得分、级别取前 limit 个"""
+    ranked = heapq.nsmallest(
+        limit,
+        _dedup(scores, cities).items(),
+        key=lambda item: (-item[1], _LEVEL_PRIORITY.get(cities[item[0]].level, 9), item[0]),
+    )
+    return [cities[i] for i, _ in ranked]
 
-        # 4. 模糊匹配 (字符串相似度)
-        ratio = SequenceMatcher(None, query, name).ratio()
-        if ratio > 0.5:
-            add_result(ratio * 0.7, city)
 
-    # 按分数降序，市级优先
-    level_priority = {"city": 0, "district": 1, "province": 2}
-    results.sort(key=lambda x: (-x[0], level_priority.get(x[1].level, 9)))
-    return [city for _, city in results[:limit]]
+def _dedup(scores: dict[int, float], cities: Sequence[CityInfo]) -> dict[int, float]:
+    """同名同省同级的城市只保留下标最小的一个"""
+    kept: dict[tuple[str, str, str], int] = {}
+    for i in sorted(scores):
+        city = cities[i]
+        kept.setdefault((city.name, city.province, city.level), i)
+    return {i: scores[i] for i in kept.values()}
 
 
 def get_location_smart(city_name: str) -> Location | None:
@@ -136,4 +387,3 @@ def parse_city_option(option: str) -> str:
     if "(" in option:
         return option.split("(")[0].strip()
     return option.strip()
-
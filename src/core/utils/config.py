@@ -48,6 +48,28 @@ class Settings(BaseSettings):
     # 缓存配置
     cache_enabled: bool = Field(default=True, description="启用缓存")
     cache_ttl: int = Field(default=3600, description="缓存过期时间(秒)")
+    cache_max_entries: int = Field(default=10000, description="每个缓存命名空间的条目上限")
+    cache_max_bytes: int = Field(
+        default=128 * 1024 * 1024,
+        description="每个缓存命名空间的近似字节上限"
+    )
+    cache_sweep_interval: int = Field(
+        default=60,
+        description="后台清理过期缓存的间隔(秒)，0 表示不启动"
+    )
+    chart_cache_size: int = Field(default=4096, description="命盘缓存条目上限")
+    cache_backend: str = Field(
+        default="memory",
+        description="缓存后端（memory/sqlite），sqlite 为内存 + 本机持久化两级缓存"
+    )
+    cache_path: str = Field(
+        default=".cache/fortune_tracer.sqlite3",
+        description="SQLite 缓存文件路径（同机多 worker 共享）"
+    )
+    cache_disk_max_entries: int = Field(
+        default=100_000,
+        description="SQLite 缓存每个命名空间的记录数上限"
+    )
     
     # 计算配置
     use_true_solar_time: bool = Field(
@@ -58,6 +80,25 @@ class Settings(BaseSettings):
         default=True,
         description="是否使用精确节气计算"
     )
+    jieqi_solar_model: str = Field(
+        default="ephem",
+        description="节气表外年份的太阳黄经模型（ephem/meeus）"
+    )
+    analysis_workers: int = Field(
+        default=1,
+        description="全量分析流水线的并发线程数，1 表示顺序执行"
+    )
+    compute_processes: int = Field(
+        default=-1,
+        description="API 计算进程数，-1 表示按 CPU 核数，0 表示在进程内线程池计算"
+    )
+    io_threads: int = Field(default=16, description="API 阻塞 I/O 线程数")
+    executor_max_queue: int = Field(
+        default=64,
+        description="每类 API 任务在工作数之外允许排队的数量，超出时返回 503"
+    )
+    ui_cache_ttl: int = Field(default=3600, description="页面计算与图表缓存的过期时间(秒)")
+    ui_cache_max_entries: int = Field(default=256, description="页面每类计算/图表缓存的条目上限")
     default_dayun_count: int = Field(default=8, description="默认大运数量")
     default_year_fortune_count: int = Field(default=10, description="默认流年数量")
 
@@ -0,0 +1,20 @@
+"""稳定哈希模块
+
+内置 hash() 对字符串按进程加盐（PYTHONHASHSEED），同一输入在不同 worker、
+不同重启间结果不同。评分中的扰动项统一使用这里基于 blake2b 的稳定哈希，
+保证相同请求在任意进程得到相同分数，结果才可以缓存。
+"""
+import hashlib
+from functools import lru_cache
+
+
+def stable_hash(*parts: object) -> int:
+    """跨进程稳定的 64 位哈希，各部分以 str() 拼接"""
+    data = "\x1f".join(str(part) for part in parts).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+@lru_cache(maxsize=4096)
+def stable_noise(key: str, modulus: int) -> int:
+    """评分扰动：key 的稳定哈希对 modulus 取余，结果在 [0, modulus)"""
+    return stable_hash(key) % modulus
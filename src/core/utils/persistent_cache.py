@@ -0,0 +1,224 @@
+"""持久化缓存后端
+
+SQLiteCache 把缓存写入本机 SQLite 文件（WAL 模式），同一主机上的多个
+uvicorn worker 进程可共享；值用 pickle 协议 5 序列化。
+每条记录带版本号（属于主键），读取只取本版本的记录，算法变更后递增版本即可让旧结果失效；
+滚动发布时新旧 worker 共用同一文件，两个版本的记录并存、互不覆盖。
+清理只删除过期记录与比自身版本旧的记录，并在记录数超过上限时淘汰最早过期的记录。
+
+TieredCache 以内存 BoundedCache 为一级、SQLiteCache 为二级：
+进程重启后内存为空，读取直接落到磁盘（单次查询约数十微秒）并回填内存，
+不必重新计算，因此重启后的延迟不会突增。
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Hashable, Optional
+from src.core.utils.cache import BoundedCache
+
+# 序列化协议
+PICKLE_PROTOCOL = 5
+# 表结构版本（变更表结构时递增）
+_SCHEMA_VERSION = 2
+# 每个命名空间的默认记录数上限
+DEFAULT_MAX_ENTRIES = 100_000
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS cache_v{schema} (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    expire REAL NOT NULL,
+    PRIMARY KEY (namespace, key, version)
+) WITHOUT ROWID
+""".format(schema=_SCHEMA_VERSION)
+_CREATE_INDEX = """
+CREATE INDEX IF NOT EXISTS cache_v{schema}_expire ON cache_v{schema} (namespace, expire)
+""".format(schema=_SCHEMA_VERSION)
+_TABLE = f"cache_v{_SCHEMA_VERSION}"
+
+
+def _key_digest(key: Hashable) -> str:
+    """跨进程稳定的键摘要（repr 不依赖哈希盐）"""
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SQLiteCache:
+    """
+    SQLite 持久化缓存
+
+    Args:
+        path: 数据库文件路径
+        default_ttl: 默认过期时间（秒）
+        namespace: 命名空间
+        version: 结果版本号，只读写本版本的记录
+        max_entries: 本命名空间的记录数上限（各版本合计），清理时淘汰最早过期的记录
+    """
+
+    def __init__(
+        self, path: str, default_ttl: int = 3600,
+        namespace: str = "default", version: int = 1,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.namespace = namespace
+        self.version = version
+        self.max_entries = max_entries
+        self._default_ttl = default_ttl
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(_CREATE_TABLE)
+            conn.execute(_CREATE_INDEX)
+
+    def _connect(self) -> sqlite3.Connection:
+        """每线程一个连接（sqlite3 连接不可跨线程共享）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    _make_key = staticmethod(BoundedCache._make_key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """获取缓存值"""
+        row = self._connect().execute(
+            f"SELECT value, expire FROM {_TABLE} WHERE namespace = ? AND key = ? AND version = ?",
+            (self.namespace, _key_digest(key), self.version),
+        ).fetchone()
+        if row is None or row[1] <= time.time():
+            self.misses += 1
+            return default
+        try:
+            value = pickle.loads(row[0])
+        except Exception:
+            # 反序列化失败（如类定义已变更）按未命中处理
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[int] = None) -> None:
+        """设置缓存值"""
+        blob = pickle.dumps(value, protocol=PICKLE_PROTOCOL)
+        expire = time.time() + (ttl or self._default_ttl)
+        self._connect().execute(
+            f"INSERT OR REPLACE INTO {_TABLE} VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, _key_digest(key), self.version, blob, expire),
+        )
+
+    def delete(self, key: Hashable) -> None:
+        """删除本版本的缓存"""
+        self._connect().execute(
+            f"DELETE FROM {_TABLE} WHERE namespace = ? AND key = ? AND version = ?",
+            (self.namespace, _key_digest(key), self.version),
+        )
+
+    def clear(self) -> None:
+        """清空本命名空间"""
+        self._connect().execute(f"DELETE FROM {_TABLE} WHERE namespace = ?", (self.namespace,))
+        self.hits = self.misses = 0
+
+    def cleanup(self) -> int:
+        """
+        清理过期或比本版本旧的记录，记录数超过上限时淘汰最早过期的记录，返回清理数量
+
+        不删除更新版本的记录：滚动发布期间旧 worker 不会清掉新 worker 写入的结果
+        """
+        conn = self._connect()
+        removed = conn.execute(
+            f"DELETE FROM {_TABLE} WHERE namespace = ? AND (expire <= ? OR version < ?)",
+            (self.namespace, time.time(), self.version),
+        ).rowcount
+        excess = conn.execute(
+            f"SELECT COUNT(*) FROM {_TABLE} WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0] - self.max_entries
+        if excess > 0:
+            removed += conn.execute(
+                f"DELETE FROM {_TABLE} WHERE namespace = ? AND (key, version) IN ("
+                f"SELECT key, version FROM {_TABLE} WHERE namespace = ? ORDER BY expire LIMIT ?)",
+                (self.namespace, self.namespace, excess),
+            ).rowcount
+        return removed
+
+    @property
+    def size(self) -> int:
+        """本版本的记录数"""
+        return self._connect().execute(
+            f"SELECT COUNT(*) FROM {_TABLE} WHERE namespace = ? AND version = ?",
+            (self.namespace, self.version),
+        ).fetchone()[0]
+
+    def stats(self) -> dict:
+        """命中统计"""
+        total = self.hits + self.misses
+        return {
+            "size": self.size,
+            "path": self.path,
+            "version": self.version,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class TieredCache:
+    """内存 + SQLite 两级缓存"""
+
+    def __init__(self, memory: BoundedCache, disk: SQLiteCache):
+        self.memory = memory
+        self.disk = disk
+        self.namespace = memory.namespace
+
+    _make_key = staticmethod(BoundedCache._make_key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """先查内存，未命中再查磁盘并回填内存"""
+        missing = object()
+        value = self.memory.get(key, missing)
+        if value is not missing:
+            return value
+        value = self.disk.get(key, missing)
+        if value is missing:
+            return default
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[int] = None) -> None:
+        """同时写入两级"""
+        self.memory.set(key, value, ttl)
+        self.disk.set(key, value, ttl)
+
+    def delete(self, key: Hashable) -> None:
+        """删除缓存"""
+        self.memory.delete(key)
+        self.disk.delete(key)
+
+    def clear(self) -> None:
+        """清空两级"""
+        self.memory.clear()
+        self.disk.clear()
+
+    def cleanup(self) -> int:
+        """清理两级的过期条目"""
+        return self.memory.cleanup() + self.disk.cleanup()
+
+    @property
+    def size(self) -> int:
+        """内存中的条目数"""
+        return self.memory.size
+
+    def stats(self) -> dict:
+        """命中统计（内存统计为主，附磁盘明细）"""
+        return {**self.memory.stats(), "disk": self.disk.stats()}
@@ -31,6 +31,18 @@ def get_location(city_name: str) -> Location | None:
     return get_location_smart(city_name)
 
 
+def get_location_by_coordinates(latitude: float, longitude: float) -> Location:
+    """
+    由经纬度构造位置：名称取最近城市，经纬度保留原始坐标
+
+    直接使用网格索引反查，不经过城市名搜索
+    """
+    from .city_geo import nearest_city
+    nearest = nearest_city(latitude, longitude)
+    name = nearest.city.name if nearest else f"{latitude:.4f},{longitude:.4f}"
+    return Location(name, longitude, latitude)
+
+
 def _calculate_equation_of_time(day_of_year: int) -> float:
     """
     计算均时差（分钟）
@@ -107,15 +119,19 @@ def convert_to_true_solar_time(
 
 def get_time_correction_info(
     local_time: datetime,
-    location: str
+    location: Location | str
 ) -> dict:
     """
     获取时间修正详情
-    
+
+    Args:
+        local_time: 北京时间
+        location: 地点（城市名或Location对象）
+
     Returns:
         包含各项修正值的字典
     """
-    loc = get_location(location)
+    loc = get_location(location) if isinstance(location, str) else location
     if loc is None:
         return {
             "location": location,
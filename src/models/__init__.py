@@ -35,6 +35,8 @@ from .date_selection_models import (
     DayQuality,
     DayInfo,
     DateRecommendation,
+    GroupDayInfo,
+    GroupDateRecommendation,
 )
 from .bonefate_models import (
     LunarDate,
@@ -88,6 +90,8 @@ __all__ = [
     "DayQuality",
     "DayInfo",
     "DateRecommendation",
+    "GroupDayInfo",
+    "GroupDateRecommendation",
     # bonefate_models
     "LunarDate",
     "SolarDate",
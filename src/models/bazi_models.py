@@ -1,8 +1,9 @@
 """八字数据模型定义"""
+import threading
 from datetime import datetime
 from enum import Enum
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Callable, Optional
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class TianGan(str, Enum):
@@ -118,7 +119,26 @@ class YearFortune(BaseModel):
     age: int = Field(0, description="年龄")
     ganzhi: str = Field("", description="干支")
     wuxing: str = Field("", description="五行")
+    level: str = Field("", description="运势等级")
     detail: YearFortuneDetail | None = Field(None, description="详细解读")
+    # 延迟生成详细解读的工厂（仅评分模式下设置，首次 get_detail() 时调用）
+    _detail_factory: Callable[[], YearFortuneDetail] | None = PrivateAttr(None)
+    # 按需生成的解读：不写回 detail 字段，经缓存共享的对象公开字段保持不变
+    _lazy_detail: YearFortuneDetail | None = PrivateAttr(None)
+
+    def get_detail(self) -> YearFortuneDetail | None:
+        """获取详细解读；评分模式下首次调用时生成并记在私有缓存中（线程安全）"""
+        if self.detail is not None or self._detail_factory is None:
+            return self.detail
+        if self._lazy_detail is None:
+            with _LAZY_DETAIL_LOCK:
+                if self._lazy_detail is None:
+                    self._lazy_detail = self._detail_factory()
+        return self._lazy_detail
+
+
+# 按需生成流年解读的锁（YearFortune 经命盘/流水线/页面缓存在线程间共享）
+_LAZY_DETAIL_LOCK = threading.Lock()
 
 
 class DaYunDetail(BaseModel):
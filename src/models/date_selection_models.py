@@ -44,3 +44,22 @@ class DateRecommendation(BaseModel):
     def to_json(self) -> str:
         return self.model_dump_json(indent=2)
 
+
+
+class GroupDayInfo(DayInfo):
+    """多人择日的单日信息"""
+    member_scores: dict[str, int] = Field(default_factory=dict, description="各成员得分")
+    clash_members: list[str] = Field(default_factory=list, description="当日被冲的成员")
+
+
+class GroupDateRecommendation(BaseModel):
+    """多人择日推荐结果"""
+    event_type: EventType
+    members: list[str] = Field(default_factory=list, description="成员")
+    aggregation: str = Field("min", description="聚合方式: min/mean")
+    recommended_dates: list[GroupDayInfo] = Field(default_factory=list)
+    avoid_dates: list[GroupDayInfo] = Field(default_factory=list)
+    summary: str = Field("", description="总结")
+
+    def to_json(self) -> str:
+        return self.model_dump_json(indent=2)
@@ -1,7 +1,7 @@
 """AI解读渲染组件"""
 import os
 import streamlit as st
-from src.ai.interpreter import interpret_bazi_full
+from src.ai.interpreter import interpret_bazi_full, materialize_year_details
 from src.ai import get_or_create_session
 from src.models import FortuneReport
 from .chat_component import render_chat_section
@@ -54,7 +54,7 @@ def _render_download_button(bazi, wuxing, interpretation, fortunes, birth_info):
     """渲染下载按钮"""
     report = FortuneReport(
         bazi=bazi, wuxing=wuxing,
-        interpretation=interpretation, year_fortunes=fortunes
+        interpretation=interpretation, year_fortunes=materialize_year_details(fortunes)
     )
     st.download_button(
         "📥 下载完整报告 (JSON)", report.to_json(),
@@ -1,18 +1,8 @@
 """八字分析页面"""
 import streamlit as st
 from datetime import datetime, date
-from src.core import (
-    calculate_bazi, analyze_wuxing, calculate_dayun,
-    analyze_shishen, convert_to_true_solar_time,
-    calculate_shensha, calculate_nayin, calculate_auxiliary_from_bazi,
-    analyze_bonefate, generate_daily_fortune_report
-)
-from src.ai.interpreter import calculate_year_fortunes
-from src.viz import (
-    create_wuxing_radar, create_fortune_kline,
-    create_year_fortune_line, create_palace_chart
-)
-from src.models.bazi_models import Gender
+from src.viz import create_kline_figure, get_kline_range, resolve_kline_window, MA_SETTINGS
+from .caching import birth_key, full_analysis, figure, page_cache
 from .common import render_pillar_display
 from .bazi_components import (
     render_auxiliary_info, render_nayin_info, render_shensha_info,
@@ -29,29 +19,21 @@ from .ai_interpretation import render_ai_interpretation
 def render_bazi_analysis(birth_info: dict, api_key: str | None = None):
     """渲染八字分析结果"""
     birth_dt = datetime.combine(birth_info["date"], birth_info["time"])
-    gender_enum = Gender.MALE if birth_info["gender"] == "男" else Gender.FEMALE
     place = birth_info["place"] or None
-
-    # 真太阳时转换
-    true_solar_dt = convert_to_true_solar_time(birth_dt, place) if place else birth_dt
+    key = birth_key(birth_info)
 
     with st.spinner("正在计算八字..."):
-        bazi = calculate_bazi(true_solar_dt, gender_enum, place)
-        wuxing = analyze_wuxing(bazi)
-        shishen = analyze_shishen(bazi)
-        dayun_info = calculate_dayun(bazi, wuxing)  # 传入wuxing以生成详细解读
-        shensha = calculate_shensha(bazi)
-        nayin_list = calculate_nayin(bazi)
-        auxiliary = calculate_auxiliary_from_bazi(bazi)
-        fortunes = calculate_year_fortunes(bazi, wuxing, years=91)  # 0-90岁
-        bonefate = analyze_bonefate(true_solar_dt)
-        # 生成今日、明日、后日三天运势报告
-        from datetime import timedelta
-        today = date.today()
-        daily_reports = [
-            generate_daily_fortune_report(today + timedelta(days=i), bazi, wuxing)
-            for i in range(3)
-        ]
+        # 排盘及全部分析（按依赖图一次算完，页面重跑时直接复用）
+        analysis = full_analysis(key, date.today())
+        bazi, wuxing, true_solar_dt = analysis.chart
+        shishen = analysis.shishen
+        dayun_info = analysis.dayun
+        shensha = analysis.shensha
+        nayin_list = analysis.nayin
+        auxiliary = analysis.auxiliary
+        fortunes = analysis.fortunes  # 0-90岁，解读按需生成
+        bonefate = analysis.bonefate
+        daily_reports = analysis.daily_reports  # 今日、明日、后日
 
     # 每日运势（顶部展示，支持三天切换）
     render_full_daily_fortune(daily_reports)
@@ -88,7 +70,7 @@ def render_bazi_analysis(birth_info: dict, api_key: str | None = None):
     
     # 五行分析
     st.subheader("🌟 五行分析")
-    _render_wuxing_section(wuxing)
+    _render_wuxing_section(key, wuxing)
     
     # 神煞分析
     st.subheader("⚔️ 神煞分析")
@@ -107,12 +89,14 @@ def render_bazi_analysis(birth_info: dict, api_key: str | None = None):
     st.subheader("📈 运势分析")
     tab1, tab2, tab3, tab4 = st.tabs(["宫位图", "人生K线", "流年趋势", "详细解读"])
     with tab1:
-        st.plotly_chart(create_palace_chart(bazi, wuxing), width="stretch")
+        st.plotly_chart(figure("create_palace_chart", key, (bazi, wuxing)), width="stretch")
     with tab2:
-        st.plotly_chart(create_fortune_kline(fortunes), width="stretch")
+        _render_kline(key, bazi, wuxing)
         render_fortune_decade_summary(fortunes)
     with tab3:
-        st.plotly_chart(create_year_fortune_line(fortunes), width="stretch")
+        st.plotly_chart(
+            figure("create_year_fortune_line", key, (fortunes,)), width="stretch"
+        )
     with tab4:
         render_fortune_year_selector(fortunes)
     
@@ -128,11 +112,54 @@ def render_bazi_analysis(birth_info: dict, api_key: str | None = None):
     render_ai_interpretation(bazi, wuxing, api_key, birth_info, fortunes, all_analysis)
 
 
-def _render_wuxing_section(wuxing):
+# K线粒度选项
+_KLINE_RESOLUTION_LABELS = {
+    "year": "年K", "month": "月K", "week": "周K", "day": "日K", "auto": "自动",
+}
+
+
+def _render_kline(key, bazi, wuxing):
+    """渲染人生K线（可选粒度与时间窗口，只绘制窗口内的K线）"""
+    first, last, _ = resolve_kline_window(bazi, None, None, "year")
+    col1, col2 = st.columns([2, 3])
+    with col1:
+        resolution = st.radio(
+            "粒度", list(_KLINE_RESOLUTION_LABELS),
+            format_func=_KLINE_RESOLUTION_LABELS.get, horizontal=True, key="kline_resolution"
+        )
+    with col2:
+        start, end = st.slider(
+            "时间窗口", min_value=first, max_value=last, value=(first, last),
+            format="YYYY-MM", key="kline_window"
+        )
+    try:
+        fig = _kline_figure(key, bazi, wuxing, start, end, resolution)
+    except ValueError as e:
+        st.warning(str(e))
+        return
+    st.plotly_chart(fig, width="stretch")
+
+
+@page_cache
+def _kline_figure(key, _bazi, _wuxing, start, end, resolution: str):
+    """人生K线图（按出生信息键与窗口缓存，页面重跑时不重建）"""
+    start, end, resolution = resolve_kline_window(_bazi, start, end, resolution)
+    series = get_kline_range(_bazi, _wuxing, start, end, resolution)
+    ma_window, ma_name = MA_SETTINGS[resolution]
+    if resolution == "year":
+        return create_kline_figure(series, ma_window, ma_name=ma_name)
+    label = _KLINE_RESOLUTION_LABELS[resolution]
+    return create_kline_figure(
+        series, ma_window, title=f"人生运势{label}（{start} ~ {end}）",
+        ma_name=ma_name, xaxis_title="日期"
+    )
+
+
+def _render_wuxing_section(key, wuxing):
     """渲染五行分析部分"""
     col1, col2 = st.columns([1, 1])
     with col1:
-        st.plotly_chart(create_wuxing_radar(wuxing), width="stretch")
+        st.plotly_chart(figure("create_wuxing_radar", key, (wuxing,)), width="stretch")
     with col2:
         st.markdown(f"**日主**: {wuxing.day_master.value} ({wuxing.day_master_strength})")
         st.markdown(f"**喜用神**: {', '.join(w.value for w in wuxing.favorable)}")
@@ -0,0 +1,83 @@
+"""页面计算缓存 - Streamlit 重跑（切换标签、操作控件）时复用计算结果与图表
+
+缓存键为规范化的出生信息（ChartKey，可哈希），同一命盘无论地点写法、秒级差异
+都落到同一条目；条目数与过期时间由 ui_cache_max_entries / ui_cache_ttl 配置。
+
+分析结果与图表都用 st.cache_resource 在进程内共享同一对象，调用方不应修改
+（流年解读用 YearFortune.get_detail() 读取，不写回共享对象）。
+（st.cache_data 命中时要反序列化出副本，plotly 图表反序列化会重新校验，
+单个图表约 10ms，与重新绘制小图表相当，起不到缓存作用。）
+"""
+from datetime import date, datetime
+from typing import Any, Hashable
+import plotly.graph_objects as go
+import streamlit as st
+from src.core import (
+    BirthInput, FullAnalysis, compute_full_analysis, get_chart,
+    analyze_shishen, calculate_compatibility, select_dates,
+)
+from src.core.bazi.chart_cache import CachedChart, ChartKey, normalize_birth_input
+from src.core.utils.config import get_settings
+from src.models import EventType
+from src.models.date_selection_models import DateRecommendation
+
+_settings = get_settings()
+# 页面缓存装饰器（有界、定时过期）
+page_cache = st.cache_resource(
+    ttl=_settings.ui_cache_ttl,
+    max_entries=_settings.ui_cache_max_entries,
+    show_spinner=False,
+)
+
+
+def birth_key(birth_info: dict) -> ChartKey:
+    """表单出生信息（date/time/gender/place）-> 规范化缓存键"""
+    return normalize_birth_input(
+        datetime.combine(birth_info["date"], birth_info["time"]),
+        birth_info["gender"],
+        birth_info["place"] or None,
+    )
+
+
+def _chart(key: ChartKey) -> CachedChart:
+    return get_chart(key.birth_datetime, key.gender, key.birth_place, key.true_solar_time)
+
+
+@page_cache
+def full_analysis(key: ChartKey, today: date) -> FullAnalysis:
+    """八字全量分析"""
+    return compute_full_analysis(
+        BirthInput(key.birth_datetime, key.gender, key.birth_place, key.true_solar_time),
+        today=today,
+    )
+
+
+@page_cache
+def compatibility_analysis(key1: ChartKey, key2: ChartKey):
+    """配对分析：(双方命盘, 双方十神, 配对结果)"""
+    chart1, chart2 = _chart(key1), _chart(key2)
+    result = calculate_compatibility(chart1.bazi, chart2.bazi, chart1.wuxing, chart2.wuxing)
+    return chart1, chart2, analyze_shishen(chart1.bazi), analyze_shishen(chart2.bazi), result
+
+
+@page_cache
+def date_selection(
+    key: ChartKey, event: EventType, start_date: date, days: int
+) -> tuple[CachedChart, DateRecommendation]:
+    """择日：(命盘, 择日结果)"""
+    chart = _chart(key)
+    return chart, select_dates(chart.bazi, chart.wuxing, event, start_date, days)
+
+
+@page_cache
+def figure(builder: str, key: Hashable, _args: tuple[Any, ...] = ()) -> go.Figure:
+    """
+    src.viz 图表
+
+    Args:
+        builder: src.viz 中的绘图函数名
+        key: 决定图表内容的缓存键（出生信息键及其它参数）
+        _args: 传给绘图函数的参数，不参与缓存键，须完全由 builder 与 key 决定
+    """
+    import src.viz as viz
+    return getattr(viz, builder)(*_args)
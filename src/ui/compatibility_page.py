@@ -1,51 +1,26 @@
 """配对分析页面"""
 import streamlit as st
-from datetime import datetime
-from src.core import (
-    calculate_bazi, analyze_wuxing, calculate_compatibility,
-    analyze_shishen, convert_to_true_solar_time
-)
-from src.models.bazi_models import Gender
-from src.viz import (
-    create_compatibility_gauge,
-    create_wuxing_comparison,
-    create_relations_sunburst
-)
 from src.ai import get_or_create_session
+from .caching import birth_key, compatibility_analysis, figure
 from .common import render_pillar_display
 from .chat_component import render_chat_section
 
 
 def render_compatibility_analysis(info1: dict, info2: dict, api_key: str | None = None):
     """渲染配对分析结果"""
-    # 计算双方八字（支持真太阳时）
-    dt1 = datetime.combine(info1["date"], info1["time"])
-    dt2 = datetime.combine(info2["date"], info2["time"])
-    
-    place1, place2 = info1["place"] or None, info2["place"] or None
-    if place1:
-        dt1 = convert_to_true_solar_time(dt1, place1)
-    if place2:
-        dt2 = convert_to_true_solar_time(dt2, place2)
-    
-    gender1 = Gender.MALE if info1["gender"] == "男" else Gender.FEMALE
-    gender2 = Gender.MALE if info2["gender"] == "男" else Gender.FEMALE
-    
+    # 计算双方八字（支持真太阳时，页面重跑时复用）
+    key = (birth_key(info1), birth_key(info2))
     with st.spinner("正在分析配对..."):
-        bazi1 = calculate_bazi(dt1, gender1, place1)
-        bazi2 = calculate_bazi(dt2, gender2, place2)
-        wuxing1 = analyze_wuxing(bazi1)
-        wuxing2 = analyze_wuxing(bazi2)
-        shishen1 = analyze_shishen(bazi1)
-        shishen2 = analyze_shishen(bazi2)
-        result = calculate_compatibility(bazi1, bazi2, wuxing1, wuxing2)
+        chart1, chart2, shishen1, shishen2, result = compatibility_analysis(*key)
+    bazi1, wuxing1, _ = chart1
+    bazi2, wuxing2, _ = chart2
     
     # 配对得分
     st.subheader("💑 配对结果")
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
         st.plotly_chart(
-            create_compatibility_gauge(result.total_score, result.grade),
+            figure("create_compatibility_gauge", key, (result.total_score, result.grade)),
             width="stretch"
         )
     
@@ -68,7 +43,7 @@ def render_compatibility_analysis(info1: dict, info2: dict, api_key: str | None
     col1, col2 = st.columns([1.2, 0.8])
     with col1:
         st.plotly_chart(
-            create_wuxing_comparison(wuxing1, wuxing2),
+            figure("create_wuxing_comparison", key, (wuxing1, wuxing2)),
             width="stretch"
         )
     with col2:
@@ -84,7 +59,7 @@ def render_compatibility_analysis(info1: dict, info2: dict, api_key: str | None
     st.subheader("🔗 干支关系分析")
     col1, col2 = st.columns([1, 1])
     with col1:
-        st.plotly_chart(create_relations_sunburst(result), width="stretch")
+        st.plotly_chart(figure("create_relations_sunburst", key, (result,)), width="stretch")
     with col2:
         gz = result.ganzhi_relations
         if gz.tiangan_he:
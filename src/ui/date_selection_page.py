@@ -1,15 +1,10 @@
 """择日页面"""
 import streamlit as st
-from datetime import datetime, date
-from src.core import (
-    calculate_bazi, analyze_wuxing, select_dates,
-    convert_to_true_solar_time
-)
+from datetime import date
 from src.models import EventType
-from src.models.bazi_models import Gender
 from src.models.date_selection_models import DayQuality
-from src.viz import create_date_calendar, create_date_timeline
 from src.ai import get_or_create_session
+from .caching import birth_key, date_selection, figure
 from .chat_component import render_chat_section
 
 
@@ -27,18 +22,8 @@ def render_date_selection(
     birth_info: dict, event_type: str, search_days: int, api_key: str | None = None
 ):
     """渲染择日结果"""
-    # 计算八字（支持真太阳时）
-    birth_dt = datetime.combine(birth_info["date"], birth_info["time"])
-    gender_enum = Gender.MALE if birth_info["gender"] == "男" else Gender.FEMALE
-    place = birth_info["place"] or None
-    
-    if place:
-        birth_dt = convert_to_true_solar_time(birth_dt, place)
-    
+    # 计算八字（支持真太阳时）并择日，页面重跑时复用
     with st.spinner("正在择日..."):
-        bazi = calculate_bazi(birth_dt, gender_enum, place)
-        wuxing = analyze_wuxing(bazi)
-        
         event_map = {
             "结婚": EventType.WEDDING,
             "开业": EventType.BUSINESS,
@@ -48,7 +33,8 @@ def render_date_selection(
         }
         event = event_map.get(event_type, EventType.WEDDING)
         
-        result = select_dates(bazi, wuxing, event, date.today(), search_days)
+        key = (birth_key(birth_info), event, date.today(), search_days)
+        (bazi, wuxing, _), result = date_selection(*key)
     
     # 显示您的八字信息
     st.subheader("📜 您的八字")
@@ -77,9 +63,9 @@ def render_date_selection(
     # 可视化
     col1, col2 = st.columns([1.2, 0.8])
     with col1:
-        st.plotly_chart(create_date_calendar(result), width="stretch")
+        st.plotly_chart(figure("create_date_calendar", key, (result,)), width="stretch")
     with col2:
-        st.plotly_chart(create_date_timeline(result), width="stretch")
+        st.plotly_chart(figure("create_date_timeline", key, (result,)), width="stretch")
     
     # 推荐吉日详情
     st.subheader("🌟 推荐吉日")
@@ -93,7 +93,7 @@ def _render_date_selection_form(api_key: str | None):
     with col2:
         st.subheader("📅 择日设置")
         event_type = st.selectbox("事件类型", ["结婚", "开业", "搬家", "出行", "签约"])
-        search_days = st.slider("搜索天数", 15, 90, 30)
+        search_days = st.slider("搜索天数", 15, 1095, 30)
 
     analyze_btn = st.button("📅 开始择日", type="primary", use_container_width=True)
 
@@ -1,5 +1,6 @@
 """运势详细解读 UI 组件"""
 import streamlit as st
+from src.core.fortune.fortune_data import LEVEL_EMOJI
 from src.models.bazi_models import DaYunInfo, YearFortune
 
 
@@ -75,9 +76,8 @@ def _render_dayun_yearly_detail(dayun, fortunes: list[YearFortune]):
     for idx, fortune in enumerate(yearly_fortunes[:10]):
         col_idx = idx % min(5, len(yearly_fortunes))
         with cols[col_idx]:
-            detail = fortune.detail
-            emoji = detail.emoji if detail else "😐"
-            level = detail.level if detail else "平"
+            level = fortune.level or "平"
+            emoji = LEVEL_EMOJI.get(level, "😐")
 
             # 紧凑卡片 - 深色文字确保可读性
             bg_color = _get_level_color(level)
@@ -96,9 +96,8 @@ def _render_dayun_yearly_detail(dayun, fortunes: list[YearFortune]):
         cols2 = st.columns(min(5, len(yearly_fortunes) - 5))
         for idx, fortune in enumerate(yearly_fortunes[5:10]):
             with cols2[idx]:
-                detail = fortune.detail
-                emoji = detail.emoji if detail else "😐"
-                level = detail.level if detail else "平"
+                level = fortune.level or "平"
+                emoji = LEVEL_EMOJI.get(level, "😐")
                 bg_color = _get_level_color(level)
                 st.markdown(f"""
                 <div style='background:{bg_color};padding:6px;border-radius:6px;
@@ -149,18 +148,18 @@ def render_fortune_year_selector(fortunes: list[YearFortune]):
         return
     
     st.markdown(f"### {fortune.year}年 ({fortune.description})")
+    detail = fortune.get_detail()
     
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("运势评分", f"{fortune.score:.0f}", delta=None)
     with col2:
-        if fortune.detail:
-            st.metric("运势等级", f"{fortune.detail.emoji} {fortune.detail.level}")
+        if detail:
+            st.metric("运势等级", f"{detail.emoji} {detail.level}")
     with col3:
         st.metric("五行", fortune.wuxing)
     
-    if fortune.detail:
-        detail = fortune.detail
+    if detail:
         st.markdown(f"**五行影响**: {detail.wuxing_effect}")
         
         if detail.ganzhi_relations:
@@ -2,9 +2,30 @@
 from .charts import (
     create_wuxing_radar,
     create_fortune_kline,
+    create_kline_figure,
     create_year_fortune_line,
 )
 from .kline_multiplier import generate_multiplier_klines, MultiplierKLine
+from .kline_downsample import (
+    PERIODS,
+    period_buckets,
+    aggregate_ohlc,
+    lttb_indices,
+)
+from .kline_range import (
+    RESOLUTIONS,
+    MA_SETTINGS,
+    get_kline_range,
+    resolve_kline_window,
+)
+from .kline_service import (
+    KLINE_MODES,
+    LEVEL_NAMES,
+    KLineSeries,
+    chart_fingerprint,
+    get_kline_series,
+    kline_series_from_fortunes,
+)
 from .palace import create_palace_chart
 from .compatibility_charts import (
     create_compatibility_gauge,
@@ -33,11 +54,29 @@ __all__ = [
     # 基础图表
     "create_wuxing_radar",
     "create_fortune_kline",
+    "create_kline_figure",
     "create_year_fortune_line",
     "create_palace_chart",
     # K线生成器
     "generate_multiplier_klines",
     "MultiplierKLine",
+    # K线数据服务
+    "KLINE_MODES",
+    "LEVEL_NAMES",
+    "KLineSeries",
+    "chart_fingerprint",
+    "get_kline_series",
+    "kline_series_from_fortunes",
+    # 多粒度K线
+    "RESOLUTIONS",
+    "MA_SETTINGS",
+    "get_kline_range",
+    "resolve_kline_window",
+    # K线降采样
+    "PERIODS",
+    "period_buckets",
+    "aggregate_ohlc",
+    "lttb_indices",
     # 配对图表
     "create_compatibility_gauge",
     "create_wuxing_comparison",
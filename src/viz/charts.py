@@ -1,7 +1,11 @@
 """图表可视化模块"""
+import numpy as np
 import plotly.graph_objects as go
+from src.core.fortune.fortune_data import LEVEL_EMOJI
 from src.models import WuxingAnalysis
 from src.models.bazi_models import YearFortune
+from .kline_downsample import lttb_indices
+from .kline_service import KLineSeries, kline_series_from_fortunes
 
 
 def create_wuxing_radar(wuxing: WuxingAnalysis) -> go.Figure:
@@ -40,47 +44,68 @@ def create_wuxing_radar(wuxing: WuxingAnalysis) -> go.Figure:
 
 def create_fortune_kline(fortunes: list[YearFortune]) -> go.Figure:
     """创建人生K线图（0-90岁），使用乘法模式产生自然复利波动"""
-    from .kline_multiplier import generate_multiplier_klines
-    import pandas as pd
+    return create_kline_figure(kline_series_from_fortunes(fortunes, mode="multiplier"))
 
-    # 使用乘法模式K线生成器
-    klines = generate_multiplier_klines(fortunes, base_price=100.0)
 
-    years = [k.year for k in klines]
-    opens = [k.open for k in klines]
-    highs = [k.high for k in klines]
-    lows = [k.low for k in klines]
-    closes = [k.close for k in klines]
-    hover_texts = [k.hover_text for k in klines]
+def create_kline_figure(
+    series: KLineSeries,
+    ma_window: int = 10,
+    title: str | None = None,
+    ma_name: str | None = None,
+    max_line_points: int = 2000,
+    xaxis_title: str = "年份（年龄）",
+) -> go.Figure:
+    """
+    由列式K线序列创建人生K线图
+
+    数组直接传给 Plotly（不经 DataFrame）；hover 由 customdata + hovertemplate
+    在浏览器端渲染；均线超过 max_line_points 个点时用 LTTB 抽样
+    """
+    x, closes = series.x, series.close
 
     fig = go.Figure()
     fig.add_trace(go.Candlestick(
-        x=years, open=opens, high=highs, low=lows, close=closes,
+        x=x, open=series.open, high=series.high, low=series.low, close=closes,
         increasing_line_color='#22c55e', decreasing_line_color='#ef4444',
-        name='运势K线', text=hover_texts,
-        hovertemplate='%{text}<br>运势指数: %{close:.1f}<extra></extra>'
+        name='运势K线', customdata=series.customdata,
+        hovertemplate=series.hovertemplate
     ))
 
-    # 添加10年均线
-    ma10 = pd.Series(closes).rolling(window=10, min_periods=1).mean()
+    # 添加均线（窗口不足时取已有部分的均值）
+    ma = _moving_average(closes, ma_window)
+    keep = lttb_indices(x, ma, max_line_points)
     fig.add_trace(go.Scatter(
-        x=years, y=ma10, mode='lines',
-        name='10年均线', line=dict(color='#f59e0b', width=2)
+        x=x[keep], y=ma[keep], mode='lines',
+        name=ma_name or f'{ma_window}年均线', line=dict(color='#f59e0b', width=2)
     ))
 
-    # 添加基准线（起点100）
-    fig.add_hline(y=100, line_dash="dot", line_color="#94a3b8",
-                  annotation_text="基准线 100")
+    # 乘法模式添加基准线（起点价格）
+    if series.mode == "multiplier" and series.size:
+        base = float(series.open[0])
+        fig.add_hline(y=base, line_dash="dot", line_color="#94a3b8",
+                      annotation_text=f"基准线 {base:g}")
 
+    if title is None:
+        # 年K的 customdata 首列为年龄
+        ages = series.customdata[:, 0]
+        title = f"人生运势K线图（{ages[0]}-{ages[-1]}岁）" if series.size else "人生运势K线图"
     fig.update_layout(
-        title=dict(text="人生运势K线图（0-90岁）", x=0.5),
-        xaxis_title="年份（年龄）", yaxis_title="运势指数",
+        title=dict(text=title, x=0.5),
+        xaxis_title=xaxis_title, yaxis_title="运势指数",
         xaxis=dict(rangeslider=dict(visible=True, thickness=0.05)),
         height=500, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)'
     )
     return fig
 
 
+def _moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """滑动平均（等价于 rolling(window, min_periods=1).mean()）"""
+    csum = np.concatenate(([0.0], np.cumsum(values, dtype=float)))
+    idx = np.arange(1, len(values) + 1)
+    start = np.maximum(idx - window, 0)
+    return (csum[idx] - csum[start]) / (idx - start)
+
+
 def create_year_fortune_line(fortunes: list[YearFortune]) -> go.Figure:
     """创建流年运势柱状图（0-90岁），hover交互更精准"""
     years = [f.year for f in fortunes]
@@ -89,15 +114,10 @@ def create_year_fortune_line(fortunes: list[YearFortune]) -> go.Figure:
     # 根据分数设置颜色
     colors = [_get_bar_color(s) for s in scores]
 
-    # 构建详细hover文本
-    hover_texts = []
-    for f in fortunes:
-        text = f"{f.description}"
-        if f.detail:
-            text += f"<br>{f.detail.emoji} {f.detail.level}"
-            text += f"<br>事业: {f.detail.career}"
-            text += f"<br>感情: {f.detail.love}"
-        hover_texts.append(text)
+    # hover文本只用等级与分数（不依赖详细解读是否已生成，每个点字段一致）
+    hover_texts = [
+        f"{f.description}<br>{LEVEL_EMOJI.get(f.level, '😐')} {f.level}" for f in fortunes
+    ]
 
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -1,6 +1,7 @@
 """大运可视化图表"""
 import plotly.graph_objects as go
 from src.models.bazi_models import DaYunInfo, WuxingAnalysis
+from src.core.utils.hashing import stable_noise
 
 
 # 五行颜色
@@ -86,7 +87,7 @@ def create_dayun_fortune_chart(
             base_score -= 10
         
         # 添加一些变化
-        base_score += (hash(dy.ganzhi) % 15) - 7
+        base_score += stable_noise(dy.ganzhi, 15) - 7
         scores.append(max(40, min(95, base_score)))
         labels.append(dy.ganzhi)
         colors.append(WUXING_COLORS.get(dy.wuxing, "#6366f1"))
@@ -0,0 +1,100 @@
+"""K线降采样 - 日线聚合为周/月线，折线 LTTB 抽样
+
+跨越数十年的日K有上万根，全部交给浏览器渲染会明显卡顿。
+- K线按周期做 OHLC 聚合：开盘取首日、收盘取末日、最高/最低取区间极值
+- 均线等折线用 LTTB（Largest-Triangle-Three-Buckets）抽样，保留视觉上的峰谷
+"""
+import numpy as np
+
+# 聚合周期
+PERIODS = ("week", "month")
+
+
+def period_buckets(dates: np.ndarray, period: str) -> np.ndarray:
+    """
+    日期所属周期的编号（同一周/月的日期编号相同，编号随日期递增）
+
+    Args:
+        dates: datetime64[D] 数组
+        period: week（周一为一周之始）或 month
+    """
+    days = np.asarray(dates, dtype="datetime64[D]")
+    if period == "week":
+        # 1970-01-01 为周四，偏移 3 天后按 7 天整除即以周一分界
+        return (days.astype(np.int64) + 3) // 7
+    if period == "month":
+        return days.astype("datetime64[M]").astype(np.int64)
+    raise ValueError(f"未知聚合周期: {period}，可选 {PERIODS}")
+
+
+def bucket_bounds(buckets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """连续相同编号划为一组，返回各组首、末元素下标"""
+    n = len(buckets)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [n])) - 1
+    return starts, ends
+
+
+def aggregate_ohlc(
+    buckets: np.ndarray, open_: np.ndarray, high: np.ndarray,
+    low: np.ndarray, close: np.ndarray,
+) -> tuple[np.ndarray, ...]:
+    """
+    按组聚合 OHLC
+
+    Returns:
+        (starts, ends, open, high, low, close)，starts/ends 为各组在原数组中的首末下标
+    """
+    starts, ends = bucket_bounds(buckets)
+    if len(starts) == 0:
+        return starts, ends, open_[:0], high[:0], low[:0], close[:0]
+    return (
+        starts, ends, open_[starts],
+        np.maximum.reduceat(high, starts), np.minimum.reduceat(low, starts),
+        close[ends],
+    )
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    LTTB 抽样，返回保留点的下标（含首尾点，升序）
+
+    Args:
+        x: 横坐标（数值或 datetime64，需单调）
+        y: 纵坐标
+        threshold: 目标点数，不小于原点数时原样返回全部下标
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    xs = np.asarray(x)
+    if np.issubdtype(xs.dtype, np.datetime64):
+        xs = xs.astype("datetime64[D]").astype(np.int64)
+    xs = xs.astype(float)
+    ys = np.asarray(y, dtype=float)
+
+    # 首尾点之外的 n-2 个点均分为 threshold-2 个桶
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 下一个桶的均值点（最后一个桶以末点为准）
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+            avg_x, avg_y = xs[nxt].mean(), ys[nxt].mean()
+        else:
+            avg_x, avg_y = xs[-1], ys[-1]
+        # 与上一选中点、下一桶均值点构成的三角形面积最大者
+        area = np.abs(
+            (xs[prev] - avg_x) * (ys[lo:hi] - ys[prev])
+            - (xs[prev] - xs[lo:hi]) * (avg_y - ys[prev])
+        )
+        prev = lo + int(np.argmax(area))
+        selected[i + 1] = prev
+    return selected
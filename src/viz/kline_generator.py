@@ -42,7 +42,7 @@ def generate_kline_data(fortunes: list[YearFortune]) -> list[KLineData]:
     prev_close = fortunes[0].score if fortunes else 60
     
     for f in fortunes:
-        level = f.detail.level if f.detail else _get_level_from_score(f.score)
+        level = f.level or (f.detail.level if f.detail else _get_level_from_score(f.score))
         params = KLINE_PARAMS.get(level, KLINE_PARAMS["平"])
         
         kline = _generate_single_kline(
@@ -55,7 +55,7 @@ def generate_multiplier_klines(
     current_price = base_price
     
     for f in fortunes:
-        level = f.detail.level if f.detail else _get_level_from_score(f.score)
+        level = f.level or (f.detail.level if f.detail else _get_level_from_score(f.score))
         multiplier = FORTUNE_MULTIPLIERS.get(level, 1.0)
         
         open_price = current_price
@@ -0,0 +1,253 @@
+"""多粒度人生K线 - 日/周/月/年K与区间查询
+
+日线综合分由三部分加权：
+- 流年：与年K相同的流年分数（按公历年）
+- 流月：按节气月的月柱干支，用流年同一套喜忌与地支关系规则评分
+- 流日：DailyFortuneEngine 基础分（六十甲子查表）
+
+整个寿命区间的日线一次向量化算出并按命盘缓存，周/月线由日线做 OHLC 聚合后同样缓存；
+区间查询只切出可见窗口，缩放时不必重算。
+"""
+from datetime import date, timedelta
+import numpy as np
+from src.models.bazi_models import BaziChart, WuxingAnalysis
+from src.core.bazi.constants import TIANGAN
+from src.core.bazi.pillars import jieqi_month_pillar
+from src.core.fortune.daily_timeline import daily_cycle_table
+from src.core.fortune.fortune_data import LEVEL_EMOJI
+from src.core.fortune.year_scores import calculate_year_scores, year_score_tables
+from src.core.fortune.jieqi import get_jie_boundaries
+from src.core.utils.cache import get_cache
+from .kline_downsample import aggregate_ohlc, period_buckets
+from .kline_service import (
+    KLINE_CACHE_VERSION, KLineSeries, LEVEL_NAMES, ARRAY_FIELDS, GANZHI_60,
+    additive_ohlc, check_mode, round_series, chart_fingerprint, get_kline_series,
+    score_level_codes,
+)
+
+# 查询粒度（auto 按窗口长度自动选择）
+RESOLUTIONS = ("day", "week", "month", "year")
+# 日线覆盖的寿命年数（自出生日起）
+LIFETIME_YEARS = 100
+# 单次查询返回的最大K线根数
+MAX_RANGE_BARS = 10000
+# auto 粒度下期望的最大K线根数
+AUTO_MAX_BARS = 1500
+# 日线流月所取的当日参考时刻（北京时间正午，与按日排盘一致）
+DAY_REFERENCE_TIME = np.timedelta64(12 * 60, "m")
+# 日线综合分权重：流年、流月、流日
+COMPOSITE_WEIGHTS = (0.3, 0.3, 0.4)
+# 各粒度的均线窗口与名称
+MA_SETTINGS = {
+    "day": (30, "30日均线"),
+    "week": (12, "12周均线"),
+    "month": (12, "12月均线"),
+    "year": (10, "10年均线"),
+}
+
+# 2000-01-01 为己亥日，在六十甲子中的序号为 35
+_DAY_CYCLE_BASE = np.datetime64("2000-01-01", "D")
+_DAY_CYCLE_BASE_INDEX = 35
+_APPROX_DAYS = {"day": 1, "week": 7, "month": 30.44, "year": 365.25}
+
+# 日K hover 列：0 日干支，1 等级，2 表情，3 流年分，4 流月分，5 流日分
+DAY_HOVERTEMPLATE = (
+    "%{x|%Y-%m-%d} %{customdata[0]}日<br>%{customdata[1]} %{customdata[2]}"
+    "<br>流年 %{customdata[3]:.0f} · 流月 %{customdata[4]:.0f} · 流日 %{customdata[5]:.1f}"
+    "<br>运势指数: %{close:.1f}<extra></extra>"
+)
+# 周/月K hover 列：0 末日，1 等级，2 表情，3 均分，4 最高分，5 最低分
+PERIOD_HOVERTEMPLATE = (
+    "%{x|%Y-%m-%d} ~ %{customdata[0]}<br>%{customdata[1]} %{customdata[2]}"
+    "<br>均分 %{customdata[3]:.1f}（最高 %{customdata[4]:.1f} / 最低 %{customdata[5]:.1f}）"
+    "<br>收盘: %{close:.1f}<extra></extra>"
+)
+
+
+def _columns(*columns: np.ndarray) -> np.ndarray:
+    """按列组装 customdata"""
+    customdata = np.empty((len(columns[0]), len(columns)), dtype=object)
+    for j, column in enumerate(columns):
+        customdata[:, j] = column
+    return customdata
+
+
+def _level_columns(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """等级名与表情列（引用共享字符串）"""
+    names = np.array(LEVEL_NAMES, dtype=object)
+    emoji = np.array([LEVEL_EMOJI[name] for name in LEVEL_NAMES], dtype=object)
+    return names[codes], emoji[codes]
+
+
+def _month_starts(first_year: int, last_year: int) -> tuple[np.ndarray, np.ndarray]:
+    """各节气月的起始时刻（北京时间，精确到分钟）与月柱六十甲子序号
+
+    覆盖 first_year-1 至 last_year
+    """
+    starts, cycles = [], []
+    for year in range(first_year - 1, last_year + 1):
+        for j, moment in enumerate(get_jie_boundaries(year).moments):
+            # moments[0] 为小寒（丑月，仍属上一干支年），其后依次为寅月至子月
+            ganzhi_year = year - 1 if j == 0 else year
+            pillar = jieqi_month_pillar(TIANGAN[(ganzhi_year - 4) % 10], (j - 1) % 12 + 1)
+            starts.append(np.datetime64(moment.replace(second=0, microsecond=0), "m"))
+            cycles.append(GANZHI_60.index(f"{pillar.tiangan.value}{pillar.dizhi.value}"))
+    return np.array(starts), np.array(cycles)
+
+
+def daily_score_components(
+    bazi: BaziChart, wuxing: WuxingAnalysis, start: date, days: int
+) -> tuple[np.ndarray, ...]:
+    """
+    向量化计算 start 起 days 天的流年、流月、流日分数
+
+    Returns:
+        (日期 datetime64[D], 流年分, 流月分, 流日分, 日干支序号)
+    """
+    dates = np.datetime64(start, "D") + np.arange(days)
+    years = dates.astype("datetime64[Y]").astype(int) + 1970
+    birth_year = bazi.birth_datetime.year
+    year_scores = calculate_year_scores(bazi, wuxing, int(years[-1]) - birth_year + 1)
+    year_part = year_scores[years - birth_year]
+
+    gan_delta, zhi_delta = year_score_tables(bazi, wuxing)
+    month_starts, month_cycles = _month_starts(int(years[0]), int(years[-1]))
+    # 节气当日按参考时刻与交节时刻比较：交节在正午之前的当日即属新月
+    month_cycle = month_cycles[
+        np.searchsorted(month_starts, dates + DAY_REFERENCE_TIME, side="right") - 1
+    ]
+    month_part = np.clip(
+        60 + gan_delta[month_cycle % 10] + zhi_delta[month_cycle % 12], 32, 93
+    ).astype(float)
+
+    day_table = np.array([row[1] for row in daily_cycle_table(bazi, wuxing)])
+    day_cycle = (_DAY_CYCLE_BASE_INDEX + (dates - _DAY_CYCLE_BASE).astype(int)) % 60
+    return dates, year_part, month_part, day_table[day_cycle], day_cycle
+
+
+def _lifetime_span(bazi: BaziChart) -> tuple[date, date]:
+    """日线覆盖的日期区间（含两端）"""
+    birth = bazi.birth_datetime.date()
+    try:
+        end = birth.replace(year=birth.year + LIFETIME_YEARS)
+    except ValueError:
+        end = birth.replace(year=birth.year + LIFETIME_YEARS, day=28)
+    return birth, end - timedelta(days=1)
+
+
+def _build_daily(bazi: BaziChart, wuxing: WuxingAnalysis) -> KLineSeries:
+    """整个寿命区间的日K（加法模式，收盘价为综合分）"""
+    first, last = _lifetime_span(bazi)
+    dates, year_part, month_part, day_part, day_cycle = daily_score_components(
+        bazi, wuxing, first, (last - first).days + 1
+    )
+    w_year, w_month, w_day = COMPOSITE_WEIGHTS
+    scores = np.round(w_year * year_part + w_month * month_part + w_day * day_part, 1)
+    codes = score_level_codes(scores)
+    ohlc = additive_ohlc(scores, codes, scores[0])
+    names, emoji = _level_columns(codes)
+    customdata = _columns(
+        np.array(GANZHI_60, dtype=object)[day_cycle], names, emoji,
+        year_part, month_part, day_part,
+    )
+    series = KLineSeries("additive", dates, *ohlc, codes, customdata, DAY_HOVERTEMPLATE)
+    return round_series(series)
+
+
+def _aggregate(daily: KLineSeries, period: str) -> KLineSeries:
+    """日K聚合为周K/月K"""
+    buckets = period_buckets(daily.x, period)
+    starts, ends, open_, high, low, close = aggregate_ohlc(
+        buckets, daily.open, daily.high, daily.low, daily.close
+    )
+    scores = daily.change
+    mean = np.round(np.add.reduceat(scores, starts) / (ends - starts + 1), 1)
+    codes = score_level_codes(mean)
+    names, emoji = _level_columns(codes)
+    customdata = _columns(
+        np.datetime_as_string(daily.x[ends], unit="D").astype(object), names, emoji,
+        mean, np.maximum.reduceat(scores, starts), np.minimum.reduceat(scores, starts),
+    )
+    return KLineSeries(
+        "additive", daily.x[starts], open_, high, low, close, mean, codes,
+        customdata, PERIOD_HOVERTEMPLATE,
+    )
+
+
+def _lifetime_series(bazi: BaziChart, wuxing: WuxingAnalysis, resolution: str) -> KLineSeries:
+    """整个寿命区间的日/周/月K（按命盘与粒度缓存）"""
+    cache = get_cache("kline", version=KLINE_CACHE_VERSION)
+    key = (chart_fingerprint(bazi, wuxing), resolution)
+    series = cache.get(key)
+    if series is None:
+        if resolution == "day":
+            series = _build_daily(bazi, wuxing)
+        else:
+            series = _aggregate(_lifetime_series(bazi, wuxing, "day"), resolution)
+        for name in ARRAY_FIELDS:
+            getattr(series, name).flags.writeable = False
+        cache.set(key, series)
+    return series
+
+
+def choose_resolution(start: date, end: date, max_bars: int = AUTO_MAX_BARS) -> str:
+    """选择使窗口内K线不超过 max_bars 根的最细粒度"""
+    days = (end - start).days + 1
+    for resolution in RESOLUTIONS[:-1]:
+        if days / _APPROX_DAYS[resolution] <= max_bars:
+            return resolution
+    return "year"
+
+
+def resolve_kline_window(
+    bazi: BaziChart, start: date | None, end: date | None, resolution: str = "auto"
+) -> tuple[date, date, str]:
+    """
+    规范化查询窗口：缺省起止取寿命区间首末日，超出部分截掉，auto 换成具体粒度
+
+    Returns:
+        (start, end, resolution)
+    """
+    first, last = _lifetime_span(bazi)
+    start = max(start or first, first)
+    end = min(end or last, last)
+    if end < start:
+        raise ValueError("查询区间为空：结束日期早于起始日期或超出寿命区间")
+    if resolution == "auto":
+        resolution = choose_resolution(start, end)
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"未知粒度: {resolution}，可选 {RESOLUTIONS} 或 auto")
+    return start, end, resolution
+
+
+def get_kline_range(
+    bazi: BaziChart,
+    wuxing: WuxingAnalysis,
+    start: date | None = None,
+    end: date | None = None,
+    resolution: str = "auto",
+    mode: str = "multiplier",
+) -> KLineSeries:
+    """
+    查询 [start, end] 窗口内的K线
+
+    Args:
+        start/end: 窗口起止日期（含），缺省为出生日与寿命区间末日，超出寿命区间的部分被截掉
+        resolution: day/week/month/year，auto 按窗口长度选择
+        mode: 仅年K有效；日/周/月K固定为加法模式（收盘价为综合分）
+
+    周/月K返回与窗口有交集的完整周期
+    """
+    check_mode(mode)
+    start, end, resolution = resolve_kline_window(bazi, start, end, resolution)
+
+    if resolution == "year":
+        series = get_kline_series(bazi, wuxing, LIFETIME_YEARS, mode)
+        lo, hi = np.searchsorted(series.x, [start.year, end.year + 1])
+    else:
+        series = _lifetime_series(bazi, wuxing, resolution)
+        lo = max(int(np.searchsorted(series.x, np.datetime64(start, "D"), side="right")) - 1, 0)
+        hi = int(np.searchsorted(series.x, np.datetime64(end, "D"), side="right"))
+    if hi - lo > MAX_RANGE_BARS:
+        raise ValueError(f"区间内K线超过{MAX_RANGE_BARS}根，请缩小区间或使用更粗的粒度")
+    return series.window(int(lo), int(hi))
@@ -0,0 +1,297 @@
+"""K线数据服务 - 按命盘与模式缓存列式 OHLC 数组
+
+K线只取决于命盘与模式（加法 kline_generator / 乘法 kline_multiplier），
+同一命盘在页面重跑时无需重新生成逐根 K 线对象。
+服务按 (命盘指纹, 模式) 缓存 NumPy 列式数组；请求更多年份时，
+只从已缓存序列的最后收盘价继续生成新增部分并拼接。
+
+hover 不再逐根拼接 HTML：每根K线只在 customdata 中引用共享的短字符串
+（干支、等级、五行/干支关系说明按六十甲子预先生成），
+由 Plotly 在浏览器端按 hovertemplate 渲染。
+"""
+from typing import NamedTuple
+import numpy as np
+from src.models.bazi_models import BaziChart, WuxingAnalysis, YearFortune
+from src.core.bazi.constants import TIANGAN, DIZHI, TIANGAN_WUXING
+from src.core.fortune.fortune_data import LEVEL_EMOJI
+from src.core.fortune.fortune_interpreter import _get_ganzhi_relations
+from src.core.fortune.year_scores import calculate_year_scores
+from src.core.utils.cache import get_cache
+from src.core.utils.hashing import stable_hash
+from .kline_generator import KLINE_PARAMS
+from .kline_multiplier import FORTUNE_MULTIPLIERS, SHADOW_CONFIG
+
+# K线模式：additive 为加法模式（收盘价即分数），multiplier 为乘法复利模式
+KLINE_MODES = ("additive", "multiplier")
+# 缓存结果版本（K线算法或 hover 列变更时递增）
+KLINE_CACHE_VERSION = 3
+
+# 运势等级（按分数从低到高），level_codes 为其下标
+LEVEL_NAMES = ("大凶", "凶", "小凶", "平", "小吉", "吉", "大吉")
+LEVEL_CODES = {name: code for code, name in enumerate(LEVEL_NAMES)}
+_LEVEL_BOUNDS = np.array([40, 50, 60, 70, 80, 90])
+# 六十甲子干支名
+GANZHI_60 = tuple(f"{TIANGAN[k % 10]}{DIZHI[k % 12]}" for k in range(60))
+_ARROWS = np.array(["↓", "→", "↑"], dtype=object)
+
+# 年K hover 列：0 年龄，1 干支，2 趋势，3 等级，4 涨跌幅/分数，5 表情，6 五行与干支关系
+_YEAR_HOVER_HEAD = "%{customdata[0]}岁 %{customdata[1]}年<br>%{customdata[2]} %{customdata[3]}"
+_YEAR_HOVER_TAIL = " %{customdata[5]}%{customdata[6]}<br>运势指数: %{close:.1f}<extra></extra>"
+YEAR_HOVERTEMPLATES = {
+    "additive": _YEAR_HOVER_HEAD + _YEAR_HOVER_TAIL,
+    "multiplier": _YEAR_HOVER_HEAD + " (%{customdata[4]:+.1f}%)" + _YEAR_HOVER_TAIL,
+}
+
+
+class KLineSeries(NamedTuple):
+    """
+    列式K线序列（结构数组，各数组等长）
+
+    x 为横轴（年K为公历年份）；change 在加法模式为分数，乘法模式为涨跌乘数；
+    customdata 为 (N, k) 的 object 数组，元素引用共享字符串，配合 hovertemplate 显示
+    """
+    mode: str
+    x: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    change: np.ndarray
+    level_codes: np.ndarray
+    customdata: np.ndarray
+    hovertemplate: str
+
+    @property
+    def size(self) -> int:
+        """K线根数"""
+        return len(self.x)
+
+    @property
+    def levels(self) -> tuple[str, ...]:
+        """各根K线的运势等级"""
+        return tuple(LEVEL_NAMES[c] for c in self.level_codes.tolist())
+
+    def head(self, n: int) -> "KLineSeries":
+        """前 n 根K线（数组为视图，不复制）"""
+        return self.window(0, n)
+
+    def window(self, lo: int, hi: int) -> "KLineSeries":
+        """第 [lo, hi) 根K线（数组为视图，不复制）"""
+        return self._replace(**{name: getattr(self, name)[lo:hi] for name in ARRAY_FIELDS})
+
+
+ARRAY_FIELDS = ("x", "open", "high", "low", "close", "change", "level_codes", "customdata")
+
+
+def chart_fingerprint(bazi: BaziChart, wuxing: WuxingAnalysis) -> str:
+    """命盘指纹（跨进程稳定），用作K线与图表缓存的键"""
+    return format(stable_hash(bazi.model_dump_json(), wuxing.model_dump_json()), "016x")
+
+
+def score_level_codes(scores: np.ndarray) -> np.ndarray:
+    """分数 -> 等级下标（与 fortune_data.get_fortune_level 的区间一致）"""
+    codes = np.searchsorted(_LEVEL_BOUNDS, scores, side="right")
+    # 区间外的分数按"平"处理
+    return np.where((scores < 0) | (scores >= 100), LEVEL_CODES["平"], codes).astype(np.int8)
+
+
+def _cycle_text_table(bazi: BaziChart, wuxing: WuxingAnalysis) -> np.ndarray:
+    """hover 中只取决于命盘与流年干支的部分，按六十甲子预先生成"""
+    favorable_wx = {w.value for w in wuxing.favorable}
+    zhi_text = {}
+    for zhi in DIZHI:
+        relations = [r[1] for r in _get_ganzhi_relations(zhi, bazi)] or ["无特殊关系"]
+        zhi_text[zhi] = f"<br>干支: {', '.join(relations[:2])}"
+    table = []
+    for ganzhi in GANZHI_60:
+        wx = TIANGAN_WUXING[ganzhi[0]]
+        effect = "喜神当值，助力运势" if wx in favorable_wx else "忌神流年，需多努力"
+        table.append(f"<br>五行: {wx} - {effect}{zhi_text[ganzhi[1]]}")
+    return np.array(table, dtype=object)
+
+
+def _year_customdata(
+    ages: np.ndarray, cycle: np.ndarray, codes: np.ndarray, value: np.ndarray,
+    trend: np.ndarray, text: np.ndarray,
+) -> np.ndarray:
+    """组装年K hover 列（字符串列均按下标取自共享表）"""
+    names = np.array(LEVEL_NAMES, dtype=object)
+    emoji = np.array([LEVEL_EMOJI[name] for name in LEVEL_NAMES], dtype=object)
+    columns = (
+        ages, np.array(GANZHI_60, dtype=object)[cycle], _ARROWS[np.sign(trend).astype(int) + 1],
+        names[codes], value, emoji[codes], text,
+    )
+    customdata = np.empty((len(ages), len(columns)), dtype=object)
+    for j, column in enumerate(columns):
+        customdata[:, j] = column
+    return customdata
+
+
+def additive_ohlc(
+    scores: np.ndarray, codes: np.ndarray, prev_close: float
+) -> tuple[np.ndarray, ...]:
+    """加法模式 OHLC：开盘 = 上年分数，收盘 = 当年分数（与 generate_kline_data 一致）"""
+    params = [KLINE_PARAMS[name] for name in LEVEL_NAMES]
+    vol = np.array([p["volatility"] * p["shadow_ratio"] for p in params])[codes]
+    good = codes > LEVEL_CODES["平"]
+    bad = codes < LEVEL_CODES["平"]
+
+    close = scores.astype(float)
+    open_ = np.concatenate(([prev_close], close[:-1]))
+    top, bottom = np.maximum(open_, close), np.minimum(open_, close)
+    mid = (open_ + close) / 2
+    high = np.where(good, close + vol * 0.3, np.where(bad, top + vol * 0.6, mid + vol))
+    low = np.where(good, bottom - vol * 0.6, np.where(bad, close - vol * 0.3, mid - vol))
+    high = np.maximum(np.minimum(high, 100), top)
+    low = np.minimum(np.maximum(low, 20), bottom)
+    return open_, high, low, close, close.copy()
+
+
+def _multiplier_ohlc(codes: np.ndarray, prev_close: float) -> tuple[np.ndarray, ...]:
+    """乘法模式 OHLC：收盘 = 开盘 × 等级乘数（与 generate_multiplier_klines 一致）"""
+    mult = np.array([FORTUNE_MULTIPLIERS[name] for name in LEVEL_NAMES])[codes]
+    upper = np.array([SHADOW_CONFIG[name]["upper"] for name in LEVEL_NAMES])[codes]
+    lower = np.array([SHADOW_CONFIG[name]["lower"] for name in LEVEL_NAMES])[codes]
+
+    # 逐年连乘（与逐年循环相乘的结果逐位相同）
+    close = np.cumprod(np.concatenate(([prev_close], mult)))[1:]
+    open_ = np.concatenate(([prev_close], close[:-1]))
+    high = np.maximum(open_, close) * (1 + upper)
+    low = np.maximum(np.minimum(open_, close) * (1 - lower), 1)
+    return open_, high, low, close, mult
+
+
+def _ohlc(
+    mode: str, scores: np.ndarray, codes: np.ndarray, prev_close: float
+) -> tuple[tuple[np.ndarray, ...], np.ndarray, np.ndarray]:
+    """按模式生成 OHLC，另返回 hover 用的数值列与趋势"""
+    if mode == "additive":
+        ohlc = additive_ohlc(scores, codes, prev_close)
+        return ohlc, ohlc[3], ohlc[3] - ohlc[0]
+    ohlc = _multiplier_ohlc(codes, prev_close)
+    pct = (ohlc[4] - 1) * 100
+    return ohlc, pct, pct
+
+
+def _generate(
+    bazi: BaziChart, wuxing: WuxingAnalysis, mode: str,
+    start_age: int, years: int, prev_close: float | None, base_price: float,
+) -> KLineSeries:
+    """生成 [start_age, years) 年龄段的K线（未取整的原始价格）"""
+    scores = calculate_year_scores(bazi, wuxing, years)[start_age:]
+    ages = np.arange(start_age, years)
+    year_arr = bazi.birth_datetime.year + ages
+    codes = score_level_codes(scores)
+    if prev_close is None:
+        first = scores[0] if len(scores) else 60.0
+        prev_close = first if mode == "additive" else base_price
+
+    ohlc, value, trend = _ohlc(mode, scores, codes, prev_close)
+    cycle = (year_arr - 4) % 60
+    customdata = _year_customdata(
+        ages, cycle, codes, value, trend, _cycle_text_table(bazi, wuxing)[cycle]
+    )
+    return KLineSeries(mode, year_arr, *ohlc, codes, customdata, YEAR_HOVERTEMPLATES[mode])
+
+
+def _concat(head: KLineSeries, tail: KLineSeries) -> KLineSeries:
+    """拼接两段K线"""
+    return head._replace(**{
+        name: np.concatenate((getattr(head, name), getattr(tail, name)))
+        for name in ARRAY_FIELDS
+    })
+
+
+def round_series(series: KLineSeries) -> KLineSeries:
+    """输出前按模式取整价格（加法 1 位、乘法 2 位小数）"""
+    digits = 1 if series.mode == "additive" else 2
+    # 用内置 round 逐个取整（正确舍入），np.round 在 .xx5 附近与之相差 0.01
+    return series._replace(**{
+        name: np.array([round(x, digits) for x in getattr(series, name).tolist()])
+        for name in ("open", "high", "low", "close")
+    })
+
+
+def check_mode(mode: str) -> None:
+    """校验K线模式"""
+    if mode not in KLINE_MODES:
+        raise ValueError(f"未知K线模式: {mode}，可选 {KLINE_MODES}")
+
+
+def get_kline_series(
+    bazi: BaziChart,
+    wuxing: WuxingAnalysis,
+    years: int = 91,
+    mode: str = "multiplier",
+    base_price: float = 100.0,
+) -> KLineSeries:
+    """
+    获取命盘从出生起 years 年的列式K线
+
+    结果按 (命盘指纹, 模式, 基准价) 缓存；已缓存的序列比请求短时，
+    从其最后收盘价继续生成新增年份并拼接，不重算已有部分。
+    """
+    check_mode(mode)
+    if years < 1:
+        raise ValueError("年数至少为 1")
+
+    cache = get_cache("kline", version=KLINE_CACHE_VERSION)
+    key = (chart_fingerprint(bazi, wuxing), mode, base_price)
+    raw = cache.get(key)
+    if raw is None:
+        raw = _generate(bazi, wuxing, mode, 0, years, None, base_price)
+    elif raw.size < years:
+        prev_close = float(raw.close[-1])
+        raw = _concat(raw, _generate(bazi, wuxing, mode, raw.size, years, prev_close, base_price))
+    else:
+        return round_series(raw.head(years))
+    for name in ARRAY_FIELDS:
+        getattr(raw, name).flags.writeable = False
+    cache.set(key, raw)
+    return round_series(raw.head(years))
+
+
+def kline_series_from_fortunes(
+    fortunes: list[YearFortune], mode: str = "multiplier", base_price: float = 100.0
+) -> KLineSeries:
+    """
+    由已有的流年列表生成列式K线（不缓存）
+
+    等级取 YearFortune.level，缺省时按各生成器的分数区间推断；
+    五行/干支关系说明只取已生成的解读，不触发按需生成
+    """
+    check_mode(mode)
+    if mode == "additive":
+        from .kline_generator import _get_level_from_score
+    else:
+        from .kline_multiplier import _get_level_from_score
+
+    scores = np.array([f.score for f in fortunes], dtype=float)
+    codes = np.array([
+        LEVEL_CODES[f.level or (f.detail.level if f.detail else _get_level_from_score(f.score))]
+        for f in fortunes
+    ], dtype=np.int8)
+    first = scores[0] if len(scores) else 60.0
+    ohlc, value, trend = _ohlc(mode, scores, codes, first if mode == "additive" else base_price)
+
+    year_arr = np.array([f.year for f in fortunes], dtype=int)
+    text = np.array([_detail_text(f) for f in fortunes], dtype=object)
+    customdata = _year_customdata(
+        np.array([f.age for f in fortunes], dtype=int), (year_arr - 4) % 60,
+        codes, value, trend, text,
+    )
+    series = KLineSeries(
+        mode, year_arr, *ohlc,
+        codes, customdata, YEAR_HOVERTEMPLATES[mode],
+    )
+    return round_series(series)
+
+
+def _detail_text(fortune: YearFortune) -> str:
+    """已生成解读中的五行与干支关系说明"""
+    if fortune.detail is None:
+        return ""
+    text = f"<br>五行: {fortune.wuxing} - {fortune.detail.wuxing_effect}"
+    if fortune.detail.ganzhi_relations:
+        text += f"<br>干支: {', '.join(fortune.detail.ganzhi_relations[:2])}"
+    return text
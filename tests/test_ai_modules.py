@@ -1,12 +1,19 @@
 """AI模块单元测试"""
+import asyncio
+import json
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch
+from openai import RateLimitError
 
 from src.ai.config import AIConfig, get_ai_config, reset_ai_config
 from src.ai.serializer import serialize_bazi_for_ai, serialize_for_prompt
 from src.ai.prompts import SYSTEM_PROMPT, build_analysis_prompt
-from src.ai.interpreter import interpret_bazi
+from src.ai.interpreter import ainterpret_bazi, interpret_bazi
+from src.ai.client import acomplete, complete, close_llm_clients
 
 
 class TestAIConfig:
@@ -111,14 +118,12 @@ class TestInterpreter:
         assert result.career is not None
         assert result.summary is not None
     
-    @patch("src.ai.interpreter.OpenAI")
+    @patch("src.ai.interpreter.complete")
     def test_ai_interpretation_success(
-        self, mock_openai, sample_male_bazi, sample_wuxing
+        self, mock_complete, sample_male_bazi, sample_wuxing
     ):
         """测试AI解读成功"""
-        # Mock OpenAI响应
-        mock_response = MagicMock()
-        mock_response.choices[0].message.content = '''
+        mock_complete.return_value = '''
         {
             "personality": "测试性格",
             "career": "测试事业",
@@ -128,9 +133,6 @@ class TestInterpreter:
             "summary": "测试总结"
         }
         '''
-        mock_client = MagicMock()
-        mock_client.chat.completions.create.return_value = mock_response
-        mock_openai.return_value = mock_client
         
         result = interpret_bazi(
             sample_male_bazi, sample_wuxing, api_key="test-key"
@@ -138,13 +140,14 @@ class TestInterpreter:
         
         assert result.personality == "测试性格"
         assert result.summary == "测试总结"
+        assert mock_complete.call_args.args[0].api_key == "test-key"
     
-    @patch("src.ai.interpreter.OpenAI")
+    @patch("src.ai.interpreter.complete")
     def test_ai_interpretation_fallback(
-        self, mock_openai, sample_male_bazi, sample_wuxing
+        self, mock_complete, sample_male_bazi, sample_wuxing
     ):
         """测试AI调用失败时回退到默认解读"""
-        mock_openai.side_effect = Exception("API Error")
+        mock_complete.side_effect = Exception("API Error")
         
         result = interpret_bazi(
             sample_male_bazi, sample_wuxing, api_key="test-key"
@@ -153,3 +156,212 @@ class TestInterpreter:
         # 应该返回默认解读而不是抛出异常
         assert result.personality is not None
 
+    @patch("src.ai.interpreter.acomplete", new_callable=AsyncMock)
+    def test_async_interpretation(self, mock_acomplete, sample_male_bazi, sample_wuxing):
+        """异步解读：成功时解析结果，失败时回退到默认解读"""
+        mock_acomplete.return_value = json.dumps({
+            "personality": "异步性格", "career": "事业", "love": "感情",
+            "health": "健康", "wealth": "财运", "summary": "异步总结",
+        })
+        result = asyncio.run(ainterpret_bazi(sample_male_bazi, sample_wuxing, api_key="test-key"))
+        assert result.summary == "异步总结"
+        assert mock_acomplete.await_args.args[0].api_key == "test-key"
+
+        mock_acomplete.side_effect = Exception("API Error")
+        result = asyncio.run(ainterpret_bazi(sample_male_bazi, sample_wuxing, api_key="test-key"))
+        assert result == interpret_bazi(sample_male_bazi, sample_wuxing)
+
+
+class _StubLLMHandler(BaseHTTPRequestHandler):
+    """OpenAI 兼容的对话补全桩：按脚本依次返回限流/错误/正常响应"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append((self.client_address, body))
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            status = server.script.pop(0) if server.script else 200
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+        if status == 200:
+            payload = {
+                "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{
+                    "index": 0, "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": f"echo:{body['messages'][-1]['content']}"},
+                }],
+            }
+            headers = {}
+        else:
+            payload = {"error": {"message": "stub error", "type": "rate_limit", "code": None}}
+            headers = {"retry-after-ms": "50"} if status == 429 else {}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+async def _pooled_client(cfg: AIConfig):
+    """在后台事件循环中读取 cfg 对应的共享客户端"""
+    from src.ai.client import _clients
+    return _clients[(cfg.api_key, cfg.base_url)].client
+
+
+class TestLLMClient:
+    """共享 LLM 客户端测试（本地 OpenAI 兼容桩服务）"""
+
+    @pytest.fixture
+    def stub(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubLLMHandler)
+        server.lock = threading.Lock()
+        server.requests, server.script = [], []
+        server.active = server.peak = 0
+        server.delay = 0.0
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        close_llm_clients()
+        server.shutdown()
+        server.server_close()
+
+    @staticmethod
+    def _config(server, **kwargs) -> AIConfig:
+        return AIConfig(
+            api_key="sk-stub", base_url=f"http://127.0.0.1:{server.server_port}/v1", **kwargs
+        )
+
+    @staticmethod
+    def _ask(cfg, text="你好"):
+        return complete(cfg, [{"role": "user", "content": text}])
+
+    def test_reuses_connection(self, stub):
+        """相同 (api_key, base_url) 的请求复用同一连接"""
+        cfg = self._config(stub)
+        assert self._ask(cfg, "一") == "echo:一"
+        assert self._ask(cfg, "二") == "echo:二"
+        ports = {address[1] for address, _ in stub.requests}
+        assert len(stub.requests) == 2 and len(ports) == 1
+        assert stub.requests[0][1]["model"] == cfg.model
+
+    def test_retries_rate_limit(self, stub, monkeypatch):
+        """限流与 5xx 在 max_retries 内重试，并至少等待 Retry-After"""
+        monkeypatch.setattr("src.ai.client.BACKOFF_BASE", 0.01)
+        stub.script = [429, 500]
+        start = time.perf_counter()
+        assert self._ask(self._config(stub, max_retries=2)) == "echo:你好"
+        assert len(stub.requests) == 3
+        assert time.perf_counter() - start >= 0.05
+
+    def test_retries_exhausted(self, stub, monkeypatch):
+        """重试用尽后抛出 RateLimitError"""
+        monkeypatch.setattr("src.ai.client.BACKOFF_BASE", 0.01)
+        stub.script = [429, 429]
+        with pytest.raises(RateLimitError):
+            self._ask(self._config(stub, max_retries=1))
+        assert len(stub.requests) == 2
+
+    def test_client_pool_bounded(self, stub, monkeypatch):
+        """不同 API Key 的客户端数有上限，淘汰的客户端被关闭"""
+        import src.ai.client as client_module
+        monkeypatch.setattr(client_module, "MAX_CLIENTS", 2)
+        configs = [
+            AIConfig(api_key=f"sk-user-{i}", base_url=f"http://127.0.0.1:{stub.server_port}/v1")
+            for i in range(3)
+        ]
+        pooled = []
+        for cfg in configs:
+            assert complete(cfg, [{"role": "user", "content": "你好"}]) == "echo:你好"
+            pooled.append(client_module._submit(_pooled_client(cfg)).result())
+
+        assert [key[0] for key in client_module._clients] == ["sk-user-1", "sk-user-2"]
+        assert pooled[0].is_closed()
+        assert not pooled[1].is_closed() and not pooled[2].is_closed()
+
+    def test_concurrency_limit(self, stub, monkeypatch):
+        """全局信号量限制同时进行的请求数"""
+        monkeypatch.setenv("AI_MAX_CONCURRENCY", "2")
+        reset_ai_config()
+        close_llm_clients()
+        stub.delay = 0.05
+        cfg = self._config(stub)
+
+        async def burst():
+            return await asyncio.gather(*(
+                acomplete(cfg, [{"role": "user", "content": str(i)}]) for i in range(6)
+            ))
+
+        try:
+            assert asyncio.run(burst()) == [f"echo:{i}" for i in range(6)]
+            assert stub.peak == 2
+        finally:
+            reset_ai_config()
+
+    def test_chat_uses_configured_model(self, stub, monkeypatch):
+        """对话使用配置中的模型与地址"""
+        from src.ai import Session, chat_with_llm
+        monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{stub.server_port}/v1")
+        monkeypatch.setenv("AI_MODEL", "stub-model")
+        reset_ai_config()
+        try:
+            reply = chat_with_llm(Session(), "今天如何", api_key="sk-stub", feature="bazi")
+        finally:
+            reset_ai_config()
+        assert reply == "echo:今天如何"
+        assert stub.requests[0][1]["model"] == "stub-model"
+        assert stub.requests[0][1]["max_tokens"] == 1000
+
+
+class TestYearFortunes:
+    """大运K线年度运势测试"""
+
+    def test_vector_scores_match_fortunes(self, sample_male_bazi, sample_wuxing):
+        """向量化分数与逐年结果一致"""
+        from src.ai.interpreter import calculate_year_fortunes, calculate_year_scores
+        scores = calculate_year_scores(sample_male_bazi, sample_wuxing)
+        fortunes = calculate_year_fortunes(sample_male_bazi, sample_wuxing)
+
+        assert len(scores) == len(fortunes) == 91
+        assert [f.score for f in fortunes] == scores.tolist()
+        assert all(32 <= s <= 93 for s in scores)
+
+    def test_year_scores_reexported(self):
+        """src.ai 仍导出 calculate_year_scores（实现位于 src.core.fortune）"""
+        from src.ai import calculate_year_scores
+        from src.core.fortune import calculate_year_scores as core_scores
+        assert calculate_year_scores is core_scores
+
+    def test_lazy_detail(self, sample_male_bazi, sample_wuxing):
+        """with_detail=False 时解读按需生成，且与立即生成的结果相同"""
+        import pickle
+        from src.ai.interpreter import calculate_year_fortunes, materialize_year_details
+        eager = calculate_year_fortunes(sample_male_bazi, sample_wuxing, years=20)
+        lazy = calculate_year_fortunes(
+            sample_male_bazi, sample_wuxing, years=20, with_detail=False
+        )
+
+        assert all(f.detail is None for f in lazy)
+        assert [f.level for f in lazy] == [f.level for f in eager]
+        assert lazy[5].get_detail() == eager[5].detail
+        assert lazy[5].get_detail() is lazy[5].get_detail()
+        # 按需生成的解读不写回共享对象的公开字段
+        assert lazy[5].detail is None
+        assert lazy[5].model_dump()["detail"] is None
+        # 未生成解读的对象仍可序列化（缓存/跨进程）
+        restored = pickle.loads(pickle.dumps(lazy[6]))
+        assert restored.score == lazy[6].score
+        assert restored.get_detail() == eager[6].detail
+
+        full = materialize_year_details(lazy)
+        assert [f.detail for f in full] == [f.detail for f in eager]
+        assert all(f.detail is None for f in lazy)
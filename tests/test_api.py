@@ -170,7 +170,68 @@ class TestDateSelectionEndpoint:
                 "gender": "男"
             },
             "event_type": "结婚",
-            "search_days": 100  # 超过最大值 90
+            "search_days": 4000  # 超过最大值 3660
+        })
+        assert response.status_code == 422
+
+    def test_date_selection_multi_year(self, client):
+        """应支持跨多年的择日区间"""
+        response = client.post("/api/date-selection/analyze", json={
+            "birth_info": {
+                "birth_datetime": "1990-01-15T08:30:00",
+                "gender": "男"
+            },
+            "event_type": "结婚",
+            "start_date": "2025-01-01",
+            "search_days": 1095
+        })
+        assert response.status_code == 200
+        assert len(response.json()["recommended_dates"]) <= 10
+
+
+class TestGroupDateSelectionEndpoint:
+    """多人择日 API 测试"""
+
+    @pytest.fixture
+    def members(self):
+        """新人双方及父母"""
+        return [
+            {"name": "新郎", "birth_info": {"birth_datetime": "1990-01-15T08:30:00", "gender": "男"}},
+            {"name": "新娘", "birth_info": {"birth_datetime": "1992-06-20T14:00:00", "gender": "女"}},
+            {"name": "父亲", "birth_info": {"birth_datetime": "1962-03-02T10:00:00", "gender": "男"}, "weight": 0.5},
+        ]
+
+    def test_group_date_selection(self, client, members):
+        """多人择日应返回各成员得分"""
+        response = client.post("/api/date-selection/group", json={
+            "members": members,
+            "event_type": "结婚",
+            "start_date": "2025-01-01",
+            "search_days": 365,
+            "aggregation": "mean"
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["members"] == ["新郎", "新娘", "父亲"]
+        for day in data["recommended_dates"]:
+            assert set(day["member_scores"]) == {"新郎", "新娘", "父亲"}
+            assert day["clash_members"] == []
+
+    def test_group_invalid_aggregation(self, client, members):
+        """不支持的聚合方式应返回422"""
+        response = client.post("/api/date-selection/group", json={
+            "members": members,
+            "event_type": "结婚",
+            "aggregation": "max"
+        })
+        assert response.status_code == 422
+
+    def test_group_duplicate_names(self, client, members):
+        """成员称呼重复应返回422"""
+        members[1]["name"] = members[0]["name"]
+        response = client.post("/api/date-selection/group", json={
+            "members": members,
+            "event_type": "结婚",
         })
         assert response.status_code == 422
 
@@ -287,6 +348,21 @@ class TestAdvancedEndpoints:
             assert "ganzhi" in gong
             assert "description" in gong
     
+    def test_routes_share_chart_cache(self, client, birth_info):
+        """同一出生信息的多个高级分析请求应落到同一计算进程并共用一次排盘"""
+        import asyncio
+        from backend.api.schemas import BirthInfo
+        from backend.executor import run_cpu
+        from src.core import chart_cache_stats, clear_chart_cache
+        affinity = BirthInfo(**birth_info).affinity
+        asyncio.run(run_cpu(clear_chart_cache, affinity=affinity))
+        for path in ("dayun", "shishen", "shensha", "nayin", "auxiliary"):
+            response = client.post(f"/api/advanced/{path}", json={"birth_info": birth_info})
+            assert response.status_code == 200
+        stats = asyncio.run(run_cpu(chart_cache_stats, affinity=affinity))
+        assert stats["misses"] == 1
+        assert stats["hits"] == 4
+
     def test_auxiliary_female(self, client):
         """女性辅助宫位计算"""
         response = client.post("/api/advanced/auxiliary", json={
@@ -298,6 +374,225 @@ class TestAdvancedEndpoints:
         assert response.status_code == 200
 
 
+class TestFortuneTimelineEndpoint:
+    """每日运势时间线 API 测试"""
+
+    def test_stream_daily_timeline(self, client):
+        """应以 NDJSON 逐日返回评分"""
+        import json
+        response = client.post("/api/fortune/daily/stream", json={
+            "birth_info": {
+                "birth_datetime": "1990-01-15T08:30:00",
+                "gender": "男",
+                "birth_place": "北京"
+            },
+            "start_date": "2024-01-01",
+            "end_date": "2025-12-31"
+        })
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 731
+        assert rows[0]["date"] == "2024-01-01"
+        assert rows[-1]["date"] == "2025-12-31"
+        assert {"ganzhi", "score", "level", "career", "opportunity"} <= set(rows[0])
+
+    def test_default_range_is_lifelong(self, client):
+        """默认从出生日起输出100年"""
+        response = client.post("/api/fortune/daily/stream", json={
+            "birth_info": {
+                "birth_datetime": "1990-01-15T08:30:00",
+                "gender": "女"
+            }
+        })
+        assert response.status_code == 200
+        lines = response.text.splitlines()
+        assert lines[0].startswith('{"date": "1990-01-15"')
+        assert '"date": "2090-01-15"' in lines[-1]
+
+    def test_invalid_range(self, client):
+        """结束日期早于起始日期应返回400"""
+        response = client.post("/api/fortune/daily/stream", json={
+            "birth_info": {
+                "birth_datetime": "1990-01-15T08:30:00",
+                "gender": "男"
+            },
+            "start_date": "2024-01-01",
+            "end_date": "2023-01-01"
+        })
+        assert response.status_code == 400
+
+
+class TestKLineRangeEndpoint:
+    """人生K线区间查询 API 测试"""
+
+    def test_query_window(self, client):
+        """只返回窗口内的日K"""
+        response = client.post("/api/fortune/kline", json={
+            "birth_info": {
+                "birth_datetime": "1990-01-15T08:30:00",
+                "gender": "男",
+                "birth_place": "北京"
+            },
+            "from": "2024-01-01",
+            "to": "2024-03-31",
+            "resolution": "day"
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["resolution"] == "day"
+        assert len(data["x"]) == len(data["close"]) == len(data["level"]) == 91
+        assert data["x"][0] == "2024-01-01" and data["x"][-1] == "2024-03-31"
+
+    def test_auto_resolution(self, client):
+        """默认窗口为整个寿命区间，auto 选择月K"""
+        response = client.post("/api/fortune/kline", json={
+            "birth_info": {"birth_datetime": "1990-01-15T08:30:00", "gender": "女"}
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["resolution"] == "month"
+        assert data["from"] == "1990-01-15"
+        assert 1100 < len(data["x"]) < 1300
+
+    def test_year_resolution(self, client):
+        """年K横轴为年份"""
+        response = client.post("/api/fortune/kline", json={
+            "birth_info": {"birth_datetime": "1990-01-15T08:30:00", "gender": "男"},
+            "from": "2000-01-01", "to": "2009-12-31",
+            "resolution": "year", "mode": "additive"
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["x"] == list(range(2000, 2010))
+        assert data["mode"] == "additive"
+
+    def test_too_many_bars(self, client):
+        """日K区间过长返回400"""
+        response = client.post("/api/fortune/kline", json={
+            "birth_info": {"birth_datetime": "1990-01-15T08:30:00", "gender": "男"},
+            "resolution": "day"
+        })
+        assert response.status_code == 400
+
+
+class TestGeoEndpoint:
+    """地理位置 API 测试"""
+
+    def test_nearest_city(self, client):
+        """坐标反查最近城市"""
+        response = client.get("/api/geo/nearest", params={"lat": 39.9042, "lon": 116.4074})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["name"] == "北京" and data["level"] == "city"
+        assert data["distance_km"] < 1
+
+        response = client.get("/api/geo/nearest", params={"lat": 39.9, "lon": 116.4, "level": "province"})
+        assert response.json()["level"] == "province"
+
+    def test_nearest_out_of_range(self, client):
+        """超出最远距离返回404，坐标越界返回422"""
+        response = client.get(
+            "/api/geo/nearest", params={"lat": 48.85, "lon": 2.35, "max_distance_km": 100}
+        )
+        assert response.status_code == 404
+        assert client.get("/api/geo/nearest", params={"lat": 91, "lon": 0}).status_code == 422
+
+    def test_solar_time_by_coordinates(self, client):
+        """按坐标计算真太阳时：乌鲁木齐经度修正约 -130 分钟"""
+        response = client.post("/api/geo/solar-time", json={
+            "local_time": "2024-06-21T12:00:00", "latitude": 43.7928, "longitude": 87.6177
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["found"] is True
+        assert data["location"] == "乌鲁木齐"
+        assert data["longitude_correction_minutes"] == pytest.approx(-129.5, abs=0.1)
+
+    def test_birth_info_coordinates(self, client):
+        """出生信息可用坐标代替地点名，经纬度需成对提供"""
+        birth_info = {"birth_datetime": "1990-01-15T08:30:00", "gender": "男"}
+        response = client.post("/api/advanced/dayun", json={
+            "birth_info": {**birth_info, "latitude": 39.9042, "longitude": 116.4074}
+        })
+        assert response.status_code == 200
+        response = client.post("/api/advanced/dayun", json={
+            "birth_info": {**birth_info, "latitude": 39.9042}
+        })
+        assert response.status_code == 422
+
+
+class TestComputeExecutor:
+    """计算执行器测试"""
+
+    def test_metrics_endpoint(self, client):
+        """请求经计算池执行并计入指标"""
+        response = client.post("/api/advanced/year-nayin", json={"year": 2024})
+        assert response.status_code == 200
+        stats = client.get("/metrics/executor").json()
+        assert stats["cpu"]["completed"] >= 1
+        assert {"running", "queued", "rejected", "avg_wait_ms", "avg_run_ms"} <= set(stats["io"])
+
+    def test_backpressure(self):
+        """在途任务超过工作数与排队上限时立即拒绝"""
+        import threading
+        from backend.executor import ComputeExecutor, ExecutorBusyError
+        executor = ComputeExecutor(processes=0, threads=1, max_queue=1)
+        release = threading.Event()
+        try:
+            running = executor.io.submit(release.wait, (), {})
+            queued = executor.io.submit(release.wait, (), {})
+            with pytest.raises(ExecutorBusyError):
+                executor.io.submit(release.wait, (), {})
+            stats = executor.io.stats()
+            assert stats["running"] == 1 and stats["queued"] == 1
+            assert stats["rejected"] == 1 and stats["peak_queued"] == 1
+            release.set()
+            running.result(timeout=5)
+            queued.result(timeout=5)
+            assert executor.io.stats()["completed"] == 2
+        finally:
+            release.set()
+            executor.shutdown()
+
+    def test_busy_returns_503(self, client, monkeypatch):
+        """计算队列已满时路由返回 503"""
+        import threading
+        import backend.executor as executor_module
+        from backend.executor import ComputeExecutor, ExecutorBusyError
+        executor = ComputeExecutor(processes=0, threads=1, max_queue=0)
+        monkeypatch.setattr(executor_module, "_executor", executor)
+        release = threading.Event()
+        try:
+            with pytest.raises(ExecutorBusyError):
+                for _ in range(executor.cpu.workers + 1):
+                    executor.cpu.submit(release.wait, (), {})
+            response = client.post("/api/advanced/nayin", json={"birth_info": {
+                "birth_datetime": "1990-01-15T08:30:00", "gender": "男"
+            }})
+            assert response.status_code == 503
+            assert response.headers["Retry-After"] == "1"
+        finally:
+            release.set()
+            executor.shutdown()
+
+    def test_process_affinity(self):
+        """相同 affinity 的任务落到同一计算进程"""
+        import asyncio
+        import os
+        from backend.executor import ComputeExecutor
+        executor = ComputeExecutor(processes=2, threads=1, max_queue=4)
+
+        async def pids():
+            return [await executor.run_cpu(os.getpid, affinity=("a", 1)) for _ in range(3)]
+
+        try:
+            first = asyncio.run(pids())
+            assert len(set(first)) == 1 and first[0] != os.getpid()
+        finally:
+            executor.shutdown()
+
+
 class TestAPIValidation:
     """API验证测试"""
     
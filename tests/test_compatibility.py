@@ -3,7 +3,7 @@ import pytest
 from datetime import datetime
 from src.core import calculate_bazi, analyze_wuxing, calculate_compatibility
 from src.core.analysis.compatibility import (
-    _check_pair, _analyze_wuxing_compat,
+    _analyze_wuxing_compat,
     _analyze_ganzhi_relations, _calculate_score, _get_grade
 )
 from src.models.bazi_models import Gender
@@ -12,29 +12,6 @@ from src.models.compatibility_models import (
 )
 
 
-class TestCheckPair:
-    """配对检查测试"""
-    
-    def test_check_pair_found(self):
-        """应找到存在的配对"""
-        pairs = {("甲", "己"): "中正之合"}
-        result = _check_pair(pairs, "甲", "己")
-        assert result is not None
-        assert result[1] == "中正之合"
-    
-    def test_check_pair_reverse_order(self):
-        """应支持反向查找"""
-        pairs = {("甲", "己"): "中正之合"}
-        result = _check_pair(pairs, "己", "甲")
-        assert result is not None
-    
-    def test_check_pair_not_found(self):
-        """不存在的配对应返回 None"""
-        pairs = {("甲", "己"): "中正之合"}
-        result = _check_pair(pairs, "甲", "乙")
-        assert result is None
-
-
 class TestAnalyzeWuxingCompat:
     """五行互补分析测试"""
     
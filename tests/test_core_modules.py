@@ -2,6 +2,7 @@
 import pytest
 from datetime import datetime
 import time
+import numpy as np
 
 
 class TestCacheModule:
@@ -86,6 +87,54 @@ class TestCacheModule:
         assert key1 == key2
         assert key1 != key3
 
+    def test_byte_budget_eviction(self):
+        """超过字节预算时应淘汰最久未使用的条目"""
+        from src.core.utils.cache import BoundedCache, approx_size
+        value = "x" * 1000
+        cache = BoundedCache(default_ttl=60, maxsize=100, max_bytes=approx_size(value) * 3)
+        for i in range(5):
+            cache.set(i, "x" * 1000)
+        assert cache.size == 3
+        assert cache.get(0) is None and cache.get(4) is not None
+        assert cache.nbytes <= approx_size(value) * 3
+        # 单个超预算的值不缓存
+        cache.set("big", "y" * 10000)
+        assert cache.get("big") is None
+
+    def test_thread_safety(self):
+        """并发读写后条目数不超过上限"""
+        import threading
+        from src.core.utils.cache import BoundedCache
+        cache = BoundedCache(default_ttl=60, maxsize=50)
+
+        def worker(offset):
+            for i in range(2000):
+                cache.set((offset, i % 80), i)
+                cache.get((offset, (i * 7) % 80))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert cache.size <= 50
+        assert cache.stats()["evictions"] > 0
+
+    def test_namespace_stats(self):
+        """cache_stats 应包含各命名空间的统计"""
+        from src.core.utils.cache import get_cache, cache_stats, cached
+
+        @cached(ttl=60, namespace="test_ns")
+        def returns_none(x):
+            return None
+
+        get_cache("test_ns").clear()
+        returns_none(1)
+        returns_none(1)
+        stats = cache_stats()["namespaces"]["test_ns"]
+        # None 结果也应被缓存
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
 
 class TestExceptionsModule:
     """异常模块测试"""
@@ -411,3 +460,615 @@ class TestDayunModule:
         # 测试超出范围
         current = get_current_dayun(dayun_info, 100)
         assert current is None
+
+
+class TestPackedChart:
+    """紧凑八字表示测试"""
+    
+    def test_round_trip(self, sample_male_bazi):
+        """与 BaziChart 无损互转"""
+        from src.core.bazi.constants import TIANGAN
+        from src.core.bazi.packed import PackedChart
+        bazi = sample_male_bazi.model_copy(update={"birth_place": "北京"})
+        packed = PackedChart.from_chart(bazi)
+        assert packed.to_chart() == bazi
+        assert TIANGAN[packed.day_gan] == bazi.day_pillar.tiangan.value
+    
+    def test_analyzers_accept_packed(self, sample_male_bazi):
+        """核心分析函数可直接接收 PackedChart"""
+        from datetime import date
+        from src.core import analyze_wuxing, calculate_shensha
+        from src.core.bazi.packed import pack
+        from src.core.fortune import DailyFortuneEngine
+        
+        packed = pack(sample_male_bazi)
+        wuxing = analyze_wuxing(sample_male_bazi)
+        assert analyze_wuxing(packed) == wuxing
+        assert calculate_shensha(packed) == calculate_shensha(sample_male_bazi)
+        
+        target = date(2024, 6, 1)
+        engine = DailyFortuneEngine(packed, wuxing, target)
+        reference = DailyFortuneEngine(sample_male_bazi, wuxing, target)
+        assert engine.get_base_score() == reference.get_base_score()
+        assert engine.factors == reference.factors
+    
+    def test_batch_packed(self):
+        """批量结果可直接取 PackedChart"""
+        from src.core import calculate_bazi, calculate_bazi_batch
+        from src.core.bazi.packed import pack
+        from src.models.bazi_models import Gender
+        
+        dt = datetime(1992, 6, 20, 14, 0)
+        batch = calculate_bazi_batch([dt], Gender.FEMALE)
+        assert batch.packed(0) == pack(calculate_bazi(dt, Gender.FEMALE))
+
+
+class TestRelationMatrices:
+    """干支关系矩阵测试"""
+    
+    def test_matrices_match_constants(self):
+        """矩阵应与关系表一致且对称"""
+        from src.core.bazi.constants import TIANGAN, DIZHI, TIANGAN_HE, DIZHI_LIUCHONG
+        from src.core.bazi.relations import GAN_HE, ZHI_LIUCHONG
+        for (a, b), desc in TIANGAN_HE.items():
+            i, j = TIANGAN.index(a), TIANGAN.index(b)
+            assert GAN_HE[i][j] == GAN_HE[j][i] == desc
+        assert sum(1 for row in ZHI_LIUCHONG for v in row if v) == 2 * len(DIZHI_LIUCHONG)
+        assert ZHI_LIUCHONG[DIZHI.index("子")][DIZHI.index("午")] == "水火相冲"
+    
+    def test_relation_flags(self):
+        """位掩码应同时标记多种关系"""
+        from src.core.bazi.constants import DIZHI
+        from src.core.bazi.relations import (
+            ZHI_RELATION_FLAGS, LIUHE, XING, LIUCHONG, SANHE, ZHI_CHONG_PARTNER
+        )
+        si, shen = DIZHI.index("巳"), DIZHI.index("申")
+        assert ZHI_RELATION_FLAGS[si][shen] == LIUHE | XING
+        zi, chen = DIZHI.index("子"), DIZHI.index("辰")
+        assert ZHI_RELATION_FLAGS[zi][chen] == SANHE
+        assert not ZHI_RELATION_FLAGS[zi][zi] & LIUCHONG
+        assert ZHI_CHONG_PARTNER == tuple((z + 6) % 12 for z in range(12))
+
+
+class TestDailyTimeline:
+    """每日运势时间线测试"""
+
+    def test_matches_daily_report(self, sample_male_bazi, sample_wuxing):
+        """时间线分数应与每日运势报告一致"""
+        from datetime import date
+        from src.core import daily_fortune_timeline, generate_daily_fortune_report
+        from src.core.fortune.dimension_scorer import DIMENSION_KEYS
+        rows = list(daily_fortune_timeline(
+            sample_male_bazi, sample_wuxing, date(2024, 1, 1), date(2024, 3, 1)
+        ))
+        assert len(rows) == 61
+        for row in rows[::5]:
+            report = generate_daily_fortune_report(row.date, sample_male_bazi, sample_wuxing)
+            assert row.ganzhi == report.day_ganzhi
+            assert row.score == report.total_score
+            assert row.level == report.total_level
+            for key in DIMENSION_KEYS:
+                assert getattr(row, key) == getattr(report, key).score
+
+    def test_sixty_day_cycle(self, sample_male_bazi, sample_wuxing):
+        """相隔60天的两日评分相同"""
+        from datetime import date
+        from src.core import daily_fortune_timeline
+        rows = list(daily_fortune_timeline(
+            sample_male_bazi, sample_wuxing, date(1990, 1, 1), date(1990, 4, 1)
+        ))
+        assert rows[0][1:] == rows[60][1:]
+        assert rows[0].date != rows[60].date
+
+    def test_invalid_range(self, sample_male_bazi, sample_wuxing):
+        """结束日期早于起始日期应在调用时立即报错（不等到开始迭代）"""
+        from datetime import date
+        from src.core import daily_fortune_timeline
+        with pytest.raises(ValueError):
+            daily_fortune_timeline(
+                sample_male_bazi, sample_wuxing, date(2024, 2, 1), date(2024, 1, 1)
+            )
+
+    def test_table_rows_match_timeline(self, sample_male_bazi, sample_wuxing):
+        """预先计算的评分表查表结果与时间线一致"""
+        from datetime import date
+        from src.core import cycle_table_rows, daily_cycle_table, daily_fortune_timeline
+        start, end = date(2024, 1, 1), date(2024, 3, 31)
+        table = daily_cycle_table(sample_male_bazi, sample_wuxing)
+        assert len(table) == 60
+        assert list(cycle_table_rows(table, start, end)) == list(
+            daily_fortune_timeline(sample_male_bazi, sample_wuxing, start, end)
+        )
+
+
+class TestStableHash:
+    """稳定哈希测试"""
+
+    def test_stable_hash_pinned(self):
+        """哈希值不依赖进程，固定输入应得到固定输出"""
+        from src.core.utils.hashing import stable_hash, stable_noise
+        assert stable_hash("甲子") == 11833218382294355826
+        assert stable_hash("甲", "子") == 1287346944048353947
+        assert stable_noise("甲子", 15) == 6
+        assert stable_hash("甲子") != stable_hash("乙丑")
+
+    def test_stable_hash_ignores_hash_seed(self):
+        """其它 PYTHONHASHSEED 的进程得到相同的固定值"""
+        import os
+        import subprocess
+        import sys
+        script = (
+            "from src.core.utils.hashing import stable_hash, stable_noise\n"
+            "print(stable_hash('甲子'), stable_noise('甲子', 15))\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONHASHSEED="12345", PYTHONPATH=root)
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=root, env=env,
+            capture_output=True, text=True, check=True,
+        )
+        assert result.stdout.split() == ["11833218382294355826", "6"]
+
+    def test_stable_noise_range(self):
+        """扰动值应落在 [0, modulus)"""
+        from src.core.utils.hashing import stable_noise
+        from src.core.bazi.constants import TIANGAN, DIZHI
+        values = {stable_noise(TIANGAN[k % 10] + DIZHI[k % 12], 15) for k in range(60)}
+        assert values <= set(range(15))
+        assert len(values) > 1
+
+    def test_consistent_across_workers(self):
+        """不同 PYTHONHASHSEED 的进程应返回逐字节相同的响应（可用作 ETag）"""
+        import os
+        import subprocess
+        import sys
+        script = (
+            "import hashlib\n"
+            "from fastapi.testclient import TestClient\n"
+            "from backend.main import app\n"
+            "from datetime import datetime\n"
+            "from src.core import calculate_bazi, analyze_wuxing, calculate_liunian\n"
+            "from src.models import Gender\n"
+            "client = TestClient(app)\n"
+            "body = client.post('/api/date-selection/analyze', json={"
+            "'birth_info': {'birth_datetime': '1990-01-15T08:30:00', 'gender': '男'},"
+            "'event_type': '结婚', 'start_date': '2025-01-01', 'search_days': 365}).content\n"
+            "bazi = calculate_bazi(datetime(1990, 1, 15, 8, 30), Gender.MALE)\n"
+            "liunian = calculate_liunian(bazi, analyze_wuxing(bazi), years=10)\n"
+            "body += liunian.model_dump_json().encode()\n"
+            "print(hashlib.sha256(body).hexdigest())\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        digests = set()
+        for seed in ("1", "2"):
+            env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=root)
+            result = subprocess.run(
+                [sys.executable, "-c", script], cwd=root, env=env,
+                capture_output=True, text=True, check=True,
+            )
+            digests.add(result.stdout.strip())
+        assert len(digests) == 1
+
+
+class TestChartCache:
+    """命盘缓存测试"""
+
+    def test_lru_eviction_and_stats(self):
+        """超过容量应淘汰最久未使用的条目"""
+        from src.core.utils.cache import BoundedCache
+        cache = BoundedCache(default_ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 3 and stats["misses"] == 1
+
+    def test_lru_ttl(self):
+        """过期条目应视为未命中"""
+        from src.core.utils.cache import BoundedCache
+        cache = BoundedCache(default_ttl=1, maxsize=4)
+        cache.set("a", 1)
+        time.sleep(1.1)
+        assert cache.get("a") is None
+        assert cache.size == 0
+
+    def test_get_chart_hit(self):
+        """相同出生信息第二次应命中缓存并返回同一对象"""
+        from src.core import get_chart, chart_cache_stats, clear_chart_cache, calculate_bazi
+        from src.models import Gender
+        clear_chart_cache()
+        first = get_chart(datetime(1990, 1, 15, 8, 30), "男", "北京")
+        second = get_chart(datetime(1990, 1, 15, 8, 30), Gender.MALE, " 北京 ")
+        assert first is second
+        stats = chart_cache_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert first.solar_datetime != datetime(1990, 1, 15, 8, 30)
+        expected = calculate_bazi(first.solar_datetime, Gender.MALE, "北京")
+        assert first.bazi.day_pillar.display == expected.day_pillar.display
+
+    def test_normalize_timezone(self):
+        """带时区的出生时间应换算为北京时间"""
+        from datetime import timedelta, timezone
+        from src.core.bazi.chart_cache import normalize_birth_input
+        utc = datetime(1990, 1, 15, 0, 30, tzinfo=timezone.utc)
+        key = normalize_birth_input(utc, "女", "")
+        assert key.birth_datetime == datetime(1990, 1, 15, 8, 30)
+        assert key.birth_place is None and key.true_solar_time is False
+
+
+class TestPersistentCache:
+    """SQLite 持久化缓存测试"""
+
+    def test_roundtrip_and_ttl(self, tmp_path):
+        """应能存取复杂对象，过期后未命中"""
+        from src.core.utils.persistent_cache import SQLiteCache
+        from src.core import calculate_bazi
+        from src.models import Gender
+        cache = SQLiteCache(str(tmp_path / "c.sqlite3"), default_ttl=60, namespace="chart")
+        bazi = calculate_bazi(datetime(1990, 1, 15, 8, 30), Gender.MALE)
+        key = (datetime(1990, 1, 15, 8, 30), Gender.MALE, None)
+        cache.set(key, bazi)
+        assert cache.get(key) == bazi
+        cache.set("short", 1, ttl=1)
+        time.sleep(1.1)
+        assert cache.get("short") is None
+        assert cache.cleanup() == 1
+
+    def test_version_invalidation(self, tmp_path):
+        """版本号变化后旧记录应失效"""
+        from src.core.utils.persistent_cache import SQLiteCache
+        path = str(tmp_path / "c.sqlite3")
+        SQLiteCache(path, namespace="ns", version=1).set("k", "old")
+        assert SQLiteCache(path, namespace="ns", version=1).get("k") == "old"
+        newer = SQLiteCache(path, namespace="ns", version=2)
+        assert newer.get("k") is None
+        assert newer.cleanup() == 1
+
+    def test_versions_coexist(self, tmp_path):
+        """滚动发布时新旧版本的记录并存，旧版本清理不删除新版本的记录"""
+        from src.core.utils.persistent_cache import SQLiteCache
+        path = str(tmp_path / "c.sqlite3")
+        older = SQLiteCache(path, namespace="ns", version=1)
+        newer = SQLiteCache(path, namespace="ns", version=2)
+        older.set("k", "old")
+        newer.set("k", "new")
+        assert older.cleanup() == 0
+        assert (older.get("k"), newer.get("k")) == ("old", "new")
+        assert newer.cleanup() == 1
+        assert newer.get("k") == "new"
+
+    def test_max_entries(self, tmp_path):
+        """超过记录数上限时清理淘汰最早过期的记录"""
+        from src.core.utils.persistent_cache import SQLiteCache
+        cache = SQLiteCache(str(tmp_path / "c.sqlite3"), namespace="ns", max_entries=3)
+        for i in range(5):
+            cache.set(i, i, ttl=100 + i)
+        assert cache.size == 5
+        assert cache.cleanup() == 2
+        assert [cache.get(i) for i in range(5)] == [None, None, 2, 3, 4]
+
+    def test_shared_across_processes(self, tmp_path):
+        """其他进程写入的结果应可读取"""
+        import os
+        import subprocess
+        import sys
+        from src.core.utils.persistent_cache import SQLiteCache
+        path = str(tmp_path / "c.sqlite3")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = (
+            "from src.core.utils.persistent_cache import SQLiteCache\n"
+            f"SQLiteCache({path!r}, namespace='ns').set(('k', 1), {{'score': 88}})\n"
+        )
+        subprocess.run([sys.executable, "-c", script], cwd=root, check=True,
+                       env=dict(os.environ, PYTHONPATH=root, PYTHONHASHSEED="7"))
+        assert SQLiteCache(path, namespace="ns").get(("k", 1)) == {"score": 88}
+
+    def test_tiered_warm_restart(self, tmp_path):
+        """重启后内存为空时应从磁盘读取并回填内存"""
+        from src.core.utils.cache import BoundedCache
+        from src.core.utils.persistent_cache import SQLiteCache, TieredCache
+        path = str(tmp_path / "c.sqlite3")
+        TieredCache(BoundedCache(), SQLiteCache(path)).set("k", [1, 2, 3])
+        restarted = TieredCache(BoundedCache(), SQLiteCache(path))
+        assert restarted.size == 0
+        assert restarted.get("k") == [1, 2, 3]
+        assert restarted.size == 1
+        assert restarted.stats()["disk"]["hits"] == 1
+
+    def test_get_cache_sqlite_backend(self, tmp_path, monkeypatch):
+        """cache_backend=sqlite 时 get_cache 应返回两级缓存"""
+        from src.core.utils import cache as cache_module
+        from src.core.utils.persistent_cache import TieredCache
+        settings = cache_module.get_settings()
+        monkeypatch.setattr(settings, "cache_backend", "sqlite")
+        monkeypatch.setattr(settings, "cache_path", str(tmp_path / "c.sqlite3"))
+        monkeypatch.setattr(cache_module, "_caches", {})
+        cache = cache_module.get_cache("persist_test")
+        assert isinstance(cache, TieredCache)
+        cache.set("k", "v")
+        assert "disk" in cache_module.cache_stats()["namespaces"]["persist_test"]
+
+
+class TestCitySearch:
+    """城市检索索引测试"""
+
+    @staticmethod
+    def _brute_force(query, level=None):
+        """逐个城市比对的精确/前缀/包含匹配（索引结果的对照）"""
+        from src.core.utils import get_all_cities
+        found = {}
+        for city in get_all_cities():
+            if level and city.level != level:
+                continue
+            if query in (city.name, city.full_name):
+                score = 1.0
+            elif city.name.startswith(query) or city.full_name.startswith(query):
+                score = 0.9
+            elif query in city.name or query in city.full_name:
+                score = 0.8
+            else:
+                continue
+            found.setdefault((city.name, city.province, city.level), score)
+        return found
+
+    @pytest.mark.parametrize("query", ["北京", "北", "州", "城区", "朝阳区", "乌鲁木齐", "自治"])
+    def test_matches_brute_force(self, query):
+        """精确/前缀/包含三层与逐个比对一致"""
+        from src.core.utils import search_cities
+        expected = self._brute_force(query)
+        results = search_cities(query, limit=len(expected) + 10)
+        keys = [(c.name, c.province, c.level) for c in results]
+        assert set(keys[:len(expected)]) == set(expected)
+        scores = [expected[k] for k in keys[:len(expected)]]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_ranking(self):
+        """精确匹配在前，同分市级优先"""
+        from src.core.utils import search_cities
+        results = search_cities("北京")
+        assert (results[0].name, results[0].level) == ("北京", "city")
+        assert search_cities("哈尔")[0].name == "哈尔滨"
+        assert search_cities("  ") == []
+
+    def test_fuzzy_typo(self):
+        """错别字走模糊匹配"""
+        from src.core.utils import search_cities, get_city_location
+        assert search_cities("哈尔宾")[0].name == "哈尔滨"
+        assert search_cities("乌鲁木其")[0].name == "乌鲁木齐"
+        assert get_city_location("石家装").name == "石家庄"
+
+    def test_level_filter(self):
+        """限定级别"""
+        from src.core.utils import search_cities
+        results = search_cities("朝阳", level="district")
+        assert results and all(c.level == "district" for c in results)
+
+    def test_bounded_edit_distance(self):
+        """插入/删除距离及超界提前返回"""
+        from src.core.utils.city_search import bounded_edit_distance
+        assert bounded_edit_distance("北京", "北京", 2) == 0
+        assert bounded_edit_distance("北惊", "北京", 2) == 2
+        assert bounded_edit_distance("上海是", "上海", 1) == 1
+        assert bounded_edit_distance("abcdef", "ghijkl", 3) == 4
+        assert bounded_edit_distance("a", "abcdef", 2) == 3
+
+    @pytest.mark.parametrize("query,expected", [
+        ("beijing", "北京"), ("Shen Zhen", "深圳"), ("Xi'an", "西安"), ("hhht", "呼和浩特"),
+        ("bjing", "北京"), ("北jing", "北京"), ("bei京", "北京"), ("chongqing", "重庆"),
+        ("changzhi", "长治"), ("lvliang", "吕梁"), ("luliang", "吕梁"),
+    ])
+    def test_pinyin(self, query, expected):
+        """全拼、首字母与混合输入"""
+        from src.core.utils import search_cities
+        assert search_cities(query)[0].name == expected
+
+    def test_pinyin_initials_ranking(self):
+        """首字母缩写覆盖整个地名的排在只覆盖前几个字的之前"""
+        from src.core.utils import search_cities
+        names = [c.name for c in search_cities("bj", limit=20, level="city")]
+        assert {"北京", "宝鸡", "毕节"} <= set(names[:3])
+
+    def test_latin_query_skips_fuzzy(self, monkeypatch):
+        """拉丁字母查询不进入模糊匹配"""
+        from src.core.utils import search_cities, get_city_location
+        from src.core.utils.city_search import CitySearchIndex
+
+        def fail(*args, **kwargs):
+            raise AssertionError("fuzzy path")
+
+        monkeypatch.setattr(CitySearchIndex, "fuzzy_candidates", fail)
+        assert search_cities("qqqq") == []
+        assert get_city_location("Guangzhou").name == "广州"
+
+    def test_pinyin_table_matches_data(self):
+        """拼音表覆盖全部地名且与 latlng.json 同步"""
+        import json
+        from src.core.utils import get_all_cities
+        from src.core.utils.cities_data import source_digest
+        from src.core.utils.city_pinyin import _PINYIN_FILE, load_pinyin_table
+
+        table = load_pinyin_table()
+        assert json.loads(_PINYIN_FILE.read_text(encoding="utf-8"))["source"] == source_digest().hex()
+        for city in get_all_cities():
+            for text in (city.name.strip(), city.full_name.strip()):
+                assert len(table[text]) == len(text)
+                assert all(s.isascii() and s.isalpha() for s in table[text])
+
+
+class TestCityTable:
+    """二进制城市数据测试"""
+
+    @pytest.fixture
+    def table_path(self, tmp_path, monkeypatch):
+        from src.core.utils import cities_data
+        path = tmp_path / "latlng.bin"
+        monkeypatch.setattr(cities_data, "_BINARY_FILE", path)
+        cities_data.load_city_table.cache_clear()
+        yield path
+        cities_data.load_city_table.cache_clear()
+
+    def test_matches_json(self):
+        """与解析 JSON 的结果一致（经纬度为 float32 精度）"""
+        import json
+        from src.core.utils.cities_data import _DATA_FILE, _parse_location_data, load_city_table
+
+        with open(_DATA_FILE, encoding="utf-8") as f:
+            expected = _parse_location_data(json.load(f))
+        cities = load_city_table().cities()
+        assert len(cities) == len(expected)
+        for city, ref in zip(cities, expected):
+            assert (city.name, city.province, city.level, city.full_name) == (
+                ref.name, ref.province, ref.level, ref.full_name
+            )
+            assert city.longitude == pytest.approx(ref.longitude, abs=1e-4)
+            assert city.latitude == pytest.approx(ref.latitude, abs=1e-4)
+
+    def test_rebuilt_when_missing_or_stale(self, table_path):
+        """文件缺失或摘要不符时重新生成"""
+        from src.core.utils.cities_data import load_city_table, source_digest, _HEADER
+
+        table = load_city_table()
+        assert table_path.exists() and table.digest == source_digest()
+
+        data = bytearray(table_path.read_bytes())
+        data[_HEADER.size - 16:_HEADER.size] = bytes(16)
+        table_path.write_bytes(bytes(data))
+        load_city_table.cache_clear()
+        assert load_city_table().digest == source_digest()
+        assert table_path.read_bytes()[_HEADER.size - 16:_HEADER.size] == source_digest()
+
+    def test_columns(self):
+        """列式数组与记录一致"""
+        from src.core.utils.cities_data import LEVELS, load_city_table
+
+        table = load_city_table()
+        i = next(i for i in range(len(table)) if table.city(i).name == "乌鲁木齐")
+        city = table.city(i)
+        assert LEVELS[table.level_codes[i]] == city.level
+        assert table.longitude.dtype == np.float32
+        assert abs(city.longitude - 87.6) < 0.5
+        assert not table.longitude.flags.writeable
+
+
+class TestCityGeo:
+    """坐标反查城市测试"""
+
+    def test_matches_brute_force(self):
+        """网格查询与逐个计算距离的结果一致（含区域外与经度 ±180° 附近的点）"""
+        from src.core.utils import nearest_city
+        from src.core.utils.cities_data import load_city_table
+        from src.core.utils.city_geo import haversine_km
+
+        table = load_city_table()
+        rng = np.random.default_rng(7)
+        points = np.c_[rng.uniform(15, 56, 300), rng.uniform(70, 140, 300)].tolist()
+        points += [[48.85, 2.35], [-33.9, 151.2], [0.0, 0.0]]
+        # 经度 ±180° 附近（网格范围外）
+        points += [[56.85, -179.01], [52.0, 179.9], [60.0, -175.0], [-10.0, 180.0], [48.0, -180.0]]
+        for lat, lon in points:
+            dist = haversine_km(lat, lon, table.latitude.astype(float), table.longitude.astype(float))
+            found = nearest_city(lat, lon)
+            assert found.distance_km == pytest.approx(dist.min(), abs=1e-6)
+
+    def test_level_and_max_distance(self):
+        """限定级别与最远距离"""
+        from src.core.utils import nearest_city
+        assert nearest_city(31.23, 121.47).city.name == "上海"
+        assert nearest_city(39.93, 116.41, level="district").city.name == "东城"
+        assert nearest_city(48.85, 2.35, max_distance_km=500) is None
+        with pytest.raises(ValueError):
+            nearest_city(95, 116)
+
+    def test_solar_time_from_coordinates(self):
+        """坐标换算真太阳时使用原始经度"""
+        from src.core import convert_to_true_solar_time
+        from src.core.utils import Location, get_location_by_coordinates
+
+        loc = get_location_by_coordinates(43.7928, 87.6177)
+        assert loc == Location("乌鲁木齐", 87.6177, 43.7928)
+        dt = datetime(2024, 6, 21, 12, 0)
+        assert convert_to_true_solar_time(dt, loc) == convert_to_true_solar_time(
+            dt, Location("x", 87.6177, 43.7928)
+        )
+
+    def test_chart_cache_rounds_coordinates(self):
+        """坐标差异在 10 米以内共用命盘缓存"""
+        from src.core.bazi.chart_cache import normalize_birth_input
+        from src.core.utils import Location
+
+        dt = datetime(1990, 1, 15, 8, 30)
+        a = normalize_birth_input(dt, "男", Location("北京", 116.407411, 39.904211))
+        b = normalize_birth_input(dt, "男", Location("北京", 116.407438, 39.904179))
+        assert a == b and a.true_solar_time
+
+
+class TestFullAnalysis:
+    """全量分析流水线测试"""
+
+    BIRTH = (datetime(1990, 1, 15, 8, 30), "男", "北京")
+
+    @pytest.fixture(autouse=True)
+    def _fresh_cache(self):
+        from src.core.utils.cache import clear_cache
+        clear_cache("full_analysis")
+        yield
+        clear_cache("full_analysis")
+
+    def test_matches_direct_calls(self):
+        """流水线结果与逐个调用分析函数一致"""
+        from datetime import date
+        from src.core import (
+            compute_full_analysis, BirthInput, get_chart, analyze_shishen,
+            calculate_dayun, calculate_nayin, analyze_bonefate,
+        )
+        today = date(2024, 6, 1)
+        analysis = compute_full_analysis(BirthInput(*self.BIRTH), today=today)
+        bazi, wuxing, solar_dt = get_chart(*self.BIRTH)
+        assert analysis.bazi is bazi and analysis.solar_datetime == solar_dt
+        assert analysis.shishen.pattern == analyze_shishen(bazi).pattern
+        assert analysis.dayun.model_dump() == calculate_dayun(bazi, wuxing).model_dump()
+        assert [n.nayin for n in analysis.nayin] == [n.nayin for n in calculate_nayin(bazi)]
+        assert analysis.bonefate == analyze_bonefate(solar_dt)
+        assert len(analysis.fortunes) == 91
+        assert [r.target_date for r in analysis.daily_reports] == [
+            date(2024, 6, 1), date(2024, 6, 2), date(2024, 6, 3)
+        ]
+
+    def test_resolve_stages(self):
+        """按需阶段自动补全依赖，未知阶段报错"""
+        from src.core.pipeline import resolve_stages, ALL_STAGES
+        assert resolve_stages(["nayin"]) == ["chart", "nayin"]
+        assert resolve_stages(None) == list(ALL_STAGES)
+        with pytest.raises(ValueError):
+            resolve_stages(["unknown"])
+
+    def test_cache_and_incremental_stages(self):
+        """只算请求的阶段，之后补算缺少的阶段并复用已缓存结果"""
+        from datetime import date
+        from src.core import compute_full_analysis, BirthInput
+        today = date(2024, 6, 1)
+        partial = compute_full_analysis(BirthInput(*self.BIRTH), stages=["shishen"], today=today)
+        assert partial.shishen is not None and partial.dayun is None
+        full = compute_full_analysis(BirthInput(*self.BIRTH), today=today)
+        assert full.shishen is partial.shishen and full.dayun is not None
+        again = compute_full_analysis(BirthInput(*self.BIRTH), today=today)
+        assert again.fortunes is full.fortunes
+
+    def test_concurrent_matches_sequential(self):
+        """并发执行与顺序执行结果一致"""
+        from datetime import date
+        from src.core import compute_full_analysis, BirthInput
+        from src.core.utils.cache import clear_cache
+        today = date(2024, 6, 1)
+        sequential = compute_full_analysis(BirthInput(*self.BIRTH), today=today, concurrent=False)
+        clear_cache("full_analysis")
+        parallel = compute_full_analysis(BirthInput(*self.BIRTH), today=today, concurrent=True)
+        assert parallel.shishen.pattern == sequential.shishen.pattern
+        assert [f.score for f in parallel.fortunes] == [f.score for f in sequential.fortunes]
+        assert [r.model_dump() for r in parallel.daily_reports] == [
+            r.model_dump() for r in sequential.daily_reports
+        ]
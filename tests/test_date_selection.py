@@ -128,3 +128,78 @@ class TestSelectDates:
         json_str = result.to_json()
         assert isinstance(json_str, str)
         assert "event_type" in json_str
+
+    def test_select_dates_multi_year_top_k(self, sample_male_bazi, sample_wuxing):
+        """多年区间的前 k 个吉日/凶日应与逐日全量排序一致"""
+        from src.core.bazi.pillars import _get_day_pillar
+        start, days = date(2025, 1, 1), 3 * 365
+        result = select_dates(
+            sample_male_bazi, sample_wuxing, EventType.WEDDING, start, days
+        )
+        scored = []
+        for i in range(days):
+            current = start + timedelta(days=i)
+            ganzhi = _get_day_pillar(datetime(current.year, current.month, current.day, 12)).display
+            scored.append((current, ganzhi, *_calculate_day_score(ganzhi, sample_wuxing, EventType.WEDDING)))
+        good = [d for d in scored if d[3] in (DayQuality.EXCELLENT, DayQuality.GOOD)]
+        bad = [d for d in scored if d[3] in (DayQuality.BAD, DayQuality.TERRIBLE)]
+        good.sort(key=lambda d: d[2], reverse=True)
+        bad.sort(key=lambda d: d[2])
+        assert [(d.date, d.ganzhi) for d in result.recommended_dates] == [d[:2] for d in good[:10]]
+        assert [(d.date, d.ganzhi) for d in result.avoid_dates] == [d[:2] for d in bad[:5]]
+        assert f"推荐{len(good)}个吉日" in result.summary
+
+
+class TestSelectDatesForGroup:
+    """多人择日测试"""
+
+    @pytest.fixture
+    def members(self):
+        """六位成员"""
+        from src.core import GroupMember
+        births = [datetime(1990, 1, 15, 8), datetime(1992, 6, 20, 14), datetime(1960, 3, 5, 9),
+                  datetime(1962, 4, 6, 10), datetime(1963, 5, 7, 11), datetime(1965, 8, 8, 12)]
+        result = []
+        for i, dt in enumerate(births):
+            bazi = calculate_bazi(dt, Gender.MALE if i % 2 == 0 else Gender.FEMALE)
+            result.append(GroupMember(f"成员{i}", bazi, analyze_wuxing(bazi)))
+        return result
+
+    def test_single_member_matches_select_dates(self, members):
+        """单人且不否决时应与 select_dates 一致"""
+        from src.core import select_dates_for_group
+        start = date(2025, 1, 1)
+        group = select_dates_for_group(members[:1], EventType.WEDDING, start, 365, veto_clash=False)
+        single = select_dates(members[0].bazi, members[0].wuxing, EventType.WEDDING, start, 365)
+        assert [d.date for d in group.recommended_dates] == [d.date for d in single.recommended_dates]
+        assert [d.date for d in group.avoid_dates] == [d.date for d in single.avoid_dates]
+
+    def test_min_aggregation(self, members):
+        """min 聚合的得分为成员最低分"""
+        from src.core import select_dates_for_group
+        result = select_dates_for_group(members, EventType.BUSINESS, date(2025, 1, 1), 365,
+                                        veto_clash=False)
+        for day in result.recommended_dates + result.avoid_dates:
+            assert day.score == min(day.member_scores.values())
+
+    def test_clash_veto(self, members):
+        """冲成员生肖的日期不应被推荐，且优先列入凶日"""
+        from src.core import select_dates_for_group
+        result = select_dates_for_group(members, EventType.WEDDING, date(2025, 1, 1), 365,
+                                        aggregation="mean")
+        assert all(not day.clash_members for day in result.recommended_dates)
+        assert result.avoid_dates[0].clash_members
+        assert result.avoid_dates[0].quality == DayQuality.TERRIBLE
+
+    def test_invalid_aggregation(self, members):
+        """不支持的聚合方式应报错"""
+        from src.core import select_dates_for_group
+        with pytest.raises(ValueError):
+            select_dates_for_group(members, EventType.WEDDING, date(2025, 1, 1), 30, aggregation="max")
+
+    def test_duplicate_names(self, members):
+        """成员称呼重复应报错（得分按称呼区分）"""
+        from src.core import GroupMember, select_dates_for_group
+        twin = GroupMember(members[0].name, members[1].bazi, members[1].wuxing)
+        with pytest.raises(ValueError):
+            select_dates_for_group([members[0], twin], EventType.WEDDING, date(2025, 1, 1), 30)
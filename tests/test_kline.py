@@ -0,0 +1,246 @@
+"""人生K线测试 - 列式K线数据服务、降采样"""
+import re
+import numpy as np
+import pytest
+from src.ai.interpreter import calculate_year_fortunes
+from src.core.utils.cache import clear_cache
+from src.viz import (
+    KLINE_MODES, get_kline_series, kline_series_from_fortunes,
+    create_kline_figure, create_fortune_kline,
+    period_buckets, aggregate_ohlc, lttb_indices,
+)
+from src.viz.kline_generator import generate_kline_data
+from src.viz.kline_multiplier import generate_multiplier_klines
+
+_PRICE_FIELDS = ("x", "open", "high", "low", "close", "change", "level_codes")
+
+
+def _render_hover(series, i: int) -> str:
+    """按 hovertemplate 在 Python 端渲染第 i 根K线的 hover（去掉收盘价行）"""
+    row = series.customdata[i]
+
+    def field(match):
+        value = row[int(match.group(1))]
+        return format(value, match.group(2)) if match.group(2) else str(value)
+
+    text = re.sub(r"%\{customdata\[(\d+)\](?::([^}]+))?\}", field, series.hovertemplate)
+    return text.split("<br>运势指数")[0]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_kline_cache():
+    clear_cache("kline")
+    yield
+    clear_cache("kline")
+
+
+class TestKLineService:
+    """K线数据服务测试"""
+
+    @pytest.mark.parametrize("mode", KLINE_MODES)
+    def test_matches_per_bar_generators(self, sample_male_bazi, sample_wuxing, mode):
+        """列式结果与逐根生成器（含 hover 文本）一致"""
+        fortunes = calculate_year_fortunes(sample_male_bazi, sample_wuxing)
+        if mode == "additive":
+            klines = generate_kline_data(fortunes)
+        else:
+            klines = generate_multiplier_klines(fortunes)
+        series = get_kline_series(sample_male_bazi, sample_wuxing, 91, mode)
+
+        for name in ("open", "high", "low", "close"):
+            np.testing.assert_array_equal(getattr(series, name), [getattr(k, name) for k in klines])
+        assert series.levels == tuple(k.level for k in klines)
+        assert [_render_hover(series, i) for i in range(series.size)] == [
+            k.hover_text for k in klines
+        ]
+
+    @pytest.mark.parametrize("mode", KLINE_MODES)
+    def test_from_fortunes_matches_service(self, sample_male_bazi, sample_wuxing, mode):
+        """由流年列表生成与由命盘生成的结果一致"""
+        fortunes = calculate_year_fortunes(sample_male_bazi, sample_wuxing)
+        expected = get_kline_series(sample_male_bazi, sample_wuxing, 91, mode)
+        series = kline_series_from_fortunes(fortunes, mode)
+
+        for name in _PRICE_FIELDS:
+            np.testing.assert_array_equal(getattr(series, name), getattr(expected, name))
+        assert series.customdata.tolist() == expected.customdata.tolist()
+
+    @pytest.mark.parametrize("mode", KLINE_MODES)
+    def test_incremental_extension(self, sample_male_bazi, sample_wuxing, mode):
+        """先取短序列再扩展，结果与一次生成相同"""
+        short = get_kline_series(sample_male_bazi, sample_wuxing, 30, mode)
+        extended = get_kline_series(sample_male_bazi, sample_wuxing, 91, mode)
+        clear_cache("kline")
+        full = get_kline_series(sample_male_bazi, sample_wuxing, 91, mode)
+
+        assert short.size == 30 and extended.size == 91
+        for name in _PRICE_FIELDS:
+            np.testing.assert_array_equal(getattr(extended, name), getattr(full, name))
+        assert extended.customdata.tolist() == full.customdata.tolist()
+        # 缩短请求直接切片缓存结果
+        again = get_kline_series(sample_male_bazi, sample_wuxing, 30, mode)
+        np.testing.assert_array_equal(again.close, short.close)
+
+    def test_cached_per_chart_and_mode(self, sample_male_bazi, sample_female_bazi, sample_wuxing):
+        """不同模式、不同命盘分别缓存"""
+        from src.core import analyze_wuxing
+        from src.core.utils.cache import get_cache
+
+        get_kline_series(sample_male_bazi, sample_wuxing, mode="additive")
+        get_kline_series(sample_male_bazi, sample_wuxing, mode="multiplier")
+        get_kline_series(sample_female_bazi, analyze_wuxing(sample_female_bazi))
+        get_kline_series(sample_male_bazi, sample_wuxing, mode="multiplier")
+
+        stats = get_cache("kline").stats()
+        assert stats["size"] == 3
+        assert stats["hits"] == 1
+
+    def test_invalid_mode(self, sample_male_bazi, sample_wuxing):
+        """未知模式报错"""
+        with pytest.raises(ValueError):
+            get_kline_series(sample_male_bazi, sample_wuxing, mode="log")
+
+    def test_figure_from_series(self, sample_male_bazi, sample_wuxing):
+        """由列式数据建图，与由流年列表建图的数据一致"""
+        fortunes = calculate_year_fortunes(sample_male_bazi, sample_wuxing)
+        fig = create_kline_figure(get_kline_series(sample_male_bazi, sample_wuxing))
+        legacy = create_fortune_kline(fortunes)
+
+        np.testing.assert_array_equal(fig.data[0].close, legacy.data[0].close)
+        np.testing.assert_allclose(fig.data[1].y, legacy.data[1].y)
+        assert len(fig.data[0].x) == 91
+        assert "customdata" in fig.data[0].hovertemplate
+        assert fig.layout.title.text == "人生运势K线图（0-90岁）"
+
+
+class TestKLineDownsample:
+    """K线降采样测试"""
+
+    def test_period_buckets(self):
+        """周以周一分界，月按自然月"""
+        dates = np.arange("2024-01-28", "2024-02-06", dtype="datetime64[D]")
+        weeks = period_buckets(dates, "week")
+        months = period_buckets(dates, "month")
+
+        # 2024-01-29 为周一
+        assert weeks[0] != weeks[1] and len(set(weeks[1:8])) == 1
+        assert weeks[8] != weeks[7]
+        assert list(months[:4]) == [months[0]] * 4 and months[4] == months[0] + 1
+        with pytest.raises(ValueError):
+            period_buckets(dates, "day")
+
+    def test_aggregate_ohlc(self):
+        """聚合：首开、末收、区间最高最低"""
+        buckets = np.array([0, 0, 0, 1, 1, 2])
+        open_ = np.array([1.0, 2, 3, 4, 5, 6])
+        high = np.array([5.0, 9, 4, 6, 8, 7])
+        low = np.array([0.5, 1, 2, 3, 1, 6])
+        close = np.array([2.0, 3, 4, 5, 6, 7])
+        starts, ends, o, h, l, c = aggregate_ohlc(buckets, open_, high, low, close)
+
+        assert starts.tolist() == [0, 3, 5] and ends.tolist() == [2, 4, 5]
+        assert o.tolist() == [1, 4, 6]
+        assert h.tolist() == [9, 8, 7]
+        assert l.tolist() == [0.5, 1, 6]
+        assert c.tolist() == [4, 6, 7]
+
+    def test_lttb_keeps_extremes(self):
+        """LTTB 保留首尾与明显的峰谷"""
+        x = np.arange(10000)
+        y = np.sin(x / 500.0)
+        y[1234] = 10
+        y[7777] = -10
+        keep = lttb_indices(x, y, 200)
+
+        assert len(keep) == 200
+        assert keep[0] == 0 and keep[-1] == 9999
+        assert np.all(np.diff(keep) > 0)
+        assert 1234 in keep and 7777 in keep
+        assert lttb_indices(x[:50], y[:50], 200).tolist() == list(range(50))
+
+
+class TestKLineRange:
+    """多粒度K线区间查询测试"""
+
+    def test_daily_components(self, sample_male_bazi, sample_wuxing):
+        """流日分与每日时间线一致，流年按公历年取值"""
+        from datetime import date
+        from src.core import daily_fortune_timeline
+        from src.viz.kline_range import daily_score_components
+
+        _, year_part, _, day_part, _ = daily_score_components(
+            sample_male_bazi, sample_wuxing, date(2024, 1, 1), 366
+        )
+        rows = list(daily_fortune_timeline(
+            sample_male_bazi, sample_wuxing, date(2024, 1, 1), date(2024, 12, 31)
+        ))
+        assert day_part.tolist() == [row.score for row in rows]
+        assert len(set(year_part)) == 1
+
+    def test_month_pillars_follow_jieqi(self):
+        """流月干支与当日正午排盘的月柱一致（含交节当日）"""
+        from datetime import date, datetime, timedelta
+        from src.core import calculate_bazi
+        from src.models.bazi_models import Gender
+        from src.viz.kline_range import DAY_REFERENCE_TIME, _month_starts
+        from src.viz.kline_service import GANZHI_60
+
+        starts, cycles = _month_starts(2023, 2024)
+        jie_days = {np.datetime64(start, "D") for start in starts}
+        checked = 0
+        for offset in range(730):
+            day = date(2023, 1, 1) + timedelta(days=offset)
+            if offset % 3 and np.datetime64(day, "D") not in jie_days:
+                continue
+            checked += 1
+            i = np.searchsorted(starts, np.datetime64(day, "D") + DAY_REFERENCE_TIME, side="right") - 1
+            pillar = calculate_bazi(datetime(day.year, day.month, day.day, 12), Gender.MALE).month_pillar
+            assert GANZHI_60[cycles[i]] == f"{pillar.tiangan.value}{pillar.dizhi.value}"
+        assert checked > 243
+
+    def test_window_and_resolutions(self, sample_male_bazi, sample_wuxing):
+        """窗口切片与各粒度的根数"""
+        from datetime import date
+        from src.viz import get_kline_range
+
+        day = get_kline_range(sample_male_bazi, sample_wuxing, date(2020, 3, 1), date(2020, 4, 15), "day")
+        assert day.size == 46
+        assert str(day.x[0]) == "2020-03-01" and str(day.x[-1]) == "2020-04-15"
+
+        month = get_kline_range(sample_male_bazi, sample_wuxing, date(2020, 3, 15), date(2020, 5, 1), "month")
+        assert [str(x) for x in month.x] == ["2020-03-01", "2020-04-01", "2020-05-01"]
+
+        week = get_kline_range(sample_male_bazi, sample_wuxing, date(2020, 3, 4), date(2020, 3, 20), "week")
+        assert str(week.x[0]) == "2020-03-02" and week.size == 3
+
+        year = get_kline_range(sample_male_bazi, sample_wuxing, date(2000, 6, 1), date(2009, 1, 1), "year")
+        assert year.x.tolist() == list(range(2000, 2010))
+
+    def test_aggregates_consistent_with_daily(self, sample_male_bazi, sample_wuxing):
+        """月K的开收盘、最高最低来自当月日K"""
+        from datetime import date
+        from src.viz import get_kline_range
+
+        day = get_kline_range(sample_male_bazi, sample_wuxing, date(2021, 7, 1), date(2021, 7, 31), "day")
+        month = get_kline_range(sample_male_bazi, sample_wuxing, date(2021, 7, 1), date(2021, 7, 31), "month")
+
+        assert month.size == 1
+        assert month.open[0] == day.open[0] and month.close[0] == day.close[-1]
+        assert month.high[0] == day.high.max() and month.low[0] == day.low.min()
+        assert month.change[0] == pytest.approx(day.change.mean(), abs=0.05)
+
+    def test_auto_resolution_and_limits(self, sample_male_bazi, sample_wuxing):
+        """auto 按窗口长度选粒度，超出上限报错"""
+        from datetime import date
+        from src.viz import get_kline_range, resolve_kline_window
+
+        assert resolve_kline_window(sample_male_bazi, date(2020, 1, 1), date(2020, 12, 31))[2] == "day"
+        assert resolve_kline_window(sample_male_bazi, date(2000, 1, 1), date(2020, 1, 1))[2] == "week"
+        assert resolve_kline_window(sample_male_bazi, None, None)[2] == "month"
+        start, _, _ = resolve_kline_window(sample_male_bazi, date(1900, 1, 1), None)
+        assert start == sample_male_bazi.birth_datetime.date()
+
+        with pytest.raises(ValueError):
+            get_kline_range(sample_male_bazi, sample_wuxing, resolution="day")
+        with pytest.raises(ValueError):
+            get_kline_range(sample_male_bazi, sample_wuxing, date(2020, 1, 1), date(2019, 1, 1))
@@ -94,6 +94,63 @@ class TestJieqi:
         # 3月应在立春后
         assert not is_before_lichun(datetime(2024, 3, 15))
 
+    def test_jieqi_for_year_in_calendar_year(self):
+        """节气应全部落在当年，按时间排序"""
+        jieqi_list = get_jieqi_for_year(2024)
+        assert jieqi_list[0].name == "小寒"
+        assert jieqi_list[-1].name == "冬至"
+        assert all(jq.datetime.year == 2024 for jq in jieqi_list)
+        moments = [jq.datetime for jq in jieqi_list]
+        assert moments == sorted(moments)
+
+    def test_table_matches_ephem(self):
+        """预计算节气表应与 ephem 实时计算一致"""
+        from src.core.fortune.jieqi import _compute_year_seconds, _year_seconds
+        for year in (1800, 1949, 2024, 2200):
+            assert tuple(_year_seconds(year)) == _compute_year_seconds(year)
+
+    def test_term_lookup(self):
+        """节气查询：当前节气及前后的节"""
+        from src.core.fortune.jieqi import term_at, prev_jie, next_jie
+        dt = datetime(2024, 2, 20)
+        assert term_at(dt).name == "雨水"
+        assert prev_jie(dt).name == "立春"
+        assert next_jie(dt).name == "惊蛰"
+        assert prev_jie(dt).datetime <= dt < next_jie(dt).datetime
+
+    def test_term_lookup_at_boundary(self):
+        """节气时刻本身属于新节气"""
+        from src.core.fortune.jieqi import prev_jie, next_jie
+        lichun = get_jieqi_for_year(2024)[2]
+        assert prev_jie(lichun.datetime) == lichun
+        assert next_jie(lichun.datetime).name == "惊蛰"
+
+    def test_term_lookup_outside_table(self):
+        """表外年份应回退到 ephem 计算"""
+        from src.core.fortune.jieqi import prev_jie, next_jie
+        assert prev_jie(datetime(1700, 2, 20)).name == "立春"
+        assert next_jie(datetime(2300, 12, 30)).name == "小寒"
+        assert len(get_jieqi_for_year(2300)) == 24
+
+    def test_newton_solver_matches_published_lichun(self):
+        """2024年立春：2024-02-04 08:26:53 UTC"""
+        from src.core.fortune.jieqi import _find_jieqi_moment
+        expected = datetime(2024, 2, 4, 8, 26, 53)
+        assert abs((_find_jieqi_moment(2024, 315) - expected).total_seconds()) < 60
+
+    def test_newton_solver_matches_bisect(self):
+        """牛顿迭代与二分法结果应一致"""
+        from src.core.fortune.jieqi import compare_jieqi_solvers
+        report = compare_jieqi_solvers([1850, 2024], "newton", "ephem", "bisect", "ephem")
+        assert report["count"] == 48
+        assert report["max_abs_seconds"] < 5
+
+    def test_meeus_model_accuracy(self):
+        """Meeus 低精度公式误差应在15分钟内"""
+        from src.core.fortune.jieqi import compare_jieqi_solvers
+        report = compare_jieqi_solvers([1900, 2024, 2150], "newton", "meeus", "newton", "ephem")
+        assert report["max_abs_seconds"] < 15 * 60
+
 
 class TestSolarTime:
     """真太阳时测试"""
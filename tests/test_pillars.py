@@ -129,3 +129,92 @@ class TestCalculateBazi:
         """应正确存储出生时间"""
         bazi = calculate_bazi(sample_birth_datetime, Gender.MALE)
         assert bazi.birth_datetime == sample_birth_datetime
+
+
+class TestPreciseJieqi:
+    """精确节气排盘测试（2024年立春：北京时间2月4日16:27）"""
+    
+    @pytest.mark.parametrize("birth_dt,expected_year,expected_month", [
+        (datetime(2024, 2, 4, 16, 0), "癸卯", "乙丑"),
+        (datetime(2024, 2, 4, 17, 0), "甲辰", "丙寅"),
+        (datetime(2024, 1, 3, 12, 0), "癸卯", "甲子"),   # 小寒前
+        (datetime(2024, 12, 25, 18, 0), "甲辰", "丙子"),  # 大雪后
+    ])
+    def test_precise_boundaries(self, birth_dt, expected_year, expected_month):
+        """年柱、月柱应以精确节气时刻为界"""
+        bazi = calculate_bazi(birth_dt, Gender.MALE)
+        assert bazi.year_pillar.display == expected_year
+        assert bazi.month_pillar.display == expected_month
+    
+    def test_simplified_mode(self, monkeypatch):
+        """关闭精确节气时使用固定日期（2月4日即立春）"""
+        from src.core.utils.config import get_settings
+        monkeypatch.setattr(get_settings(), "use_precise_jieqi", False)
+        bazi = calculate_bazi(datetime(2024, 2, 4, 16, 0), Gender.MALE)
+        assert bazi.year_pillar.display == "甲辰"
+    
+    def test_boundaries_cached_per_year(self):
+        """同一年的排盘共用一次节气边界计算"""
+        from src.core.fortune.jieqi import get_jie_boundaries
+        get_jie_boundaries.cache_clear()
+        for hour in range(24):
+            calculate_bazi(datetime(2024, 5, 1, hour), Gender.MALE)
+        info = get_jie_boundaries.cache_info()
+        assert info.misses == 1
+        assert info.hits == 23
+    
+    def test_precise_start_age(self):
+        """起运年龄：到节的天数三天折一年"""
+        from src.core.fortune.dayun import _calculate_start_age
+        # 甲辰阳年男命顺行，距惊蛰（3月5日10:23）约14天
+        start_age, extra_months = _calculate_start_age(
+            datetime(2024, 2, 20, 10, 0), "甲", Gender.MALE
+        )
+        assert (start_age, extra_months) == (4, 8)
+        # 逆行，距立春约15.7天
+        start_age, _ = _calculate_start_age(
+            datetime(2024, 2, 20, 10, 0), "甲", Gender.FEMALE
+        )
+        assert start_age == 5
+
+
+class TestCalculateBaziBatch:
+    """批量八字计算测试"""
+    
+    @pytest.fixture
+    def birth_datetimes(self):
+        return [
+            datetime(1850, 7, 1, 5, 30),
+            datetime(1984, 2, 4, 12, 0),
+            datetime(1990, 1, 15, 8, 30),
+            datetime(2000, 1, 1, 0, 0),
+            datetime(2024, 2, 4, 17, 0),
+            datetime(2024, 12, 25, 23, 10),
+            datetime(2250, 3, 6, 12, 0),
+        ]
+    
+    @pytest.mark.parametrize("precise", [True, False])
+    def test_batch_matches_calculate_bazi(self, birth_datetimes, monkeypatch, precise):
+        """批量结果应与逐条计算一致"""
+        from src.core.bazi.pillars import calculate_bazi_batch
+        from src.core.utils.config import get_settings
+        monkeypatch.setattr(get_settings(), "use_precise_jieqi", precise)
+        genders = [Gender.MALE, Gender.FEMALE] * 3 + [Gender.MALE]
+        batch = calculate_bazi_batch(birth_datetimes, genders)
+        assert len(batch) == len(birth_datetimes)
+        for i, (dt, gender) in enumerate(zip(birth_datetimes, genders)):
+            assert batch.chart(i) == calculate_bazi(dt, gender)
+    
+    def test_batch_index_arrays(self, birth_datetimes):
+        """四柱以下标数组返回"""
+        from src.core.bazi.pillars import calculate_bazi_batch
+        batch = calculate_bazi_batch(birth_datetimes, Gender.FEMALE)
+        assert batch.day_gan.shape == (len(birth_datetimes),)
+        assert batch.year_gan.max() < 10 and batch.year_zhi.max() < 12
+        assert all(chart.gender == Gender.FEMALE for chart in batch.charts())
+    
+    def test_batch_gender_length_mismatch(self, birth_datetimes):
+        """性别数量不匹配应报错"""
+        from src.core.bazi.pillars import calculate_bazi_batch
+        with pytest.raises(ValueError):
+            calculate_bazi_batch(birth_datetimes, [Gender.MALE])